@@ -0,0 +1,32 @@
+from typing import Annotated
+
+from fastapi import Depends, Request
+
+from app.core.container import ServiceContainer
+from app.core.response_cache import ResponseCache
+from app.services.analysis_service import AnalysisService
+from app.services.assistant_service import AssistantService
+
+
+async def get_container(request: Request) -> ServiceContainer:
+    container: ServiceContainer = request.app.state.container
+    await container.ensure_started()
+    return container
+
+
+def get_analysis_service(container: ServiceContainer = Depends(get_container)) -> AnalysisService:
+    return container.analysis_service
+
+
+def get_assistant_service(container: ServiceContainer = Depends(get_container)) -> AssistantService:
+    return container.assistant_service
+
+
+def get_response_cache(container: ServiceContainer = Depends(get_container)) -> ResponseCache:
+    return container.response_cache
+
+
+container_dependency = Annotated[ServiceContainer, Depends(get_container)]
+analysis_service_dependency = Annotated[AnalysisService, Depends(get_analysis_service)]
+assistant_service_dependency = Annotated[AssistantService, Depends(get_assistant_service)]
+response_cache_dependency = Annotated[ResponseCache, Depends(get_response_cache)]
@@ -1,15 +1,19 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
 from app.models.schemas.assistant import AssistantRequest, AssistantResponse
-from app.services.assistant_service import AssistantService
+from app.api.deps import assistant_service_dependency
 from app.core.security import verify_api_key, verify_jwt
+from app.core.serialization import json_route_class
+from app.core.sse import answer_events, event_stream_response, wants_event_stream
 
-router = APIRouter()
+router = APIRouter(route_class=json_route_class())
 
 @router.post(
     "",
     response_model=AssistantResponse,
     dependencies=[Depends(verify_api_key), Depends(verify_jwt)]
 )
-def analyze_bug_management(request: AssistantRequest):
-    service = AssistantService()
-    return service.execute(request)
+async def analyze_bug_management(request: AssistantRequest, http_request: Request, service: assistant_service_dependency):
+    if wants_event_stream(http_request):
+        # Accept: text/event-stream -> the answer as SSE token events (see app.core.sse)
+        return event_stream_response(answer_events("success", service.stream(request)))
+    return await service.execute(request)
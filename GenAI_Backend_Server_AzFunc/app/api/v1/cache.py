@@ -0,0 +1,15 @@
+from fastapi import APIRouter, Depends
+from app.api.deps import response_cache_dependency
+from app.core.security import verify_api_key, verify_jwt
+from app.core.serialization import json_route_class
+
+router = APIRouter(route_class=json_route_class())
+
+@router.get("/stats", dependencies=[Depends(verify_api_key), Depends(verify_jwt)])
+async def response_cache_stats(cache: response_cache_dependency):
+    """Hit ratio, entries and LLM time saved by the response cache"""
+    return await cache.astats()
+
+@router.delete("", dependencies=[Depends(verify_api_key), Depends(verify_jwt)])
+async def clear_response_cache(cache: response_cache_dependency):
+    return {"removed": await cache.aclear()}
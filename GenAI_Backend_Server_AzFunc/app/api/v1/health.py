@@ -0,0 +1,10 @@
+from fastapi import APIRouter
+from app.api.deps import container_dependency
+from app.core.serialization import json_route_class
+
+router = APIRouter(route_class=json_route_class())
+
+@router.get("")
+async def health(container: container_dependency):
+    """Liveness plus startup / warm-up timings; also starts the services on hosts without lifespan"""
+    return {"status": "ok", **container.stats()}
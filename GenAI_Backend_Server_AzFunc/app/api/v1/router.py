@@ -1,7 +1,11 @@
 from fastapi import APIRouter
 from app.api.v1.analysis import router as analysis_router
 from app.api.v1.assistant import router as assistant_router
+from app.api.v1.cache import router as cache_router
+from app.api.v1.health import router as health_router
 
 api_router = APIRouter()
 api_router.include_router(analysis_router, prefix="/analysis", tags=["Analysis"])
-api_router.include_router(assistant_router, prefix="/assistant", tags=["Assistant"])
\ No newline at end of file
+api_router.include_router(assistant_router, prefix="/assistant", tags=["Assistant"])
+api_router.include_router(cache_router, prefix="/cache", tags=["Cache"])
+api_router.include_router(health_router, prefix="/health", tags=["Health"])
\ No newline at end of file
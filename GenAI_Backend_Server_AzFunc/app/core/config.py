@@ -1,4 +1,5 @@
 import os
+import tempfile
 
 
 class Settings:
@@ -11,6 +12,31 @@ class Settings:
     AZURE_SQL_PASSWORD = os.getenv("AZURE_SQL_PASSWORD", "")
     AZURE_SQL_PORT = os.getenv("AZURE_SQL_PORT", 1433)
     AZURE_SQL_DRIVER = os.getenv("AZURE_SQL_DRIVER", "ODBC Driver 17 for SQL Server")
+    # SQLAlchemy pool (app.db.session): connections kept open, extra ones under load,
+    # wait for a free connection (s), reconnect after (s); pre-ping drops dead connections
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+    DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))
+    DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))
+    DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+    # Upper bound for gzip/zstd request bodies after decompression
+    MAX_REQUEST_BODY_BYTES = int(os.getenv("MAX_REQUEST_BODY_BYTES", 64 * 1024 * 1024))
+    # "orjson" parses request bodies and renders responses with orjson (if installed)
+    JSON_LIBRARY = os.getenv("JSON_LIBRARY", "stdlib").lower()
+    # LLM (app.core.llm_client): OpenAI-compatible chat completions URL; empty = built-in answers
+    LLM_API_URL = os.getenv("LLM_API_URL", "")
+    LLM_API_KEY = os.getenv("LLM_API_KEY", "")
+    LLM_MODEL = os.getenv("LLM_MODEL", "")
+    LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", 60))
+    LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", 100))
+    # Warm-up at startup (app.core.container); the DB ping is opt-in as it needs the database reachable
+    WARMUP_ENABLED = os.getenv("WARMUP_ENABLED", "true").lower() == "true"
+    WARMUP_DATABASE = os.getenv("WARMUP_DATABASE", "false").lower() == "true"
+    # LLM response cache (app.core.response_cache): "memory", "sqlite" or "none"
+    RESPONSE_CACHE_BACKEND = os.getenv("RESPONSE_CACHE_BACKEND", "memory").lower()
+    RESPONSE_CACHE_TTL_SECONDS = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", 3600))
+    RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", 512))
+    RESPONSE_CACHE_PATH = os.getenv("RESPONSE_CACHE_PATH", os.path.join(tempfile.gettempdir(), "genai_response_cache.sqlite3"))
     AUZRE_SQL_CONN = "mssql+pyodbc://{AZURE_SQL_USER}:{AZURE_SQL_PASSWORD}@{AZURE_SQL_SERVER}:1433/{AZURE_SQL_DATABASE}?driver={AZURE_SQL_DRIVER}&Encrypt=yes&TrustServerCertificate=no"
 
 settings = Settings()
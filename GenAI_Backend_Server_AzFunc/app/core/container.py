@@ -0,0 +1,160 @@
+"""
+Per-worker service container, managed by the app lifespan.
+
+Services, the LLM client and the response cache are built once at startup;
+the services get the cache and client through their constructors, and
+routes get the services through the dependencies in app.api.deps. After that,
+the startup runs warm-up hooks (SQLite cache, the LLM connection, optionally
+a DB connection), so the first request after an Azure Functions cold start
+does not pay for them. The prompt warm-up (numpy import, first pydantic and
+analytics calls) runs in the background: startup does not wait for numpy,
+and an analysis request that arrives before it is done waits only for the
+rest of the import.
+
+Hosts that do not run the ASGI lifespan get the same startup on the first
+request (ensure_started).
+"""
+import asyncio
+import datetime
+import logging
+import sys
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.llm_client import LLMClient, create_llm_client
+from app.core.response_cache import ResponseCache, create_response_cache
+from app.models.schemas.analysis import AnalysisRequest
+from app.services.analysis_service import AnalysisService
+from app.services.assistant_service import AssistantService
+
+logger = logging.getLogger(__name__)
+
+WarmupHook = Callable[["ServiceContainer"], Awaitable[None]]
+
+
+def sample_analysis_request():
+    """Small but complete request, to exercise validation, analytics and the prompt"""
+    start = datetime.date(2025, 1, 1)
+    return AnalysisRequest.model_validate({
+        "request_meta": {"request_id": "warmup", "timestamp": "2025-01-01T00:00:00", "mode_type": "warmup"},
+        "period": {"start_date": str(start), "end_date": str(start + datetime.timedelta(days=20))},
+        "filters": {"redmine_infra": [], "redmine_server": [], "redmine_instance": [], "project_identifier": [], "project_name": []},
+        "metrics_data": [
+            {"date": str(start + datetime.timedelta(days=d)), "BReportActual": d, "BReportFixed": d // 2,
+             "BReportActualTotal": d * d, "BReportFixedTotal": d, "BReportUpperBound": 100, "BReportLowerBound": 0}
+            for d in range(21)
+        ],
+    })
+
+
+async def warm_prompts(container: "ServiceContainer") -> None:
+    request = sample_analysis_request()
+    await run_in_threadpool(container.analysis_service.build_prompt, request)
+    await run_in_threadpool(container.assistant_service.build_prompt, request)
+
+
+async def warm_response_cache(container: "ServiceContainer") -> None:
+    # Straight to the store, so the lookup does not count as a miss
+    cache = container.response_cache
+    if cache.enabled and cache.store.blocking:
+        await run_in_threadpool(cache.store.get, "warmup")
+
+
+async def warm_llm_connection(container: "ServiceContainer") -> None:
+    if container.llm_client is not None:
+        await container.llm_client.warm()
+
+
+async def warm_database(container: "ServiceContainer") -> None:
+    from sqlalchemy import text
+
+    from app.db.session import engine
+
+    def ping():
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+
+    await run_in_threadpool(ping)
+
+
+class ServiceContainer:
+    def __init__(self):
+        self.analysis_service: Optional[AnalysisService] = None
+        self.assistant_service: Optional[AssistantService] = None
+        self.llm_client: Optional[LLMClient] = None
+        self.response_cache: Optional[ResponseCache] = None
+        self.started = False
+        self.warmup_hooks: List[Tuple[str, WarmupHook, bool]] = []
+        self.warmup_seconds: Dict[str, Optional[float]] = {}
+        self.startup_seconds: Optional[float] = None
+        self._lock = asyncio.Lock()
+        self._background: Set[asyncio.Task] = set()
+
+        if settings.WARMUP_ENABLED:
+            self.add_warmup("prompts", warm_prompts, background=True)
+            self.add_warmup("response_cache", warm_response_cache)
+            self.add_warmup("llm_connection", warm_llm_connection)
+            if settings.WARMUP_DATABASE:
+                self.add_warmup("database", warm_database)
+
+    def add_warmup(self, name: str, hook: WarmupHook, background: bool = False) -> None:
+        """background hooks run after startup returns, the others before it"""
+        self.warmup_hooks.append((name, hook, background))
+
+    async def _warm(self, name: str, hook: WarmupHook) -> None:
+        started = time.perf_counter()
+        try:
+            await hook(self)
+            self.warmup_seconds[name] = round(time.perf_counter() - started, 4)
+        except Exception as exc:
+            # A failed warm-up only costs the first request its init time
+            logger.warning("Warm-up %r failed: %r", name, exc)
+            self.warmup_seconds[name] = None
+
+    async def startup(self) -> None:
+        started = time.perf_counter()
+        self.response_cache = create_response_cache()
+        self.llm_client = create_llm_client()
+        # The services use the container's cache and client, not globals of their own
+        self.analysis_service = AnalysisService(self.response_cache, self.llm_client)
+        self.assistant_service = AssistantService(self.response_cache, self.llm_client)
+        for name, hook, background in self.warmup_hooks:
+            if background:
+                task = asyncio.create_task(self._warm(name, hook))
+                self._background.add(task)
+                task.add_done_callback(self._background.discard)
+            else:
+                await self._warm(name, hook)
+        self.startup_seconds = round(time.perf_counter() - started, 4)
+        self.started = True
+        logger.info("Service container ready in %.3fs (warm-up: %s)", self.startup_seconds, self.warmup_seconds)
+
+    async def ensure_started(self) -> None:
+        if self.started:
+            return
+        async with self._lock:
+            if not self.started:
+                await self.startup()
+
+    async def shutdown(self) -> None:
+        for task in list(self._background):
+            task.cancel()
+        await asyncio.gather(*self._background, return_exceptions=True)
+        if self.llm_client is not None:
+            await self.llm_client.aclose()
+            self.llm_client = None
+        if "app.db.session" in sys.modules:
+            # Only if something (the DB warm-up, a DAL) created the engine
+            sys.modules["app.db.session"].engine.dispose()
+        self.started = False
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "started": self.started,
+            "startup_seconds": self.startup_seconds,
+            "warmup_seconds": dict(self.warmup_seconds),
+            "llm": self.llm_client is not None,
+        }
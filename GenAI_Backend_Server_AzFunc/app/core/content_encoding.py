@@ -0,0 +1,136 @@
+"""
+Request body decompression and wire-format advertisement.
+
+The extension server may send the request body gzip or zstd compressed
+(Content-Encoding) and metrics_data in the columnar layout. This ASGI
+middleware inflates compressed bodies before FastAPI parses them, rejects
+unknown encodings with 415, and lists what is accepted in every response
+(Accept-Encoding, X-Accept-Metrics-Formats) so the client can negotiate.
+"""
+import importlib.util
+import json
+import zlib
+
+ACCEPT_METRICS_FORMATS_HEADER = "x-accept-metrics-formats"
+SUPPORTED_METRICS_FORMATS = ("records", "columnar")
+
+
+def zstd_available() -> bool:
+    return importlib.util.find_spec("zstandard") is not None
+
+
+def supported_encodings():
+    encodings = ["gzip"]
+    if zstd_available():
+        encodings.append("zstd")
+    return encodings
+
+
+class BodyTooLargeError(Exception):
+    pass
+
+
+def _gunzip(body: bytes, max_size: int) -> bytes:
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    data = decompressor.decompress(body, max_size + 1)
+    if len(data) > max_size or decompressor.unconsumed_tail:
+        raise BodyTooLargeError()
+    if not decompressor.eof:
+        raise ValueError("truncated gzip stream")
+    return data
+
+
+def _unzstd(body: bytes, max_size: int) -> bytes:
+    import zstandard
+
+    with zstandard.ZstdDecompressor().stream_reader(body) as reader:
+        data = reader.read(max_size + 1)
+    if len(data) > max_size:
+        raise BodyTooLargeError()
+    return data
+
+
+DECODERS = {"gzip": _gunzip, "zstd": _unzstd}
+
+
+class RequestDecompressionMiddleware:
+    def __init__(self, app, max_body_bytes: int = 64 * 1024 * 1024):
+        self.app = app
+        self.max_body_bytes = max_body_bytes
+        self.encodings = supported_encodings()
+        self.advertised = [
+            (b"accept-encoding", ", ".join(self.encodings).encode("latin-1")),
+            (ACCEPT_METRICS_FORMATS_HEADER.encode("latin-1"), ", ".join(SUPPORTED_METRICS_FORMATS).encode("latin-1")),
+        ]
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_advertising(message):
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": [*message.get("headers", []), *self.advertised]}
+            await send(message)
+
+        encoding = None
+        for name, value in scope["headers"]:
+            if name == b"content-encoding":
+                encoding = value.decode("latin-1").strip().lower()
+                break
+
+        if encoding in (None, "", "identity"):
+            await self.app(scope, receive, send_advertising)
+            return
+
+        if encoding not in self.encodings:
+            await self._reject(send_advertising, 415, f"Unsupported Content-Encoding: {encoding}")
+            return
+
+        chunks = []
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                break
+
+        try:
+            body = DECODERS[encoding](b"".join(chunks), self.max_body_bytes)
+        except BodyTooLargeError:
+            await self._reject(send_advertising, 413, "Decompressed request body too large")
+            return
+        except Exception as e:  # zlib.error, zstandard.ZstdError, truncated streams
+            await self._reject(send_advertising, 400, f"Invalid {encoding} request body: {e}")
+            return
+
+        headers = [
+            (name, value) for name, value in scope["headers"]
+            if name not in (b"content-encoding", b"content-length")
+        ]
+        headers.append((b"content-length", str(len(body)).encode("latin-1")))
+        sent = False
+
+        async def receive_decoded():
+            nonlocal sent
+            if not sent:
+                sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        await self.app({**scope, "headers": headers}, receive_decoded, send_advertising)
+
+    @staticmethod
+    async def _reject(send, status_code: int, detail: str):
+        content = json.dumps({"detail": detail}).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": status_code,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(content)).encode("latin-1")),
+            ],
+        })
+        await send({"type": "http.response.body", "body": content})
+
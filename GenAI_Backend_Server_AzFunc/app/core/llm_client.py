@@ -0,0 +1,86 @@
+"""
+Async client for the LLM (OpenAI-compatible chat completions API).
+
+One httpx.AsyncClient per worker, created by the service container at
+startup (app.core.container) and closed on app shutdown, so LLM calls wait
+on the event loop instead of holding one of FastAPI's threadpool threads
+for the whole generation.
+
+Settings: LLM_API_URL (full chat completions URL; empty = no LLM, the
+services answer with their built-in message), LLM_API_KEY (sent as
+`api-key`, as Azure OpenAI expects, and as a Bearer token), LLM_MODEL,
+LLM_TIMEOUT and LLM_MAX_CONNECTIONS.
+"""
+import json
+import logging
+from typing import AsyncIterator, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class LLMClient:
+    def __init__(self, url: str, api_key: str = "", model: str = "", timeout: float = 60.0, max_connections: int = 100):
+        # Imported here: httpx (and httpcore) only load when an LLM is configured
+        import httpx
+
+        self.url = url
+        self.model = model
+        headers = {"Content-Type": "application/json"}
+        if api_key:
+            headers.update({"api-key": api_key, "Authorization": f"Bearer {api_key}"})
+        self._client = httpx.AsyncClient(
+            headers=headers,
+            timeout=httpx.Timeout(timeout, connect=min(timeout, 10.0)),
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+        )
+
+    def _body(self, prompt: str, system: str, stream: bool) -> dict:
+        body = {
+            "messages": [{"role": "system", "content": system}, {"role": "user", "content": prompt}],
+            "stream": stream,
+        }
+        if self.model:
+            body["model"] = self.model
+        return body
+
+    async def complete(self, prompt: str, system: str = "") -> str:
+        response = await self._client.post(self.url, json=self._body(prompt, system, stream=False))
+        response.raise_for_status()
+        return response.json()["choices"][0]["message"]["content"]
+
+    async def stream(self, prompt: str, system: str = "") -> AsyncIterator[str]:
+        """Content deltas as the model generates them"""
+        async with self._client.stream("POST", self.url, json=self._body(prompt, system, stream=True)) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    return
+                choices = json.loads(data).get("choices") or [{}]
+                content = (choices[0].get("delta") or {}).get("content")
+                if content:
+                    yield content
+
+    async def warm(self) -> None:
+        """Open a pooled connection (DNS, TCP, TLS) ahead of the first completion; any HTTP status will do"""
+        await self._client.head(self.url)
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+
+def create_llm_client() -> Optional[LLMClient]:
+    """Client built from settings, or None when no LLM_API_URL is configured"""
+    if not settings.LLM_API_URL:
+        return None
+    return LLMClient(
+        settings.LLM_API_URL,
+        api_key=settings.LLM_API_KEY,
+        model=settings.LLM_MODEL,
+        timeout=settings.LLM_TIMEOUT,
+        max_connections=settings.LLM_MAX_CONNECTIONS,
+    )
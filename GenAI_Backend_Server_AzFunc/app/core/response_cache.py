@@ -0,0 +1,254 @@
+"""
+LLM response cache for the analysis / assistant services.
+
+Identical requests (same mode, filters, period, metrics_data and question)
+get the stored answer instead of a new LLM call. Keys come from
+request_fingerprint(); entries expire after a TTL and the least recently
+used ones are evicted beyond `max_entries`.
+
+Storage backends (RESPONSE_CACHE_BACKEND):
+  - "memory": in-process LRU (lost when the Function host recycles)
+  - "sqlite": local SQLite file (RESPONSE_CACHE_PATH), survives recycles;
+    on Azure Functions put it under %HOME% to keep it across restarts
+  - "none":   disabled
+
+stats() reports the hit ratio and the LLM time saved by hits (each entry
+remembers how long its answer took to generate).
+"""
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+BACKEND_MEMORY = "memory"
+BACKEND_SQLITE = "sqlite"
+BACKEND_NONE = "none"
+
+# (value, generation seconds)
+Entry = Tuple[Any, float]
+
+
+def _canonical_metrics(metrics_data: Any) -> Dict[str, Any]:
+    """
+    Same content -> same structure, whether metrics_data arrived as records
+    or columnar (both validate to ColumnarMetricsData): one dates list plus
+    one list per non-empty metric, keys sorted
+    """
+    return {
+        "dates": [day.isoformat() for day in metrics_data.dates],
+        "metrics": {name: values for name, values in sorted(metrics_data.metrics.items()) if any(v is not None for v in values)},
+    }
+
+
+def request_fingerprint(service: str, request: Any) -> str:
+    """Stable hash of what determines the LLM answer for an analysis/assistant request"""
+    document = {
+        "service": service,
+        "mode_type": request.request_meta.mode_type,
+        "metrics_granularity": request.request_meta.metrics_granularity,
+        # List order in filters carries no meaning
+        "filters": {name: sorted(values) for name, values in request.filters.model_dump(exclude_none=True).items()},
+        "period": request.period.model_dump(mode="json"),
+        "metrics_data": _canonical_metrics(request.metrics_data),
+        "user_question": (getattr(request, "user_question", None) or "").strip(),
+    }
+    encoded = json.dumps(document, sort_keys=True, separators=(",", ":"), default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class MemoryStore:
+    """In-process LRU of (expires_at, value, generation seconds)"""
+
+    blocking = False
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Entry]:
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            expires_at, value, seconds = item
+            if expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value, seconds
+
+    def set(self, key: str, value: Any, seconds: float, ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = (time.time() + ttl, value, seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> int:
+        with self._lock:
+            removed = len(self._entries)
+            self._entries.clear()
+            return removed
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteStore:
+    """SQLite-backed store with the same interface; values are stored as JSON"""
+
+    # Disk I/O: async callers run it in the threadpool
+    blocking = True
+
+    def __init__(self, path: str, max_entries: int):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS response_cache ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL, seconds REAL NOT NULL,"
+            " expires_at REAL NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS response_cache_lru ON response_cache (last_access)")
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Entry]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, seconds, expires_at FROM response_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[2] <= now:
+                self._conn.execute("DELETE FROM response_cache WHERE key = ?", (key,))
+                return None
+            self._conn.execute("UPDATE response_cache SET last_access = ? WHERE key = ?", (now, key))
+        return json.loads(row[0]), row[1]
+
+    def set(self, key: str, value: Any, seconds: float, ttl: float) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO response_cache (key, value, seconds, expires_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), seconds, now + ttl, now),
+            )
+            excess = len(self) - self.max_entries
+            if excess > 0:
+                self._conn.execute("DELETE FROM response_cache WHERE expires_at <= ?", (now,))
+                excess = len(self) - self.max_entries
+            if excess > 0:
+                self._conn.execute(
+                    "DELETE FROM response_cache WHERE key IN"
+                    " (SELECT key FROM response_cache ORDER BY last_access LIMIT ?)",
+                    (excess,),
+                )
+                self.evictions += excess
+
+    def clear(self) -> int:
+        with self._lock:
+            return self._conn.execute("DELETE FROM response_cache").rowcount
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM response_cache").fetchone()[0]
+
+
+class ResponseCache:
+    def __init__(self, store: Optional[Any], ttl_seconds: float):
+        self.store = store
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._saved_seconds = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self.store is not None and self.ttl_seconds > 0
+
+    def get(self, key: str) -> Optional[Any]:
+        if not self.enabled:
+            return None
+        entry = self.store.get(key)
+        with self._lock:
+            if entry is None:
+                self._misses += 1
+                return None
+            self._hits += 1
+            self._saved_seconds += entry[1]
+        return entry[0]
+
+    def set(self, key: str, value: Any, seconds: float) -> None:
+        if self.enabled:
+            self.store.set(key, value, seconds, self.ttl_seconds)
+
+    async def aget(self, key: str) -> Optional[Any]:
+        if self.enabled and self.store.blocking:
+            return await run_in_threadpool(self.get, key)
+        return self.get(key)
+
+    async def aset(self, key: str, value: Any, seconds: float) -> None:
+        if self.enabled and self.store.blocking:
+            await run_in_threadpool(self.set, key, value, seconds)
+        else:
+            self.set(key, value, seconds)
+
+    def clear(self) -> int:
+        return self.store.clear() if self.store is not None else 0
+
+    async def aclear(self) -> int:
+        if self.store is not None and self.store.blocking:
+            return await run_in_threadpool(self.clear)
+        return self.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "backend": type(self.store).__name__ if self.store is not None else None,
+                "enabled": self.enabled,
+                "entries": len(self.store) if self.store is not None else 0,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_ratio": round(self._hits / lookups, 4) if lookups else 0.0,
+                "saved_seconds": round(self._saved_seconds, 3),
+                "evictions": getattr(self.store, "evictions", 0),
+            }
+
+    async def astats(self) -> Dict[str, Any]:
+        if self.store is not None and self.store.blocking:
+            return await run_in_threadpool(self.stats)
+        return self.stats()
+
+
+def create_response_cache() -> ResponseCache:
+    """Cache built from settings (one per service container)"""
+    backend = settings.RESPONSE_CACHE_BACKEND
+    store = None
+    if backend == BACKEND_MEMORY:
+        store = MemoryStore(settings.RESPONSE_CACHE_MAX_ENTRIES)
+    elif backend == BACKEND_SQLITE:
+        try:
+            store = SQLiteStore(settings.RESPONSE_CACHE_PATH, settings.RESPONSE_CACHE_MAX_ENTRIES)
+        except sqlite3.Error as exc:
+            logger.warning("Response cache at %s unavailable (%s); using the in-memory cache", settings.RESPONSE_CACHE_PATH, exc)
+            store = MemoryStore(settings.RESPONSE_CACHE_MAX_ENTRIES)
+    elif backend != BACKEND_NONE:
+        logger.warning("Unknown RESPONSE_CACHE_BACKEND=%r; response cache disabled", backend)
+    return ResponseCache(store, settings.RESPONSE_CACHE_TTL_SECONDS)
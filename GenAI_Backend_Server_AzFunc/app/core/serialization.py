@@ -0,0 +1,56 @@
+"""
+Optional orjson-based JSON handling (JSON_LIBRARY=orjson).
+
+- json_response_class(): ORJSONResponse as the app's default response class
+- json_route_class(): APIRoute whose requests parse the body with orjson.loads
+
+Both fall back to FastAPI's stdlib defaults when orjson is not installed.
+"""
+import functools
+import importlib.util
+import logging
+
+from fastapi import Request
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import APIRoute
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@functools.lru_cache(maxsize=None)
+def orjson_enabled() -> bool:
+    if settings.JSON_LIBRARY != "orjson":
+        return False
+    if importlib.util.find_spec("orjson") is None:
+        logger.warning("JSON_LIBRARY=orjson but the 'orjson' package is not installed; using stdlib json")
+        return False
+    return True
+
+
+class ORJSONRequest(Request):
+    async def json(self):
+        if not hasattr(self, "_json"):
+            import orjson
+
+            self._json = orjson.loads(await self.body())
+        return self._json
+
+
+class ORJSONRoute(APIRoute):
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def orjson_route_handler(request: Request):
+            return await handler(ORJSONRequest(request.scope, request.receive))
+
+        return orjson_route_handler
+
+
+def json_response_class():
+    return ORJSONResponse if orjson_enabled() else JSONResponse
+
+
+def json_route_class():
+    return ORJSONRoute if orjson_enabled() else APIRoute
@@ -0,0 +1,59 @@
+"""
+Server-Sent Events for streamed LLM answers.
+
+Clients opt in per request with `Accept: text/event-stream`; everyone else
+keeps getting the single JSON document. The stream is:
+
+    event: token   data: {"text": "..."}      one per generated chunk
+    event: done    data: {"status": ..., "message": <full text>}
+    event: error   data: {"detail": "..."}    instead of done on failure
+
+`data` is always one line of JSON, so chunk text may contain newlines.
+
+Token-by-token delivery needs an ASGI server that sends each body chunk
+as it is produced (uvicorn). func.AsgiFunctionApp (function_app.py)
+collects the whole response before returning it, so on Azure Functions
+the events all arrive together when the answer is complete.
+"""
+import json
+import logging
+from typing import Any, AsyncIterable, AsyncIterator
+
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+
+logger = logging.getLogger(__name__)
+
+EVENT_STREAM = "text/event-stream"
+
+
+def wants_event_stream(request: Request) -> bool:
+    return EVENT_STREAM in request.headers.get("accept", "")
+
+
+def format_event(event: str, data: Any) -> bytes:
+    payload = json.dumps(data, ensure_ascii=False, separators=(",", ":"), default=str)
+    return f"event: {event}\ndata: {payload}\n\n".encode("utf-8")
+
+
+async def answer_events(status: str, chunks: AsyncIterable[str]) -> AsyncIterator[bytes]:
+    """token events for each chunk, then done with the full message"""
+    parts = []
+    try:
+        async for chunk in chunks:
+            parts.append(chunk)
+            yield format_event("token", {"text": chunk})
+    except Exception as exc:
+        logger.exception("Answer stream failed")
+        yield format_event("error", {"detail": str(exc)})
+        return
+    yield format_event("done", {"status": status, "message": "".join(parts)})
+
+
+def event_stream_response(events: AsyncIterable[bytes]) -> StreamingResponse:
+    return StreamingResponse(
+        events,
+        media_type=EVENT_STREAM,
+        # Keep proxies (nginx, Front Door) from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -4,7 +4,7 @@ from app.dal.base import BaseDAL
 class AnalysisDAL(BaseDAL):
 
     def fetch_all(self):
-        return self.execute("SELECT 1 as sample_column")
+        return self.execute_text_query("SELECT 1 as sample_column")
     
     def fetch_analysis_report(
         self,
@@ -20,7 +20,13 @@ class AnalysisDAL(BaseDAL):
         filter4_list: list,
         filter5_list: list,
     ):
-        return self.execute_query(
+        """
+        Rows of the report view for the period and filters. project_identifier_list
+        and filterN_list are expanded into IN lists; an empty or missing filterN_list
+        does not restrict filterN.
+        """
+        filter_lists = [filter1_list, filter2_list, filter3_list, filter4_list, filter5_list]
+        return self.execute_file_query(
             sql_file="analysis_report.sql",
             params={
                 "start_date": start_date,
@@ -29,10 +35,8 @@ class AnalysisDAL(BaseDAL):
                 "redmine_server": redmine_server,
                 "redmine_instance": redmine_instance,
                 "project_identifier_list": project_identifier_list,
-                "filter1_list": filter1_list,
-                "filter2_list": filter2_list,
-                "filter3_list": filter3_list,
-                "filter4_list": filter4_list,
-                "filter5_list": filter5_list,
+                # Always lists, so every call shares one prepared statement
+                **{f"filter{i}_list": list(values or []) for i, values in enumerate(filter_lists, start=1)},
+                **{f"filter{i}_all": 0 if values else 1 for i, values in enumerate(filter_lists, start=1)},
             },
         )
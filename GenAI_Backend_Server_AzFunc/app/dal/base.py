@@ -1,23 +1,62 @@
-from sqlalchemy import text
-from app.db.session import engine
+import functools
 from pathlib import Path
+from typing import Any, Dict, FrozenSet, Optional
+
+from sqlalchemy import bindparam, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.sql.elements import TextClause
+
+from app.db import session
+
+QUERY_PATH = Path(__file__).parent / "queries"
+
+
+@functools.lru_cache(maxsize=None)
+def load_sql(filename: str) -> str:
+    """SQL files are read once per worker"""
+    return (QUERY_PATH / filename).read_text()
+
+
+@functools.lru_cache(maxsize=256)
+def prepared_statement(sql: str, expanding: FrozenSet[str] = frozenset()) -> TextClause:
+    """
+    One text() construct per (SQL, list parameters): reusing the same object
+    lets SQLAlchemy reuse its compiled form. List parameters are "expanding",
+    so `IN (:name)` becomes one bound placeholder per value.
+    """
+    statement = text(sql)
+    if expanding:
+        statement = statement.bindparams(*(bindparam(name, expanding=True) for name in sorted(expanding)))
+    return statement
+
+
+def _expanding(params: Dict[str, Any]) -> FrozenSet[str]:
+    return frozenset(name for name, value in params.items() if isinstance(value, (list, tuple, set, frozenset)))
 
 
 class BaseDAL:
-    QUERY_PATH = Path(__file__).parent / "queries"
+    QUERY_PATH = QUERY_PATH
+
+    def __init__(self, engine: Optional[Engine] = None):
+        self.engine = engine or session.engine
 
     def _load_sql(self, filename: str) -> str:
-        return (self.QUERY_PATH / filename).read_text()
+        return load_sql(filename)
+
+    def _statement(self, sql: str, params: Dict[str, Any]) -> TextClause:
+        return prepared_statement(sql, _expanding(params))
 
     def execute_file_query(self, sql_file: str, params: dict | None = None):
-        query = text(self._load_sql(sql_file))
+        return self.execute_text_query(self._load_sql(sql_file), params)
 
-        with engine.connect() as conn:
-            result = conn.execute(query, params or {})
+    def execute_text_query(self, sql: str, params: dict | None = None):
+        params = {name: list(value) if isinstance(value, (set, frozenset)) else value for name, value in (params or {}).items()}
+        with self.engine.connect() as conn:
+            result = conn.execute(self._statement(sql, params), params)
             return result.mappings().all()
-    
-    def execute_query(self, sql_query: str):
-        with engine.connect() as conn:
-            result = conn.execute(sql_query)
-            conn.commit()
+
+    def execute_query(self, sql_query: str, params: dict | None = None):
+        params = params or {}
+        with self.engine.begin() as conn:
+            result = conn.execute(self._statement(sql_query, params), params)
             return result.rowcount
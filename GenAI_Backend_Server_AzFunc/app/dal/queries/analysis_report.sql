@@ -1,4 +1,5 @@
 select 
+    date,
     TestCaseExpected,
     TestCaseActual,
     BReportExpected,
@@ -18,9 +19,10 @@ WHERE date IS NOT NULL
   AND redmine_infra = :redmine_infra
   AND redmine_server = :redmine_server
   AND redmine_instance = :redmine_instance
-  AND project_identifier IN (:project_identifier_list)
-  AND filter1 IN (:filter1_list)
-  AND filter2 IN (:filter2_list)
-  AND filter3 IN (:filter3_list)
-  AND filter4 IN (:filter4_list)
-  AND filter5 IN (:filter5_list)
\ No newline at end of file
+  AND project_identifier IN :project_identifier_list
+  AND (:filter1_all = 1 OR filter1 IN :filter1_list)
+  AND (:filter2_all = 1 OR filter2 IN :filter2_list)
+  AND (:filter3_all = 1 OR filter3 IN :filter3_list)
+  AND (:filter4_all = 1 OR filter4 IN :filter4_list)
+  AND (:filter5_all = 1 OR filter5 IN :filter5_list)
+ORDER BY date
\ No newline at end of file
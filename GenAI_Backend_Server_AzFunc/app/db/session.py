@@ -0,0 +1,45 @@
+"""
+One pooled SQLAlchemy engine per Function worker process.
+
+DATABASE_URL wins when set (e.g. "sqlite:///local.db" for local checks);
+otherwise the Azure SQL URL is built from the AZURE_SQL_* settings. The
+pool pings connections before use (Azure SQL drops idle ones) and recycles
+them after DB_POOL_RECYCLE seconds. Nothing connects until first use.
+"""
+from sqlalchemy import create_engine
+from sqlalchemy.engine import URL, Engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+
+
+def database_url():
+    if settings.DATABASE_URL:
+        return settings.DATABASE_URL
+    return URL.create(
+        "mssql+pyodbc",
+        username=settings.AZURE_SQL_USER,
+        password=settings.AZURE_SQL_PASSWORD,
+        host=settings.AZURE_SQL_SERVER,
+        port=int(settings.AZURE_SQL_PORT),
+        database=settings.AZURE_SQL_DATABASE,
+        query={"driver": settings.AZURE_SQL_DRIVER, "Encrypt": "yes", "TrustServerCertificate": "no"},
+    )
+
+
+def create_db_engine(url=None) -> Engine:
+    url = url or database_url()
+    options = {"pool_pre_ping": settings.DB_POOL_PRE_PING}
+    if not str(url).startswith("sqlite"):
+        # SQLite uses its own single-file pools, which take none of these
+        options.update(
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+        )
+    return create_engine(url, **options)
+
+
+engine = create_db_engine()
+session_local = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
@@ -1,15 +1,32 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from app.api.v1.router import api_router
 from app.core.logging import setup_logging
+from app.core.config import settings
+from app.core.container import ServiceContainer
+from app.core.content_encoding import RequestDecompressionMiddleware
+from app.core.serialization import json_response_class
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Services and warm-up once per worker (see app.core.container)
+    await app.state.container.ensure_started()
+    yield
+    await app.state.container.shutdown()
 
 def create_app() -> FastAPI:
     setup_logging()
 
     app = FastAPI(
         title="Bug Management Analysis API",
-        version="1.0.0"
+        version="1.0.0",
+        default_response_class=json_response_class(),
+        lifespan=lifespan,
     )
+    app.state.container = ServiceContainer()
 
+    app.add_middleware(RequestDecompressionMiddleware, max_body_bytes=settings.MAX_REQUEST_BODY_BYTES)
     app.include_router(api_router, prefix="/api/v1")
     return app
 
@@ -0,0 +1,173 @@
+"""
+Request parts shared by the analysis and assistant schemas.
+
+metrics_data is validated through its columnar form: per-date records
+(lists of dicts) are transposed into ColumnarMetricsData before
+validation, so pydantic checks one dates list and one int list per metric
+instead of building a MetricsData model per record (~3-4x faster at 10k
+records, see benchmarks/bench_schema_validation.py). Handlers therefore
+always get ColumnarMetricsData; the OpenAPI schema still documents both
+layouts. When the columnar form does not validate, the records are
+validated as List[MetricsData] instead, so errors point at the bad record
+(["body", "metrics_data", 3, "date"]).
+"""
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError, WrapValidator, field_validator, model_validator
+from typing import Any, Dict, List, Literal, Optional, Union
+from typing_extensions import Annotated
+from datetime import date, datetime
+
+
+class RequestMeta(BaseModel):
+    request_id: str = Field(..., description="Unique request identifier")
+    timestamp: datetime = Field(..., description="Request creation timestamp (ISO 8601)")
+    mode_type: str = Field(..., description="Type of AI model to be used")
+    metrics_granularity: Literal["daily", "weekly", "monthly", "lttb"] = Field(
+        "daily", description="How the client downsampled metrics_data (daily = one record per day)"
+    )
+
+
+class Period(BaseModel):
+    start_date: date = Field(..., description="Analysis start date (YYYY-MM-DD)")
+    end_date: date = Field(..., description="Analysis end date (YYYY-MM-DD)")
+
+
+class Filters(BaseModel):
+    redmine_infra: List[str]
+    redmine_server: List[str]
+    redmine_instance: List[str]
+    project_identifier: List[str]
+    project_name: List[str]
+
+    filter_1: Optional[List[str]] = None
+    filter_2: Optional[List[str]] = None
+    filter_3: Optional[List[str]] = None
+    filter_4: Optional[List[str]] = None
+    filter_5: Optional[List[str]] = None
+
+
+class MetricsData(BaseModel):
+    date: date
+
+    test_case_expected: Optional[int] = Field(None, alias="TestCaseExpected")
+    test_case_expected_total: Optional[int] = Field(None, alias="TestCaseExpectedTotal")
+    test_case_actual: Optional[int] = Field(None, alias="TestCaseActual")
+    test_case_actual_total: Optional[int] = Field(None, alias="TestCaseActualTotal")
+
+    breport_expected: Optional[int] = Field(None, alias="BReportExpected")
+    breport_expected_total: Optional[int] = Field(None, alias="BReportExpectedTotal")
+    breport_actual: Optional[int] = Field(None, alias="BReportActual")
+    breport_actual_total: Optional[int] = Field(None, alias="BReportActualTotal")
+    breport_fixed: Optional[int] = Field(None, alias="BReportFixed")
+    breport_fixed_total: Optional[int] = Field(None, alias="BReportFixedTotal")
+    breport_outstanding: Optional[int] = Field(None, alias="BReportOutstanding")
+    breport_upper_bound: Optional[int] = Field(None, alias="BReportUpperBound")
+    breport_lower_bound: Optional[int] = Field(None, alias="BReportLowerBound")
+
+    model_config = {
+        "populate_by_name": True
+    }
+
+
+# Record key -> metric alias; field names are accepted too (populate_by_name)
+METRIC_KEYS: Dict[str, str] = {
+    **{name: field.alias for name, field in MetricsData.model_fields.items() if field.alias},
+    **{field.alias: field.alias for field in MetricsData.model_fields.values() if field.alias},
+}
+
+
+def _metric_sources(keys) -> Dict[str, List[str]]:
+    """alias -> the given keys that name it; keys that are not MetricsData fields are left out"""
+    sources: Dict[str, List[str]] = {}
+    for key in keys:
+        alias = METRIC_KEYS.get(key)
+        if alias is not None:
+            sources.setdefault(alias, []).append(key)
+    return sources
+
+
+class ColumnarMetricsData(BaseModel):
+    """
+    Columnar metrics_data: one dates array plus one integer array per metric
+    (keyed by the MetricsData aliases, e.g. "BReportFixed"), all the same length.
+    Sent by the extension with header X-Metrics-Format: columnar.
+    """
+    format: Literal["columnar"] = "columnar"
+    dates: List[date] = Field(..., description="One entry per record (YYYY-MM-DD)")
+    metrics: Dict[str, List[Optional[int]]] = Field(default_factory=dict)
+
+    @field_validator("metrics", mode="before")
+    @classmethod
+    def metric_aliases(cls, value: Any) -> Any:
+        # Same keys as the records layout: field names map to their alias, unknown metrics are dropped
+        if not isinstance(value, dict):
+            return value
+        return {alias: value[alias] if alias in keys else value[keys[0]] for alias, keys in _metric_sources(value).items()}
+
+    @model_validator(mode="after")
+    def check_lengths(self):
+        n_dates = len(self.dates)
+        for name, values in self.metrics.items():
+            if len(values) != n_dates:
+                raise ValueError(f"metrics[{name!r}] has {len(values)} values, expected {n_dates} (one per date)")
+        return self
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def to_records(self) -> List[dict]:
+        """Per-date dicts in the "records" layout (alias keys), for code written against it"""
+        names = list(self.metrics)
+        columns = [self.metrics[name] for name in names]
+        return [
+            {"date": day, **dict(zip(names, values))}
+            for day, *values in zip(self.dates, *columns)
+        ]
+
+
+def records_to_columnar(value: Any) -> Any:
+    """
+    Per-date records (dicts or MetricsData) -> the columnar dict (dates + one
+    list per metric alias). Keys that are not MetricsData fields are dropped,
+    as the record model ignores them. Anything else (columnar input, invalid
+    items) is returned unchanged for normal validation.
+    """
+    if not isinstance(value, list):
+        return value
+    if any(isinstance(record, MetricsData) for record in value):
+        value = [record.model_dump(by_alias=True) if isinstance(record, MetricsData) else record for record in value]
+    if not all(isinstance(record, dict) for record in value):
+        return value
+
+    metrics = {}
+    for alias, keys in _metric_sources(set().union(*value)).items():
+        if len(keys) == 1:
+            metrics[alias] = [record.get(keys[0]) for record in value]
+        else:
+            # Alias and field name both used: the alias wins, as in MetricsData
+            name = next(key for key in keys if key != alias)
+            metrics[alias] = [record[alias] if alias in record else record.get(name) for record in value]
+    return {"format": "columnar", "dates": [record.get("date") for record in value], "metrics": metrics}
+
+
+_records_adapter = TypeAdapter(List[MetricsData])
+
+
+def validate_metrics_data(value: Any, handler) -> Any:
+    """
+    Records are validated through their columnar form (fast path). If that
+    fails they are validated record by record, so the error carries the
+    record's index and field in its loc.
+    """
+    columnar = records_to_columnar(value)
+    if columnar is value:
+        return handler(value)
+    try:
+        return handler(columnar)
+    except ValidationError:
+        records = _records_adapter.validate_python(value)
+    return handler(records_to_columnar(records))
+
+
+# Per-date records, or the columnar layout (X-Metrics-Format: columnar);
+# both validate as ColumnarMetricsData
+MetricsDataInput = Annotated[Union[List[MetricsData], ColumnarMetricsData], WrapValidator(validate_metrics_data)]
@@ -1,8 +1,18 @@
+from typing import Optional
+
+from app.core.llm_client import LLMClient
+from app.core.response_cache import ResponseCache
+from app.services.base import BaseLLMService
+
 from app.models.schemas.analysis import AnalysisRequest
 
 
-class AnalysisService:
-    def __init__(self):
+class AnalysisService(BaseLLMService):
+    name = "analysis"
+    system_prompt = "You analyse bug management and test execution metrics. Answer in three sections: 1. Summary of Defect Detection Status, 2. Trend Analysis, 3. Future Concerns."
+
+    def __init__(self, response_cache: Optional[ResponseCache] = None, llm_client: Optional[LLMClient] = None):
+        super().__init__(response_cache, llm_client)
         self.supervisor = {
             "status": "success",
             "message": """1. Summary of Defect Detection Status
@@ -18,5 +28,9 @@ class AnalysisService:
 Recommended actions: Monitor bug patterns and allocate resources for early detection.""",
         }
 
-    def execute(self, request: AnalysisRequest):
-        return self.supervisor
\ No newline at end of file
+    def build_prompt(self, request: AnalysisRequest) -> str:
+        """Prompt context: derived metrics (app.services.analytics) instead of the raw rows"""
+        # numpy loads with the first prompt (or the startup warm-up), not at import
+        from app.services.analytics import summarize_text
+
+        return f"Mode: {request.request_meta.mode_type}\n{summarize_text(request.metrics_data, request.request_meta.metrics_granularity)}"
@@ -0,0 +1,253 @@
+"""
+Derived metrics computed from metrics_data before prompt construction.
+
+The daily counters are laid out as one float matrix (series x days, NaN
+where a day has no value) on a contiguous daily grid. Every statistic is
+a vectorized operation over that matrix, with no Python loop over days:
+  - week-over-week: last 7 days vs the 7 before (sums for daily counts,
+    end-of-week levels for cumulative totals / outstanding)
+  - 7-day rolling averages of the daily counts (latest value and peak)
+  - fix rate: fixed / reported bug reports
+  - progress: actual vs expected totals (test cases and bug reports)
+  - bound breaches: cumulative bug reports outside BReportLowerBound /
+    BReportUpperBound
+
+summarize() returns a small JSON-friendly dict and format_summary() renders
+it as a few lines of text, so the LLM gets the trend facts rather than
+hundreds of raw rows.
+
+Downsampled input (request_meta.metrics_granularity other than "daily")
+has one record per bucket with the counts summed over it, so the
+week-over-week and rolling figures, which assume one record per day, are
+left out; totals, rates and levels stay exact, and bound breaches are
+counted per record.
+"""
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.models.schemas.common import ColumnarMetricsData
+
+# Per-day counts: summed over a week, smoothed with a rolling mean
+DAILY_SERIES = ["TestCaseExpected", "TestCaseActual", "BReportExpected", "BReportActual", "BReportFixed"]
+# Levels (cumulative or point-in-time): compared end of week vs end of week
+LEVEL_SERIES = [
+    "TestCaseExpectedTotal", "TestCaseActualTotal", "BReportExpectedTotal", "BReportActualTotal",
+    "BReportFixedTotal", "BReportOutstanding",
+]
+BOUND_SERIES = "BReportActualTotal"
+UPPER_BOUND = "BReportUpperBound"
+LOWER_BOUND = "BReportLowerBound"
+SERIES = DAILY_SERIES + LEVEL_SERIES + [UPPER_BOUND, LOWER_BOUND]
+ROW = {name: i for i, name in enumerate(SERIES)}
+
+WEEK = 7
+ROLLING_WINDOW = 7
+DAILY = "daily"
+
+
+def to_matrix(metrics_data: ColumnarMetricsData) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (days, matrix): days is a contiguous datetime64[D] range from the first to
+    the last date; matrix[ROW[alias], day] holds the value or NaN. A date sent
+    twice keeps its last row.
+    """
+    dates = np.array(metrics_data.dates, dtype="datetime64[D]")
+    columns = {name: values for name, values in metrics_data.metrics.items() if name in ROW}
+
+    if dates.size == 0:
+        return np.array([], dtype="datetime64[D]"), np.full((len(SERIES), 0), np.nan)
+
+    start = dates.min()
+    days = np.arange(start, dates.max() + 1)
+    matrix = np.full((len(SERIES), days.size), np.nan)
+    offsets = (dates - start).astype(np.int64)
+    for name, values in columns.items():
+        # dtype=float turns None into NaN
+        matrix[ROW[name], offsets] = np.array(values, dtype=float)
+    return days, matrix
+
+
+def forward_fill(matrix: np.ndarray) -> np.ndarray:
+    """Carry the last observed value forward along each row (leading NaNs stay)"""
+    positions = np.where(np.isnan(matrix), 0, np.arange(matrix.shape[1]))
+    np.maximum.accumulate(positions, axis=1, out=positions)
+    return matrix[np.arange(matrix.shape[0])[:, None], positions]
+
+
+def rolling_mean(matrix: np.ndarray, window: int) -> np.ndarray:
+    """Trailing mean over `window` days ignoring NaNs (NaN where the window is empty)"""
+    values = np.nan_to_num(matrix)
+    counts = (~np.isnan(matrix)).astype(np.int64)
+    pad = ((0, 0), (1, 0))
+    value_sums = np.cumsum(np.pad(values, pad), axis=1)
+    count_sums = np.cumsum(np.pad(counts, pad), axis=1)
+    lag = np.maximum(np.arange(1, matrix.shape[1] + 1) - window, 0)
+    window_values = value_sums[:, 1:] - value_sums[:, lag]
+    window_counts = count_sums[:, 1:] - count_sums[:, lag]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(window_counts > 0, window_values / window_counts, np.nan)
+
+
+def _number(value: float, digits: int = 2) -> Optional[float]:
+    return None if value is None or not np.isfinite(value) else round(float(value), digits)
+
+
+def _ratio(numerator: float, denominator: float) -> Optional[float]:
+    if not (np.isfinite(numerator) and np.isfinite(denominator)) or denominator == 0:
+        return None
+    return round(float(numerator / denominator), 4)
+
+
+def _iso(day: np.datetime64) -> str:
+    return str(day.astype("datetime64[D]"))
+
+
+def _week_over_week(matrix: np.ndarray, filled: np.ndarray, n_days: int) -> Dict[str, Dict[str, Any]]:
+    daily = matrix[[ROW[name] for name in DAILY_SERIES]]
+    levels = filled[[ROW[name] for name in LEVEL_SERIES]]
+    present = ~np.all(np.isnan(matrix), axis=1)
+
+    last = np.concatenate([np.nansum(daily[:, -WEEK:], axis=1), levels[:, -1]])
+    if n_days >= 2 * WEEK:
+        previous = np.concatenate([np.nansum(daily[:, -2 * WEEK:-WEEK], axis=1), levels[:, -WEEK - 1]])
+    else:
+        previous = np.full(last.shape, np.nan)
+    delta = last - previous
+    with np.errstate(invalid="ignore", divide="ignore"):
+        pct = np.where(previous != 0, delta / np.abs(previous) * 100, np.nan)
+
+    result = {}
+    for i, name in enumerate(DAILY_SERIES + LEVEL_SERIES):
+        if present[ROW[name]]:
+            result[name] = {
+                "last_week": _number(last[i]),
+                "previous_week": _number(previous[i]),
+                "delta": _number(delta[i]),
+                "delta_pct": _number(pct[i], 1),
+            }
+    return result
+
+
+def _rolling(days: np.ndarray, matrix: np.ndarray) -> Dict[str, Dict[str, Any]]:
+    rows = [ROW[name] for name in DAILY_SERIES]
+    means = rolling_mean(matrix[rows], ROLLING_WINDOW)
+    result = {}
+    for i, name in enumerate(DAILY_SERIES):
+        series = means[i]
+        if np.all(np.isnan(series)):
+            continue
+        peak = int(np.nanargmax(series))
+        result[name] = {
+            "latest": _number(series[-1]),
+            "peak": _number(series[peak]),
+            "peak_date": _iso(days[peak]),
+        }
+    return result
+
+
+def _bound_breaches(days: np.ndarray, filled: np.ndarray, observed: Optional[np.ndarray] = None) -> Optional[Dict[str, Any]]:
+    """observed: only count these days (the record dates of downsampled input), not the filled grid"""
+    series = filled[ROW[BOUND_SERIES]]
+    upper, lower = filled[ROW[UPPER_BOUND]], filled[ROW[LOWER_BOUND]]
+    if np.all(np.isnan(series)) or (np.all(np.isnan(upper)) and np.all(np.isnan(lower))):
+        return None
+    counted = ~np.isnan(series) if observed is None else observed & ~np.isnan(series)
+    # Comparisons with NaN are False: days without a bound never count as breaches
+    above = (series > upper) & counted
+    below = (series < lower) & counted
+    breached = above | below
+
+    def days_of(mask: np.ndarray) -> Dict[str, Any]:
+        hits = np.flatnonzero(mask)
+        return {
+            "days": int(hits.size),
+            "first": _iso(days[hits[0]]) if hits.size else None,
+            "last": _iso(days[hits[-1]]) if hits.size else None,
+        }
+
+    status = "above_upper" if above[-1] else "below_lower" if below[-1] else "within"
+    return {
+        "series": BOUND_SERIES,
+        "above_upper": days_of(above),
+        "below_lower": days_of(below),
+        "breach_ratio": _ratio(np.count_nonzero(breached), np.count_nonzero(counted)),
+        "current": status,
+    }
+
+
+def summarize(metrics_data: ColumnarMetricsData, granularity: str = DAILY) -> Dict[str, Any]:
+    """Derived metrics for one request's metrics_data"""
+    days, matrix = to_matrix(metrics_data)
+    if days.size == 0:
+        return {"days": 0}
+    daily = granularity == DAILY
+    filled = forward_fill(matrix)
+    latest = filled[:, -1]
+
+    fix_rate = _ratio(latest[ROW["BReportFixedTotal"]], latest[ROW["BReportActualTotal"]])
+    if fix_rate is None and not np.all(np.isnan(matrix[ROW["BReportFixed"]])):
+        fix_rate = _ratio(np.nansum(matrix[ROW["BReportFixed"]]), np.nansum(matrix[ROW["BReportActual"]]))
+
+    return {
+        "start": _iso(days[0]),
+        "end": _iso(days[-1]),
+        "days": int(days.size),
+        "granularity": granularity,
+        "records": int(np.count_nonzero(~np.all(np.isnan(matrix), axis=0))),
+        "week_over_week": _week_over_week(matrix, filled, days.size) if daily else {},
+        "rolling_7d": _rolling(days, matrix) if daily else {},
+        "fix_rate": fix_rate,
+        "progress": {
+            "test_cases": _ratio(latest[ROW["TestCaseActualTotal"]], latest[ROW["TestCaseExpectedTotal"]]),
+            "bug_reports": _ratio(latest[ROW["BReportActualTotal"]], latest[ROW["BReportExpectedTotal"]]),
+        },
+        "outstanding": _number(latest[ROW["BReportOutstanding"]]),
+        "bound_breaches": _bound_breaches(days, filled, None if daily else ~np.all(np.isnan(matrix), axis=0)),
+    }
+
+
+def _pct(ratio: Optional[float]) -> str:
+    return "n/a" if ratio is None else f"{ratio * 100:.1f}%"
+
+
+def _num(value: Optional[float]) -> str:
+    return "n/a" if value is None else f"{value:g}"
+
+
+def format_summary(summary: Dict[str, Any]) -> str:
+    """Compact text block for the prompt"""
+    if not summary.get("days"):
+        return "No metrics data for the selected period."
+    lines: List[str] = [
+        f"Period {summary['start']} to {summary['end']} ({summary['days']} days).",
+        f"Fix rate {_pct(summary['fix_rate'])}; progress vs expected: test cases {_pct(summary['progress']['test_cases'])}, "
+        f"bug reports {_pct(summary['progress']['bug_reports'])}; outstanding {_num(summary['outstanding'])}.",
+    ]
+    daily = summary["granularity"] == DAILY
+    if not daily:
+        lines.append(
+            f"Data downsampled ({summary['granularity']}) to {summary['records']} records, counts summed per record; "
+            "no per-day or week-over-week figures."
+        )
+    for name, wow in summary["week_over_week"].items():
+        label = "last 7 days" if name in DAILY_SERIES else "now"
+        change = ""
+        if wow["delta"] is not None:
+            change = f" ({wow['delta']:+g}" + ("" if wow["delta_pct"] is None else f", {wow['delta_pct']:+.1f}%") + ")"
+        lines.append(f"{name}: {label} {_num(wow['last_week'])} vs {_num(wow['previous_week'])} a week before{change}.")
+    for name, rolling in summary["rolling_7d"].items():
+        lines.append(f"{name} 7-day avg {_num(rolling['latest'])} (peak {_num(rolling['peak'])} on {rolling['peak_date']}).")
+    breaches = summary["bound_breaches"]
+    if breaches:
+        unit = "days" if daily else "records"
+        lines.append(
+            f"{breaches['series']} above upper bound on {breaches['above_upper']['days']} {unit}, "
+            f"below lower bound on {breaches['below_lower']['days']} {unit}; currently {breaches['current'].replace('_', ' ')}."
+        )
+    return "\n".join(lines)
+
+
+def summarize_text(metrics_data: ColumnarMetricsData, granularity: str = DAILY) -> str:
+    return format_summary(summarize(metrics_data, granularity))
+
@@ -1,12 +1,27 @@
+from typing import Optional
+
+from app.core.llm_client import LLMClient
+from app.core.response_cache import ResponseCache
+from app.services.base import BaseLLMService
+
 from app.models.schemas.assistant import AssistantRequest
 
 
-class AssistantService:
-    def __init__(self):
+class AssistantService(BaseLLMService):
+    name = "assistant"
+    system_prompt = "You are an assistant for bug management and test execution metrics. Answer the user's question using the metrics summary."
+
+    def __init__(self, response_cache: Optional[ResponseCache] = None, llm_client: Optional[LLMClient] = None):
+        super().__init__(response_cache, llm_client)
         self.supervisor = {
             "status": "success",
             "message": """Hello! How can I assist you today?""",
         }
 
-    def execute(self, request: AssistantRequest):
-        return self.supervisor
+    def build_prompt(self, request: AssistantRequest) -> str:
+        """Prompt context: derived metrics (app.services.analytics) instead of the raw rows"""
+        # numpy loads with the first prompt (or the startup warm-up), not at import
+        from app.services.analytics import summarize_text
+
+        question = request.user_question or "Summarize the current status."
+        return f"Metrics:\n{summarize_text(request.metrics_data, request.request_meta.metrics_granularity)}\n\nQuestion: {question}"
@@ -0,0 +1,94 @@
+import abc
+import logging
+import re
+import time
+from typing import Any, AsyncIterator, Dict, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.llm_client import LLMClient
+from app.core.response_cache import ResponseCache, request_fingerprint
+
+logger = logging.getLogger(__name__)
+
+
+def split_words(message: str):
+    return re.findall(r"\s*\S+", message)
+
+
+class BaseLLMService(abc.ABC):
+    """
+    Async answer path shared by the analysis / assistant services: response
+    cache, prompt built off the event loop (numpy analytics is CPU work), and
+    the LLM awaited through the shared async client. The cache and client are
+    built and owned by the ServiceContainer; without an LLM client (no
+    LLM_API_URL) the service answers with its built-in `supervisor` message.
+    """
+
+    name = ""
+    system_prompt = ""
+
+    def __init__(self, response_cache: Optional[ResponseCache] = None, llm_client: Optional[LLMClient] = None):
+        self.response_cache = response_cache
+        self.llm_client = llm_client
+        self.supervisor: Dict[str, Any] = {"status": "success", "message": ""}
+
+    @abc.abstractmethod
+    def build_prompt(self, request) -> str:
+        """The LLM prompt for the request (CPU work, run in the threadpool)"""
+
+    async def prompt(self, request) -> str:
+        return await run_in_threadpool(self.build_prompt, request)
+
+    async def generate(self, request) -> Dict[str, Any]:
+        prompt = await self.prompt(request)
+        llm = self.llm_client
+        if llm is None:
+            logger.debug("Prompt context:\n%s", prompt)
+            return self.supervisor
+        return {"status": "success", "message": await llm.complete(prompt, self.system_prompt)}
+
+    async def generate_stream(self, request) -> AsyncIterator[str]:
+        prompt = await self.prompt(request)
+        llm = self.llm_client
+        if llm is None:
+            logger.debug("Prompt context:\n%s", prompt)
+            for chunk in split_words(self.supervisor["message"]):
+                yield chunk
+            return
+        async for chunk in llm.stream(prompt, self.system_prompt):
+            yield chunk
+
+    async def execute(self, request) -> Dict[str, Any]:
+        cache = self.response_cache
+        if cache is None or not cache.enabled:
+            return await self.generate(request)
+        key = request_fingerprint(self.name, request)
+        cached = await cache.aget(key)
+        if cached is not None:
+            return cached
+        started = time.perf_counter()
+        answer = await self.generate(request)
+        await cache.aset(key, answer, time.perf_counter() - started)
+        return answer
+
+    async def stream(self, request) -> AsyncIterator[str]:
+        """The answer in generation order, for SSE clients (cached answers are replayed word by word)"""
+        cache = self.response_cache
+        if cache is None or not cache.enabled:
+            async for chunk in self.generate_stream(request):
+                yield chunk
+            return
+        key = request_fingerprint(self.name, request)
+        cached = await cache.aget(key)
+        if cached is not None:
+            for chunk in split_words(cached["message"]):
+                yield chunk
+            return
+        started = time.perf_counter()
+        chunks = []
+        async for chunk in self.generate_stream(request):
+            chunks.append(chunk)
+            yield chunk
+        # Only a fully generated answer is stored
+        await cache.aset(key, {"status": "success", "message": "".join(chunks)}, time.perf_counter() - started)
@@ -0,0 +1,171 @@
+"""
+Benchmark: concurrent /api/v1/analysis calls, sync handler vs async path
+
+A stand-in LLM (OpenAI-compatible chat completions) answers after
+--llm-seconds. Two backends call it for each request, with the same
+validation and prompt (numpy analytics) work:
+  - sync:  the previous handler shape, a `def` route calling the LLM with a
+           blocking httpx.Client, so every in-flight request holds one of
+           FastAPI's threadpool threads (40 by default)
+  - async: the real app (create_app), `async def` route, AnalysisService
+           awaiting the shared httpx.AsyncClient; only the prompt build uses
+           the threadpool
+Each level fires N requests at once (distinct questions, response cache
+off) and reports wall time, throughput and latency percentiles. The LLM
+and each backend run under uvicorn in their own process, so the load
+generator does not share an event loop with the servers. With few CPU
+cores, past some level the async numbers measure the CPU (all processes
+share it) rather than the backend.
+
+Usage:
+    python benchmarks/bench_concurrency.py [--levels 40 80 160 320] [--llm-seconds 3.0] [--days 30]
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import multiprocessing
+import os
+import socket
+import statistics
+import sys
+import time
+
+import httpx
+import uvicorn
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ["RESPONSE_CACHE_BACKEND"] = "none"
+os.environ["LLM_MAX_CONNECTIONS"] = "1000"
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class StandInLLM:
+    """ASGI chat completions endpoint with a fixed generation time"""
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return
+        while (await receive()).get("more_body"):
+            pass
+        await asyncio.sleep(self.seconds)
+        body = json.dumps({"choices": [{"message": {"role": "assistant", "content": "analysis result"}}]}).encode()
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"application/json")]})
+        await send({"type": "http.response.body", "body": body})
+
+
+def legacy_app(llm_url: str):
+    """The handler as it was: sync def, blocking LLM call on a threadpool thread"""
+    from fastapi import FastAPI
+
+    from app.models.schemas.analysis import AnalysisRequest
+    from app.services.analysis_service import AnalysisService
+
+    app = FastAPI()
+    client = httpx.Client(timeout=120, limits=httpx.Limits(max_connections=1000))
+
+    @app.post("/api/v1/analysis")
+    def analyze_bug_management(request: AnalysisRequest):
+        service = AnalysisService()
+        prompt = service.build_prompt(request)
+        body = {"messages": [{"role": "system", "content": service.system_prompt}, {"role": "user", "content": prompt}]}
+        message = client.post(llm_url, json=body).json()["choices"][0]["message"]["content"]
+        return {"status": "success", "message": message}
+
+    return app
+
+
+def make_payload(days: int, i: int) -> dict:
+    start = datetime.date(2025, 1, 1)
+    return {
+        "request_meta": {"request_id": f"r{i}", "timestamp": "2025-01-01T00:00:00", "mode_type": "Analyze Report"},
+        "period": {"start_date": str(start), "end_date": str(start + datetime.timedelta(days=days - 1))},
+        "filters": {"redmine_infra": [], "redmine_server": [], "redmine_instance": [], "project_identifier": ["A"], "project_name": []},
+        "metrics_data": [
+            {"date": str(start + datetime.timedelta(days=d)), "BReportActual": d % 7, "BReportActualTotal": d * 3,
+             "BReportFixedTotal": d * 2, "BReportUpperBound": d * 4, "BReportLowerBound": d * 2}
+            for d in range(days)
+        ],
+        "user_question": f"question {i}",
+    }
+
+
+def serve(kind: str, port: int, llm_url: str, llm_seconds: float):
+    if kind == "llm":
+        app, lifespan = StandInLLM(llm_seconds), "off"
+    elif kind == "sync":
+        app, lifespan = legacy_app(llm_url), "auto"
+    else:
+        os.environ["LLM_API_URL"] = llm_url
+        from app.main import create_app
+
+        app, lifespan = create_app(), "auto"
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="critical", lifespan=lifespan, backlog=4096)
+
+
+def start(kind: str, llm_url: str, llm_seconds: float):
+    port = free_port()
+    process = multiprocessing.Process(target=serve, args=(kind, port, llm_url, llm_seconds), daemon=True)
+    process.start()
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        with socket.socket() as sock:
+            if sock.connect_ex(("127.0.0.1", port)) == 0:
+                return process, port
+        time.sleep(0.1)
+    raise SystemExit(f"{kind} server did not start")
+
+
+async def fire(url: str, n: int, days: int):
+    headers = {"x-api-key": "EXPECTED_API_KEY", "Authorization": "Bearer 123bench"}
+    payloads = [make_payload(days, i) for i in range(n)]
+    limits = httpx.Limits(max_connections=n, max_keepalive_connections=n)
+    async with httpx.AsyncClient(timeout=300, limits=limits) as client:
+        async def one(payload):
+            started = time.perf_counter()
+            response = await client.post(url, json=payload, headers=headers)
+            return response.status_code, time.perf_counter() - started
+
+        started = time.perf_counter()
+        results = await asyncio.gather(*(one(p) for p in payloads))
+        wall = time.perf_counter() - started
+    latencies = sorted(r[1] for r in results)
+    ok = sum(r[0] == 200 for r in results)
+    return ok, wall, statistics.median(latencies), latencies[max(0, int(len(latencies) * 0.95) - 1)]
+
+
+async def main(args):
+    llm, llm_port = start("llm", "", args.llm_seconds)
+    llm_url = f"http://127.0.0.1:{llm_port}/v1/chat/completions"
+    servers = {}
+    for label in ("sync", "async"):
+        process, port = start(label, llm_url, args.llm_seconds)
+        servers[label] = (process, f"http://127.0.0.1:{port}/api/v1/analysis")
+
+    print(f"LLM generation {args.llm_seconds:.1f}s, metrics_data {args.days} days")
+    print(f"{'handler':<7} {'concurrent':>10} {'ok':>5} {'wall (s)':>9} {'req/s':>7} {'p50 (s)':>8} {'p95 (s)':>8}")
+    for level in args.levels:
+        for label, (_, url) in servers.items():
+            await fire(url, 4, args.days)  # warm-up
+            ok, wall, p50, p95 = await fire(url, level, args.days)
+            print(f"{label:<7} {level:>10} {ok:>5} {wall:>9.2f} {ok / wall:>7.1f} {p50:>8.2f} {p95:>8.2f}")
+
+    for process in [llm, *(process for process, _ in servers.values())]:
+        process.terminate()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backend concurrency benchmark")
+    parser.add_argument("--levels", type=int, nargs="+", default=[40, 80, 160, 320])
+    parser.add_argument("--llm-seconds", type=float, default=3.0)
+    parser.add_argument("--days", type=int, default=30)
+    asyncio.run(main(parser.parse_args()))
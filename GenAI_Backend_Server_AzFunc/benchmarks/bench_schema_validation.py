@@ -0,0 +1,83 @@
+"""
+Benchmark: AnalysisRequest validation, per-record models vs columnar path
+
+  - before: metrics_data as Union[List[MetricsData], ColumnarMetricsData]
+            (the previous schema), one MetricsData model per record
+  - after:  the shared MetricsDataInput (app.models.schemas.common), records
+            transposed and validated as ColumnarMetricsData
+  - columnar wire format (X-Metrics-Format: columnar) through the new
+    schema, for reference
+Input is the parsed JSON body (what FastAPI hands to pydantic), all 13
+metrics per record. Best of --repeat runs.
+
+Usage:
+    python benchmarks/bench_schema_validation.py [--records 365 3650 10000 50000] [--repeat 5]
+"""
+import argparse
+import datetime
+import os
+import sys
+import time
+from typing import List, Optional, Union
+
+from pydantic import BaseModel
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models.schemas.analysis import AnalysisRequest
+from app.models.schemas.common import METRIC_KEYS, ColumnarMetricsData, Filters, MetricsData, Period, RequestMeta
+
+ALIASES = sorted(set(METRIC_KEYS.values()))
+
+
+class LegacyAnalysisRequest(BaseModel):
+    """The request model before the shared schema module"""
+    request_meta: RequestMeta
+    period: Period
+    filters: Filters
+    metrics_data: Union[List[MetricsData], ColumnarMetricsData]
+    user_question: Optional[str] = None
+
+
+def make_body(n: int, columnar: bool = False) -> dict:
+    start = datetime.date(2000, 1, 1)
+    dates = [str(start + datetime.timedelta(days=d)) for d in range(n)]
+    metrics = {alias: [d * (i + 1) % 997 for d in range(n)] for i, alias in enumerate(ALIASES)}
+    if columnar:
+        metrics_data = {"format": "columnar", "dates": dates, "metrics": metrics}
+    else:
+        metrics_data = [{"date": day, **{alias: metrics[alias][d] for alias in ALIASES}} for d, day in enumerate(dates)]
+    return {
+        "request_meta": {"request_id": "bench", "timestamp": "2025-01-01T00:00:00", "mode_type": "Analyze Report"},
+        "period": {"start_date": dates[0], "end_date": dates[-1]},
+        "filters": {"redmine_infra": [], "redmine_server": [], "redmine_instance": [], "project_identifier": ["A"], "project_name": []},
+        "metrics_data": metrics_data,
+    }
+
+
+def best_ms(model, body: dict, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        model.model_validate(body)
+        times.append(time.perf_counter() - started)
+    return min(times) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="metrics_data validation benchmark")
+    parser.add_argument("--records", type=int, nargs="+", default=[365, 3650, 10000, 50000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'records':>8} {'before (ms)':>12} {'after (ms)':>11} {'speedup':>8} {'columnar in (ms)':>17}")
+    for n in args.records:
+        records, columnar = make_body(n), make_body(n, columnar=True)
+        before = best_ms(LegacyAnalysisRequest, records, args.repeat)
+        after = best_ms(AnalysisRequest, records, args.repeat)
+        wire = best_ms(AnalysisRequest, columnar, args.repeat)
+        print(f"{n:>8} {before:>12.1f} {after:>11.1f} {before / after:>7.1f}x {wire:>17.1f}")
+
+
+if __name__ == "__main__":
+    main()
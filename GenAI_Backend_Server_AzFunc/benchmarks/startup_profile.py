@@ -0,0 +1,205 @@
+"""
+Cold-start profile and budget check for the Function app
+
+Every measurement runs in a fresh interpreter, the way a cold Functions
+worker does:
+  - import time: `python -X importtime -c "import <target>"`, parsed into the
+    slowest modules (cumulative) and self time per top-level package
+  - cold start: import, app startup (lifespan: services + warm-up) and the
+    first /api/v1/analysis response, driven over raw ASGI in the child
+    process, plus the wall time of the whole process; the prompt warm-up
+    (numpy) runs in the background, so numpy should not be loaded when
+    startup returns, only by the first analysis response
+  - eager imports: modules that must not be loaded by importing the target
+    (heavy dependencies that are supposed to load lazily)
+
+With budgets given, exits with status 1 when one is exceeded, so it can
+run as a CI step:
+    python benchmarks/startup_profile.py --repeat 5 --budget-import-ms 1500 --budget-first-response-ms 2500
+
+Usage:
+    python benchmarks/startup_profile.py [--target app.main] [--repeat 3] [--top 15]
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Loaded on first use only (LLM client, prompt analytics, DAL, unused SDKs)
+LAZY_MODULES = ["httpx", "numpy", "sqlalchemy", "jose", "opencensus", "pandas"]
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+COLD_START = r"""
+import asyncio, json, sys, time
+started = time.perf_counter()
+import {target} as target_module
+imported = time.perf_counter()
+app = getattr(target_module, "fastapi_app", None) or target_module.app
+
+body = json.dumps({{
+    "request_meta": {{"request_id": "cold", "timestamp": "2025-01-01T00:00:00", "mode_type": "Analyze Report"}},
+    "period": {{"start_date": "2025-01-01", "end_date": "2025-01-28"}},
+    "filters": {{"redmine_infra": [], "redmine_server": [], "redmine_instance": [], "project_identifier": ["A"], "project_name": []}},
+    "metrics_data": [{{"date": "2025-01-%02d" % d, "BReportActual": d, "BReportActualTotal": d * d}} for d in range(1, 29)],
+}}).encode()
+
+async def request():
+    scope = {{
+        "type": "http", "asgi": {{"version": "3.0"}}, "http_version": "1.1", "method": "POST", "scheme": "http",
+        "path": "/api/v1/analysis", "raw_path": b"/api/v1/analysis", "query_string": b"", "root_path": "",
+        "headers": [(b"content-type", b"application/json"), (b"x-api-key", b"EXPECTED_API_KEY"),
+                    (b"authorization", b"Bearer 123cold"), (b"content-length", str(len(body)).encode())],
+        "client": ("127.0.0.1", 1), "server": ("127.0.0.1", 80), "state": {{}},
+    }}
+    messages = [{{"type": "http.request", "body": body, "more_body": False}}]
+    status = []
+
+    async def receive():
+        return messages.pop(0) if messages else {{"type": "http.disconnect"}}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status.append(message["status"])
+
+    await app(scope, receive, send)
+    return status[0]
+
+async def main():
+    async with app.router.lifespan_context(app):
+        started_up = time.perf_counter()
+        at_startup = sorted(name for name in {lazy!r} if name in sys.modules)
+        status = await request()
+        first = time.perf_counter()
+    return started_up, at_startup, first, status
+
+started_up, at_startup, first, status = asyncio.run(main())
+print(json.dumps({{
+    "import_ms": (imported - started) * 1000,
+    "startup_ms": (started_up - imported) * 1000,
+    "first_request_ms": (first - started_up) * 1000,
+    "first_response_ms": (first - started) * 1000,
+    "status": status,
+    "loaded_at_startup": at_startup,
+    "loaded": sorted(name for name in {lazy!r} if name in sys.modules),
+}}))
+"""
+
+
+def child_env():
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [ROOT, env.get("PYTHONPATH")]))
+    env.setdefault("LOG_LEVEL", "WARNING")
+    env.setdefault("RESPONSE_CACHE_BACKEND", "memory")
+    return env
+
+
+def import_profile(target: str):
+    """{module: (self_us, cumulative_us, depth)} for one fresh import of target"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        capture_output=True, text=True, env=child_env(), cwd=ROOT,
+    )
+    if result.returncode != 0:
+        raise SystemExit(f"import {target} failed:\n{result.stderr[-2000:]}")
+    modules = {}
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            modules[name] = (int(self_us), int(cumulative_us), len(indent) // 2)
+    return modules
+
+
+def eager_imports(target: str):
+    code = f"import sys, json; import {target}; print(json.dumps(sorted(n for n in {LAZY_MODULES!r} if n in sys.modules)))"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, env=child_env(), cwd=ROOT)
+    if result.returncode != 0:
+        raise SystemExit(f"import {target} failed:\n{result.stderr[-2000:]}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def cold_start(target: str):
+    code = COLD_START.format(target=target, lazy=LAZY_MODULES)
+    started = time.perf_counter()
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, env=child_env(), cwd=ROOT)
+    wall_ms = (time.perf_counter() - started) * 1000
+    if result.returncode != 0:
+        raise SystemExit(f"cold start failed:\n{result.stderr[-2000:]}")
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    timings["process_ms"] = wall_ms
+    return timings
+
+
+def report_imports(profiles, target: str, top: int):
+    # Best run per module: the least disturbed by other load on the machine
+    modules = {}
+    for profile in profiles:
+        for name, (self_us, cumulative_us, depth) in profile.items():
+            best = modules.get(name)
+            if best is None or cumulative_us < best[1]:
+                modules[name] = (self_us, cumulative_us, depth)
+    total_ms = modules[target][1] / 1000 if target in modules else sum(v[0] for v in modules.values()) / 1000
+
+    print(f"\nimport {target}: {total_ms:.0f} ms (best of {len(profiles)})")
+    print(f"  {'slowest modules (cumulative)':<50} {'cum ms':>8} {'self ms':>8}")
+    for name, (self_us, cumulative_us, _) in sorted(modules.items(), key=lambda kv: -kv[1][1])[:top]:
+        print(f"  {name:<50} {cumulative_us / 1000:>8.1f} {self_us / 1000:>8.1f}")
+
+    packages = defaultdict(int)
+    for name, (self_us, _, _) in modules.items():
+        packages[name.split(".")[0]] += self_us
+    print(f"  {'self time by package':<50} {'ms':>8} {'share':>8}")
+    package_total = sum(packages.values()) or 1
+    for package, self_us in sorted(packages.items(), key=lambda kv: -kv[1])[:top]:
+        print(f"  {package:<50} {self_us / 1000:>8.1f} {self_us / package_total:>8.0%}")
+    return total_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold-start profile and budget check")
+    parser.add_argument("--target", default="app.main", help="module to import (function_app needs azure-functions)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--budget-import-ms", type=float, default=0, help="median import time budget (0 = no check)")
+    parser.add_argument("--budget-first-response-ms", type=float, default=0,
+                        help="median import + startup + first response budget (0 = no check)")
+    args = parser.parse_args()
+
+    report_imports([import_profile(args.target) for _ in range(args.repeat)], args.target, args.top)
+
+    runs = [cold_start(args.target) for _ in range(args.repeat)]
+    print(f"\ncold start, median of {args.repeat} fresh processes (first response status {runs[0]['status']})")
+    for key in ("import_ms", "startup_ms", "first_request_ms", "first_response_ms", "process_ms"):
+        print(f"  {key:<20} {statistics.median(r[key] for r in runs):>8.1f}")
+
+    eager = eager_imports(args.target)
+    print(f"\nlazy modules loaded by importing {args.target}: {', '.join(eager) or 'none'}")
+    print(f"lazy modules loaded when startup returned: {', '.join(runs[0]['loaded_at_startup']) or 'none'}")
+    print(f"lazy modules loaded by the first response: {', '.join(runs[0]['loaded']) or 'none'}")
+
+    failures = []
+    if eager:
+        failures.append(f"imported eagerly: {', '.join(eager)}")
+    if runs[0]["status"] != 200:
+        failures.append(f"first response status {runs[0]['status']}")
+    median_import = statistics.median(r["import_ms"] for r in runs)
+    if args.budget_import_ms and median_import > args.budget_import_ms:
+        failures.append(f"import {median_import:.0f} ms > budget {args.budget_import_ms:.0f} ms")
+    median_first = statistics.median(r["first_response_ms"] for r in runs)
+    if args.budget_first_response_ms and median_first > args.budget_first_response_ms:
+        failures.append(f"first response {median_first:.0f} ms > budget {args.budget_first_response_ms:.0f} ms")
+
+    if failures:
+        print("\nBUDGET CHECK FAILED: " + "; ".join(failures))
+        sys.exit(1)
+    print(f"\nbudget check passed (import {median_import:.0f} ms, first response {median_first:.0f} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Check the data access layer against SQLite standing in for Azure SQL
+
+DATABASE_URL points app.db.session at a temporary SQLite file; the view's
+schema [bug-management_dm_11] is an attached database on every pooled
+connection, so analysis_report.sql runs unchanged. Checks:
+  - fetch_analysis_report: expanding IN lists for project_identifier_list and
+    filterN_list, empty / missing filter lists not restricting, date range, order
+  - load_sql / prepared_statement: the SQL file is read once and one text()
+    construct is reused, whatever the list lengths
+  - the pool: one engine, connections checked out and returned
+
+Usage:
+    python benchmarks/verify_dal_sqlite.py [--rows 5000] [--calls 200]
+"""
+import argparse
+import datetime
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+WORKDIR = tempfile.mkdtemp(prefix="dal_sqlite_")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(WORKDIR, 'main.db')}"
+
+from sqlalchemy import event  # noqa: E402
+
+from app.dal import base  # noqa: E402
+from app.dal.analysis_dal import AnalysisDAL  # noqa: E402
+from app.db.session import engine  # noqa: E402
+
+SCHEMA = "bug-management_dm_11"
+METRICS = [
+    "TestCaseExpected", "TestCaseActual", "BReportExpected", "BReportUpperBound", "BReportLowerBound",
+    "BReportActual", "BReportFixed", "TestCaseExpectedTotal", "TestCaseActualTotal", "BReportExpectedTotal",
+    "BReportActualTotal", "BReportFixedTotal", "BReportOutstanding",
+]
+PROJECTS = [f"PRJ_{i}" for i in range(20)]
+FILTER_VALUES = ["a", "b", "c", "d"]
+
+
+@event.listens_for(engine, "connect")
+def attach_schema(dbapi_connection, _):
+    dbapi_connection.execute(f"ATTACH DATABASE '{os.path.join(WORKDIR, 'dm.db')}' AS [{SCHEMA}]")
+
+
+def seed(rows: int):
+    rng = random.Random(0)
+    start = datetime.date(2025, 1, 1)
+    records = []
+    for i in range(rows):
+        records.append({
+            "date": (start + datetime.timedelta(days=rng.randrange(365))).isoformat(),
+            "redmine_infra": "infra", "redmine_server": "server", "redmine_instance": "instance",
+            "project_identifier": rng.choice(PROJECTS),
+            **{f"filter{n}": rng.choice(FILTER_VALUES) for n in range(1, 6)},
+            **{metric: rng.randrange(100) for metric in METRICS},
+        })
+    columns = list(records[0])
+    with engine.begin() as conn:
+        conn.exec_driver_sql(f"CREATE TABLE [{SCHEMA}].vw_bug_report_by_testplan ({', '.join(columns)})")
+        conn.exec_driver_sql(
+            f"INSERT INTO [{SCHEMA}].vw_bug_report_by_testplan VALUES ({', '.join('?' * len(columns))})",
+            [tuple(r[c] for c in columns) for r in records],
+        )
+    return records
+
+
+def expected_rows(records, projects, filters, start, end):
+    return sorted(
+        (r for r in records
+         if start <= r["date"] <= end and r["project_identifier"] in projects
+         and all(not values or r[f"filter{n}"] in values for n, values in enumerate(filters, start=1))),
+        key=lambda r: r["date"],
+    )
+
+
+def fetch(dal, projects, filters, start="2025-02-01", end="2025-05-31"):
+    return dal.fetch_analysis_report(start, end, "infra", "server", "instance", projects, *filters)
+
+
+def check(condition: bool, label: str):
+    print(f"  {'ok  ' if condition else 'FAIL'} {label}")
+    if not condition:
+        raise SystemExit(1)
+
+
+def main(args):
+    records = seed(args.rows)
+    dal = AnalysisDAL()
+    print(f"SQLite stand-in: {args.rows} rows in [{SCHEMA}].vw_bug_report_by_testplan")
+
+    cases = [
+        (["PRJ_1"], [None] * 5),
+        (PROJECTS[:7], [["a", "b"], [], None, ["c"], None]),
+        (PROJECTS, [["a"], ["b"], ["c"], ["d"], ["a", "b", "c", "d"]]),
+        (["NOPE"], [None] * 5),
+    ]
+    for projects, filters in cases:
+        rows = fetch(dal, projects, filters)
+        expected = expected_rows(records, projects, filters, "2025-02-01", "2025-05-31")
+        same = [r["date"] for r in rows] == [r["date"] for r in expected] and all(
+            [row[m] for m in METRICS] == [want[m] for m in METRICS] for row, want in zip(rows, expected)
+        ) if len(rows) == len(expected) else False
+        check(same, f"{len(projects)} project(s), filters {filters}: {len(rows)} rows")
+
+    check(dal.fetch_all()[0]["sample_column"] == 1, "fetch_all")
+
+    base.load_sql.cache_clear()
+    base.prepared_statement.cache_clear()
+    started = time.perf_counter()
+    rng = random.Random(1)
+    for _ in range(args.calls):
+        fetch(dal, rng.sample(PROJECTS, rng.randint(1, 10)), [rng.sample(FILTER_VALUES, rng.randint(0, 3)) for _ in range(5)])
+    elapsed = time.perf_counter() - started
+    check(base.load_sql.cache_info().misses == 1, f"SQL file read once for {args.calls} calls ({base.load_sql.cache_info()})")
+    check(base.prepared_statement.cache_info().currsize == 1, f"one prepared statement for varying list lengths")
+    check(engine.pool.checkedout() == 0, f"pool: all connections returned ({engine.pool.status()})")
+    print(f"  {args.calls} report queries in {elapsed:.2f}s ({elapsed / args.calls * 1000:.2f} ms each)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="DAL check against SQLite")
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--calls", type=int, default=200)
+    main(parser.parse_args())
@@ -0,0 +1,10 @@
+import os
+import sys
+
+# The module-level engine in app.db.session must not need pyodbc / Azure SQL;
+# DAL tests pass their own engine
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+BACKEND_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, BACKEND_ROOT)
@@ -0,0 +1,83 @@
+"""
+AnalysisDAL.fetch_analysis_report against an in-memory SQLite database
+standing in for Azure SQL (the view's schema is an attached database, as in
+benchmarks/verify_dal_sqlite.py), so analysis_report.sql runs unchanged.
+"""
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.pool import StaticPool
+
+from app.dal import base
+from app.dal.analysis_dal import AnalysisDAL
+
+SCHEMA = "bug-management_dm_11"
+METRICS = [
+    "TestCaseExpected", "TestCaseActual", "BReportExpected", "BReportUpperBound", "BReportLowerBound",
+    "BReportActual", "BReportFixed", "TestCaseExpectedTotal", "TestCaseActualTotal", "BReportExpectedTotal",
+    "BReportActualTotal", "BReportFixedTotal", "BReportOutstanding",
+]
+COLUMNS = ["date", "redmine_infra", "redmine_server", "redmine_instance", "project_identifier",
+           "filter1", "filter2", "filter3", "filter4", "filter5", *METRICS]
+ROWS = [
+    # date, project, filter1, filter2, BReportActual
+    ("2025-01-03", "A", "x", "p", 3),
+    ("2025-01-01", "A", "y", "p", 1),
+    ("2025-01-02", "B", "x", "q", 2),
+    ("2025-01-04", "C", "x", "p", 4),
+    ("2024-12-31", "A", "x", "p", 0),
+]
+
+
+@pytest.fixture
+def dal():
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+
+    @event.listens_for(engine, "connect")
+    def attach_schema(dbapi_connection, _):
+        dbapi_connection.execute(f"ATTACH DATABASE ':memory:' AS [{SCHEMA}]")
+
+    with engine.begin() as conn:
+        conn.exec_driver_sql(f"CREATE TABLE [{SCHEMA}].vw_bug_report_by_testplan ({', '.join(COLUMNS)})")
+        conn.exec_driver_sql(
+            f"INSERT INTO [{SCHEMA}].vw_bug_report_by_testplan VALUES ({', '.join('?' * len(COLUMNS))})",
+            [(day, "infra", "server", "instance", project, f1, f2, "z", "z", "z",
+              *(actual if metric == "BReportActual" else 0 for metric in METRICS))
+             for day, project, f1, f2, actual in ROWS],
+        )
+    yield AnalysisDAL(engine)
+    engine.dispose()
+
+
+def fetch(dal, projects, filter1=None, filter2=None):
+    return dal.fetch_analysis_report(
+        "2025-01-01", "2025-01-31", "infra", "server", "instance", projects, filter1, filter2, None, [], None,
+    )
+
+
+def test_rows_in_period_ordered_by_date(dal):
+    rows = fetch(dal, ["A", "B", "C"])
+    assert [row["date"] for row in rows] == ["2025-01-01", "2025-01-02", "2025-01-03", "2025-01-04"]
+    assert [row["BReportActual"] for row in rows] == [1, 2, 3, 4]
+
+
+def test_project_list_is_expanded(dal):
+    assert [row["BReportActual"] for row in fetch(dal, ["A"])] == [1, 3]
+    assert [row["BReportActual"] for row in fetch(dal, ["A", "C"])] == [1, 3, 4]
+    assert fetch(dal, ["NOPE"]) == []
+
+
+def test_empty_project_list_matches_nothing(dal):
+    assert fetch(dal, []) == []
+
+
+def test_filters_restrict_only_when_given(dal):
+    # filter1 given; filter2 empty / filter3-5 missing set filterN_all and do not restrict
+    assert [row["BReportActual"] for row in fetch(dal, ["A", "B", "C"], filter1=["x"], filter2=[])] == [2, 3, 4]
+    assert [row["BReportActual"] for row in fetch(dal, ["A", "B", "C"], filter1=["x"], filter2=["p"])] == [3, 4]
+
+
+def test_one_statement_for_any_list_lengths(dal):
+    base.prepared_statement.cache_clear()
+    fetch(dal, ["A"], filter1=["x"])
+    fetch(dal, ["A", "B", "C"], filter1=["x", "y"], filter2=["p", "q"])
+    assert base.prepared_statement.cache_info().currsize == 1
@@ -0,0 +1,108 @@
+"""
+Downsampled metrics_data (weekly buckets, as the extension sends them with
+METRICS_DOWNSAMPLE) through the request schema and app.services.analytics:
+bucketed records must not be read as daily counts.
+"""
+import datetime
+
+import numpy as np
+import pytest
+
+from app.models.schemas.analysis import AnalysisRequest
+from app.services.analysis_service import AnalysisService
+from app.services.analytics import summarize, summarize_text
+
+N_DAYS = 1100
+# Per-day counts, summed per bucket; every other metric keeps the bucket's last day
+FLOW_METRICS = ("BReportActual", "BReportFixed")
+
+
+@pytest.fixture(scope="module")
+def daily_records():
+    rng = np.random.default_rng(7)
+    start = datetime.date(2022, 1, 1)
+    actual = rng.integers(0, 10, N_DAYS)
+    fixed = np.minimum(actual, rng.integers(0, 8, N_DAYS))
+    actual_total, fixed_total = np.cumsum(actual), np.cumsum(fixed)
+    return [
+        {
+            "date": str(start + datetime.timedelta(days=d)),
+            "BReportActual": int(actual[d]),
+            "BReportFixed": int(fixed[d]),
+            "BReportActualTotal": int(actual_total[d]),
+            "BReportFixedTotal": int(fixed_total[d]),
+            "BReportOutstanding": int(actual_total[d] - fixed_total[d]),
+            "BReportUpperBound": 4 * d + 50,
+            "BReportLowerBound": 4 * d - 50,
+        }
+        for d in range(N_DAYS)
+    ]
+
+
+def backend_request(records, granularity):
+    # What the extension's build_backend_payload sends
+    return AnalysisRequest.model_validate({
+        "request_meta": {"request_id": "t", "timestamp": "2025-01-01T00:00:00", "mode_type": "Analyze Report",
+                         "metrics_granularity": granularity},
+        "period": {"start_date": records[0]["date"], "end_date": records[-1]["date"]},
+        "filters": {"redmine_infra": [], "redmine_server": [], "redmine_instance": [], "project_identifier": [], "project_name": []},
+        "metrics_data": records,
+    })
+
+
+def weekly_buckets(records):
+    """
+    7-day buckets counted back from the last day (the first one partial),
+    each dated on its last day, the layout of the extension's weekly downsampling
+    """
+    buckets, start = [], 0
+    for end in reversed(range(len(records), 0, -7)):
+        week = records[start:end]
+        bucket = dict(week[-1])
+        for name in FLOW_METRICS:
+            bucket[name] = sum(record[name] for record in week)
+        buckets.append(bucket)
+        start = end
+    return buckets
+
+
+@pytest.fixture(scope="module")
+def downsampled(daily_records):
+    return backend_request(weekly_buckets(daily_records), "weekly")
+
+
+def test_daily_week_over_week_is_exact(daily_records):
+    request = backend_request(daily_records, "daily")
+    wow = summarize(request.metrics_data)["week_over_week"]["BReportActual"]
+    assert wow["last_week"] == sum(r["BReportActual"] for r in daily_records[-7:])
+    assert wow["previous_week"] == sum(r["BReportActual"] for r in daily_records[-14:-7])
+
+
+def test_downsampled_input_has_no_daily_window_facts(downsampled):
+    granularity = downsampled.request_meta.metrics_granularity
+    summary = summarize(downsampled.metrics_data, granularity)
+    assert summary["week_over_week"] == {}
+    assert summary["rolling_7d"] == {}
+    text = summarize_text(downsampled.metrics_data, granularity)
+    assert "7-day avg" not in text and "a week before" not in text
+    assert "downsampled (weekly)" in text
+
+
+def test_downsampled_levels_and_rates_match_daily(daily_records, downsampled):
+    daily = summarize(backend_request(daily_records, "daily").metrics_data)
+    bucketed = summarize(downsampled.metrics_data, downsampled.request_meta.metrics_granularity)
+    for key in ("start", "end", "days", "fix_rate", "progress", "outstanding"):
+        assert bucketed[key] == daily[key]
+
+
+def test_downsampled_bound_breaches_count_records(downsampled):
+    summary = summarize(downsampled.metrics_data, downsampled.request_meta.metrics_granularity)
+    breaches = summary["bound_breaches"]
+    assert breaches["above_upper"]["days"] + breaches["below_lower"]["days"] <= summary["records"]
+    assert summary["records"] == len(downsampled.metrics_data)
+
+
+def test_prompt_uses_request_granularity(downsampled):
+    prompt = AnalysisService().build_prompt(downsampled)
+    assert "downsampled (weekly)" in prompt and "7-day avg" not in prompt
+
@@ -0,0 +1,50 @@
+"""
+metrics_data validation: records go through the columnar fast path, but a bad
+record is still reported at its own index and field.
+"""
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.models.schemas.analysis import AnalysisRequest
+from app.models.schemas.common import ColumnarMetricsData
+
+HEADERS = {"x-api-key": "EXPECTED_API_KEY", "authorization": "Bearer 123test"}
+
+
+def analysis_body(metrics_data):
+    return {
+        "request_meta": {"request_id": "t", "timestamp": "2025-01-01T00:00:00", "mode_type": "Analyze Report"},
+        "period": {"start_date": "2025-01-01", "end_date": "2025-01-03"},
+        "filters": {"redmine_infra": [], "redmine_server": [], "redmine_instance": [], "project_identifier": ["A"], "project_name": []},
+        "metrics_data": metrics_data,
+    }
+
+
+def post_analysis(metrics_data):
+    with TestClient(app) as client:
+        return client.post("/api/v1/analysis", json=analysis_body(metrics_data), headers=HEADERS)
+
+
+def test_bad_record_date_is_located():
+    response = post_analysis([
+        {"date": "2025-01-01", "BReportActual": 1},
+        {"date": "2025-01-02", "BReportActual": 2},
+        {"date": "not-a-date", "BReportActual": 3},
+    ])
+    assert response.status_code == 422
+    assert [error["loc"] for error in response.json()["detail"]] == [["body", "metrics_data", 2, "date"]]
+
+
+def test_bad_record_metric_is_located():
+    response = post_analysis([{"date": "2025-01-01", "BReportActual": "many"}])
+    assert response.status_code == 422
+    assert [error["loc"] for error in response.json()["detail"]] == [["body", "metrics_data", 0, "BReportActual"]]
+
+
+def test_valid_records_arrive_columnar():
+    request = AnalysisRequest.model_validate(analysis_body([
+        {"date": "2025-01-01", "BReportActual": 1},
+        {"date": "2025-01-02", "breport_actual": 2},
+    ]))
+    assert isinstance(request.metrics_data, ColumnarMetricsData)
+    assert request.metrics_data.metrics["BReportActual"] == [1, 2]
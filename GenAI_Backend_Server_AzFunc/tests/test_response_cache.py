@@ -0,0 +1,47 @@
+"""
+request_fingerprint: requests that get the same LLM answer share a key,
+requests that do not get different keys.
+"""
+import asyncio
+
+from app.core.response_cache import MemoryStore, ResponseCache, SQLiteStore, request_fingerprint
+from app.models.schemas.analysis import AnalysisRequest
+
+RECORDS = [
+    {"date": "2025-01-01", "BReportActual": 3, "BReportActualTotal": 3},
+    {"date": "2025-01-02", "BReportActual": 1, "BReportActualTotal": 4},
+]
+
+
+def analysis_request(metrics_data=RECORDS, granularity="daily", projects=("A", "B")):
+    return AnalysisRequest.model_validate({
+        "request_meta": {"request_id": "t", "timestamp": "2025-01-01T00:00:00", "mode_type": "Analyze Report",
+                         "metrics_granularity": granularity},
+        "period": {"start_date": "2025-01-01", "end_date": "2025-01-02"},
+        "filters": {"redmine_infra": [], "redmine_server": [], "redmine_instance": [],
+                    "project_identifier": list(projects), "project_name": []},
+        "metrics_data": metrics_data,
+    })
+
+
+def test_same_content_same_key():
+    columnar = {"format": "columnar", "dates": ["2025-01-01", "2025-01-02"],
+                "metrics": {"BReportActual": [3, 1], "BReportActualTotal": [3, 4]}}
+    key = request_fingerprint("analysis", analysis_request())
+    assert request_fingerprint("analysis", analysis_request(columnar)) == key
+    assert request_fingerprint("analysis", analysis_request(projects=("B", "A"))) == key
+
+
+def test_granularity_is_part_of_the_key():
+    # The same records mean per-day counts in one request and per-bucket sums in the other
+    daily = request_fingerprint("analysis", analysis_request(granularity="daily"))
+    assert request_fingerprint("analysis", analysis_request(granularity="weekly")) != daily
+
+
+def test_async_stats_and_clear(tmp_path):
+    for store in (MemoryStore(8), SQLiteStore(str(tmp_path / "cache.db"), 8)):
+        cache = ResponseCache(store, ttl_seconds=60)
+        cache.set("k", {"status": "success", "message": "m"}, 1.0)
+        assert asyncio.run(cache.astats())["entries"] == 1
+        assert asyncio.run(cache.aclear()) == 1
+        assert asyncio.run(cache.astats())["entries"] == 0
@@ -0,0 +1,78 @@
+"""
+The services use the response cache and LLM client they are given (by the
+ServiceContainer in the app, by the test here), not process-wide globals.
+"""
+import asyncio
+
+from app.core.container import ServiceContainer
+from app.core.response_cache import MemoryStore, ResponseCache
+from app.models.schemas.assistant import AssistantRequest
+from app.services.assistant_service import AssistantService
+
+
+class StubLLM:
+    def __init__(self):
+        self.calls = 0
+
+    async def complete(self, prompt, system=""):
+        self.calls += 1
+        return "stub answer"
+
+    async def stream(self, prompt, system=""):
+        self.calls += 1
+        for chunk in ("stub ", "stream"):
+            yield chunk
+
+
+def assistant_request(question):
+    return AssistantRequest.model_validate({
+        "request_meta": {"request_id": "t", "timestamp": "2025-01-01T00:00:00", "mode_type": "AI Assistant"},
+        "period": {"start_date": "2025-01-01", "end_date": "2025-01-02"},
+        "filters": {"redmine_infra": [], "redmine_server": [], "redmine_instance": [], "project_identifier": ["A"], "project_name": []},
+        "metrics_data": [{"date": "2025-01-01", "BReportActual": 1}, {"date": "2025-01-02", "BReportActual": 2}],
+        "user_question": question,
+    })
+
+
+def collect(chunks):
+    async def run():
+        return [chunk async for chunk in chunks]
+
+    return asyncio.run(run())
+
+
+def test_execute_uses_injected_cache_and_client():
+    llm, cache = StubLLM(), ResponseCache(MemoryStore(8), ttl_seconds=60)
+    service = AssistantService(cache, llm)
+
+    first = asyncio.run(service.execute(assistant_request("q")))
+    second = asyncio.run(service.execute(assistant_request("q")))
+    assert first == second == {"status": "success", "message": "stub answer"}
+    assert llm.calls == 1
+    assert cache.stats()["hits"] == 1
+
+
+def test_stream_uses_injected_client_and_replays_from_cache():
+    llm, cache = StubLLM(), ResponseCache(MemoryStore(8), ttl_seconds=60)
+    service = AssistantService(cache, llm)
+
+    assert collect(service.stream(assistant_request("s"))) == ["stub ", "stream"]
+    assert "".join(collect(service.stream(assistant_request("s")))) == "stub stream"
+    assert llm.calls == 1
+
+
+def test_without_client_or_cache_answers_built_in_message():
+    service = AssistantService()
+    answer = asyncio.run(service.execute(assistant_request("q")))
+    assert answer == service.supervisor
+
+
+def test_container_hands_its_instances_to_the_services():
+    container = ServiceContainer()
+    asyncio.run(container.startup())
+    try:
+        for service in (container.analysis_service, container.assistant_service):
+            assert service.response_cache is container.response_cache
+            assert service.llm_client is container.llm_client
+    finally:
+        asyncio.run(container.shutdown())
@@ -1,5 +1,8 @@
 // --- CẤU HÌNH ---
 const MAIN_SHEET_NAME = "Line_Chart"; 
+// Hiển thị câu trả lời của AI dần dần (Server-Sent Events) thay vì chờ toàn bộ kết quả
+// (chỉ khi server bật ASK_AI_STREAMING; nếu không server vẫn trả JSON)
+const STREAM_RESPONSES = true;
 
 // --- KHỞI TẠO ---
 
@@ -183,7 +186,24 @@ async function handleProcess(modeType) {
         // console.log("=".repeat(80));
         // console.log(`📤 Sending payload [${modeType}]:`, payload);
         // console.log("🚀 Gửi request tới /ask-ai...");
-        const backendResponse = await sendToBackend(payload);
+        // Render từng token ngay khi nhận được (streaming mode)
+        let streamedText = "";
+        let streamBox = null;
+        const onToken = (text) => {
+            if(!resultContainer) return;
+            if(!streamBox) {
+                resultContainer.innerHTML = `
+                    <div style="text-align:left;">
+                        <div style="background:#e3f2fd; padding:10px; margin-bottom:10px; border-left:4px solid #2196F3; white-space:pre-wrap;"></div>
+                    </div>
+                `;
+                streamBox = resultContainer.querySelector("div > div");
+                if(statusText) statusText.textContent = "Receiving answer...";
+            }
+            streamedText += text;
+            streamBox.textContent = streamedText;
+        };
+        const backendResponse = await sendToBackend(payload, onToken);
         
         // console.log("📥 Response từ backend:", backendResponse);
         
@@ -363,13 +383,15 @@ async function enrichFiltersWithData(currentFilters) {
 }
 
 // Hàm gửi backend
-async function sendToBackend(payload) {
+// onToken(text) được gọi với từng đoạn câu trả lời khi server trả về dạng stream (text/event-stream)
+async function sendToBackend(payload, onToken) {
     try {
         // Code debug for: Log fetch start (commented)
         // console.log("🔌 Fetching /ask-ai...");
+        const accept = STREAM_RESPONSES ? "text/event-stream, application/json" : "application/json";
         const res = await fetch("http://localhost:8000/ask-ai", {
             method: "POST",
-            headers: { "Content-Type": "application/json" },
+            headers: { "Content-Type": "application/json", "Accept": accept },
             body: JSON.stringify(payload)
         });
         
@@ -381,6 +403,11 @@ async function sendToBackend(payload) {
             throw new Error(errorData.error || `HTTP ${res.status}: ${res.statusText}`);
         }
         
+        const contentType = res.headers.get("Content-Type") || "";
+        if (contentType.startsWith("text/event-stream")) {
+            return await readEventStream(res, onToken);
+        }
+        
         const data = await res.json();
         // Code debug for: Log response received (commented)
         // console.log("✅ Got response:", data);
@@ -390,3 +417,40 @@ async function sendToBackend(payload) {
         throw err;
     }
 }
+
+// Đọc response dạng Server-Sent Events: "token" -> onToken(text), "done" -> kết quả cuối cùng,
+// "error" -> hiển thị nội dung lỗi (answer) do server gửi
+async function readEventStream(res, onToken) {
+    const reader = res.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = "";
+    
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        
+        let boundary;
+        while ((boundary = buffer.indexOf("\n\n")) >= 0) {
+            const rawEvent = buffer.slice(0, boundary);
+            buffer = buffer.slice(boundary + 2);
+            
+            let eventName = "message";
+            const dataLines = [];
+            for (const line of rawEvent.split("\n")) {
+                if (line.startsWith("event:")) eventName = line.slice(6).trim();
+                else if (line.startsWith("data:")) dataLines.push(line.slice(5).trimStart());
+            }
+            if (dataLines.length === 0) continue;
+            const data = JSON.parse(dataLines.join("\n"));
+            
+            if (eventName === "token") {
+                if (onToken) onToken(data.text || "");
+            } else if (eventName === "done" || eventName === "error") {
+                // Error content is displayable HTML (answer), same as the non-streaming response
+                return data;
+            }
+        }
+    }
+    throw new Error("Stream ended before the answer was complete");
+}
@@ -0,0 +1,133 @@
+"""
+Load test: a burst of distinct /ask-ai requests against a saturating backend
+
+The Backend API is simulated behind httpx.MockTransport: a call takes
+`--llm-seconds` while at most `--capacity` calls are in flight and slows down
+proportionally beyond that (an overloaded LLM), failing with a read timeout
+past `--timeout` seconds. Every request has its own question, so coalescing
+does not help; SQL is stubbed out.
+
+Compares admission control effectively off (limits far above the burst)
+with the configured limits: how many requests succeed, how many are shed
+with 429/503 + Retry-After, and the latency of each group.
+
+Usage:
+    python benchmarks/bench_admission.py [--requests 60] [--capacity 8] [--llm-seconds 1.0]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+import httpx
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+for _var in ("AZURE_SQL_DRIVER", "AZURE_SQL_SERVER", "AZURE_SQL_DATABASE", "AZURE_SQL_USER", "AZURE_SQL_PASSWORD"):
+    os.environ.setdefault(_var, "bench")
+os.environ.setdefault("DB_POOL_MIN_SIZE", "0")
+os.environ.setdefault("LOG_LEVEL", "CRITICAL")
+os.environ["RESULT_CACHE_TTL_SECONDS"] = "0"
+
+import server  # noqa: E402
+from core.admission import AdmissionLimiter  # noqa: E402
+from core.logging import setup_logging  # noqa: E402
+from core.resilience import CircuitBreaker, RetryPolicy  # noqa: E402
+
+# server installs its log handlers at startup, which is not run here
+setup_logging(server.settings.LOG_LEVEL, server.settings.LOG_FORMAT, use_queue=False)
+
+
+def make_backend(capacity: int, llm_seconds: float, timeout: float):
+    in_flight = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal in_flight
+        in_flight += 1
+        try:
+            latency = llm_seconds * max(1.0, in_flight / capacity)
+            if latency > timeout:
+                await asyncio.sleep(timeout)
+                raise httpx.ReadTimeout("simulated LLM timeout", request=request)
+            await asyncio.sleep(latency)
+            return httpx.Response(200, json={"status": "success", "message": "ok"})
+        finally:
+            in_flight -= 1
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+async def run_burst(args, max_concurrency: int, max_queue: int):
+    server.get_data_from_db = lambda filters, start, end: pd.DataFrame({
+        "date": ["2025-01-01", "2025-01-02"],
+        "Metric_Name": ["TestCaseActual", "TestCaseActual"],
+        "Metric_Value": [10, 12],
+    })
+    server.backend_client = make_backend(args.capacity, args.llm_seconds, args.timeout)
+    server.backend_admission["analysis"] = AdmissionLimiter("analysis", max_concurrency, max_queue, args.queue_timeout)
+    # Admission only: no retries, and a fresh breaker that never opens, so
+    # timeouts in one scenario do not shed the next (see bench_resilience.py)
+    server.backend_retry_policy = RetryPolicy(max_attempts=1)
+    server.backend_breakers["analysis"] = CircuitBreaker("analysis", failure_threshold=10_000)
+
+    async def one(client, i):
+        payload = {
+            "filters": {"Project Identifier": ["PROJECT_A"]},
+            "period": {"start_date": "2025-01-01", "end_date": "2025-03-31"},
+            "mode_type": "Analyze Report",
+            "user_question": f"question {i}",
+        }
+        started = time.perf_counter()
+        response = await client.post("/ask-ai", json=payload)
+        body = response.json()
+        ok = response.status_code == 200 and "error" not in body
+        return response.status_code, ok, time.perf_counter() - started, response.headers.get("retry-after")
+
+    transport = httpx.ASGITransport(app=server.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        started = time.perf_counter()
+        results = await asyncio.gather(*(one(client, i) for i in range(args.requests)))
+        elapsed = time.perf_counter() - started
+    await server.backend_client.aclose()
+    return elapsed, results, server.backend_admission["analysis"].stats()
+
+
+def describe(latencies):
+    if not latencies:
+        return "-"
+    latencies = sorted(latencies)
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    return f"p50 {statistics.median(latencies):.2f}s p95 {p95:.2f}s"
+
+
+async def main(args):
+    print(f"{args.requests} distinct /ask-ai requests, backend capacity {args.capacity} x {args.llm_seconds}s, "
+          f"timeout {args.timeout}s, queue timeout {args.queue_timeout}s")
+    print(f"{'admission':<22} {'wall (s)':>8} {'answered':>8} {'failed':>6} {'shed':>5}  {'answered latency':<24} {'shed latency':<24} retry-after")
+    runs = (
+        ("off", args.requests, args.requests),
+        (f"{args.capacity} slots, queue {args.max_queue}", args.capacity, args.max_queue),
+    )
+    for label, max_concurrency, max_queue in runs:
+        elapsed, results, stats = await run_burst(args, max_concurrency, max_queue)
+        answered = [latency for status, ok, latency, _ in results if ok]
+        shed = [latency for status, ok, latency, _ in results if status in (429, 503)]
+        failed = len(results) - len(answered) - len(shed)
+        retry_after = sorted({int(r) for *_, r in results if r})
+        print(f"{label:<22} {elapsed:>8.2f} {len(answered):>8} {failed:>6} {len(shed):>5}  "
+              f"{describe(answered):<24} {describe(shed):<24} {retry_after or '-'}")
+        print(f"{'':<22} queue: max depth {stats['max_queue_depth']}, avg wait {stats['queue_wait_avg_s']:.2f}s, "
+              f"rejected {stats['rejected_queue_full']} full / {stats['rejected_queue_timeout']} timeout")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backend admission control load test")
+    parser.add_argument("--requests", type=int, default=60)
+    parser.add_argument("--capacity", type=int, default=8)
+    parser.add_argument("--llm-seconds", type=float, default=1.0)
+    parser.add_argument("--timeout", type=float, default=6.0, help="simulated backend read timeout")
+    parser.add_argument("--max-queue", type=int, default=16)
+    parser.add_argument("--queue-timeout", type=float, default=2.5)
+    asyncio.run(main(parser.parse_args()))
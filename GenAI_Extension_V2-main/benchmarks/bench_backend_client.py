@@ -0,0 +1,119 @@
+"""
+Benchmark: new httpx.AsyncClient per request vs one shared keep-alive client
+
+Starts a local stand-in for the Azure Functions backend (stdlib HTTP/1.1 server
+with keep-alive) and POSTs a realistic /ask-ai payload to it.
+
+Usage:
+    python benchmarks/bench_backend_client.py [--requests 300] [--concurrency 10]
+
+Note: the stand-in is plain HTTP on localhost, so it only shows the TCP setup
+cost. Against the real backend each new client also pays a TLS handshake,
+so the gap is larger in production.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core.http_client import create_async_client  # noqa: E402
+
+RESPONSE_BODY = json.dumps({"status": "success", "message": "ok " * 200}).encode()
+
+
+class StandInBackend(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        self.rfile.read(length)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(RESPONSE_BODY)))
+        self.end_headers()
+        self.wfile.write(RESPONSE_BODY)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_stand_in():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInBackend)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/api/v1/analysis"
+
+
+def make_payload(n_dates: int = 365):
+    return {
+        "request_meta": {"request_id": "req_bench", "timestamp": "2026-01-01T00:00:00Z", "mode_type": "Analyze Report"},
+        "period": {"start_date": "2025-01-01", "end_date": "2025-12-31"},
+        "filters": {"project_identifier": ["PROJECT_A"]},
+        "metrics_data": [
+            {"date": f"2025-01-{i % 28 + 1:02d}", "TestCaseActual": i, "BReportFixed": i // 2}
+            for i in range(n_dates)
+        ],
+    }
+
+
+async def per_request_client(url, payload, n, concurrency):
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with sem:
+            async with httpx.AsyncClient(timeout=60.0) as client:
+                r = await client.post(url, json=payload)
+                r.raise_for_status()
+
+    await asyncio.gather(*(one() for _ in range(n)))
+
+
+async def shared_client(url, payload, n, concurrency):
+    sem = asyncio.Semaphore(concurrency)
+    client = create_async_client()
+
+    async def one():
+        async with sem:
+            r = await client.post(url, json=payload)
+            r.raise_for_status()
+
+    try:
+        await asyncio.gather(*(one() for _ in range(n)))
+    finally:
+        await client.aclose()
+
+
+def run(label, fn, url, payload, n, concurrency):
+    started = time.perf_counter()
+    asyncio.run(fn(url, payload, n, concurrency))
+    elapsed = time.perf_counter() - started
+    print(f"{label:<28} {elapsed:8.3f}s total  {elapsed / n * 1000:8.2f} ms/req  {n / elapsed:8.1f} req/s")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=10)
+    args = parser.parse_args()
+
+    server, url = start_stand_in()
+    payload = make_payload()
+    try:
+        print(f"Stand-in backend: {url}  requests={args.requests}  concurrency={args.concurrency}\n")
+        before = run("new client per request", per_request_client, url, payload, args.requests, args.concurrency)
+        after = run("shared keep-alive client", shared_client, url, payload, args.requests, args.concurrency)
+        print(f"\nSpeed-up: {before / after:.2f}x")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Load test: N identical concurrent /ask-ai requests with and without coalescing
+
+Simulates a team opening the same dashboard at once. The SQL stage is a
+blocking sleep and the Backend API call an async sleep (the LLM), both
+counted, so the output shows how many executions the burst really caused.
+The result cache is disabled to isolate the effect of coalescing.
+
+Usage:
+    python benchmarks/bench_coalescing.py [--requests 20] [--sql-seconds 0.3] [--llm-seconds 1.0]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import httpx
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+for _var in ("AZURE_SQL_DRIVER", "AZURE_SQL_SERVER", "AZURE_SQL_DATABASE", "AZURE_SQL_USER", "AZURE_SQL_PASSWORD"):
+    os.environ.setdefault(_var, "bench")
+os.environ.setdefault("DB_POOL_MIN_SIZE", "0")
+os.environ.setdefault("LOG_LEVEL", "CRITICAL")  # the failure run logs one traceback per request
+os.environ["RESULT_CACHE_TTL_SECONDS"] = "0"
+
+import server  # noqa: E402
+from core.logging import setup_logging  # noqa: E402
+from core.single_flight import SingleFlight  # noqa: E402
+
+# server installs its log handlers at startup, which is not run here
+setup_logging(server.settings.LOG_LEVEL, server.settings.LOG_FORMAT, use_queue=False)
+
+calls = {"sql": 0, "backend": 0}
+
+
+async def run_burst(n_requests: int, coalescing: bool, sql_seconds: float, llm_seconds: float, fail: bool = False):
+    def slow_get_data_from_db(filters, period_start, period_end):
+        calls["sql"] += 1
+        time.sleep(sql_seconds)
+        return pd.DataFrame({
+            "date": ["2025-01-01", "2025-01-01", "2025-01-02"],
+            "Metric_Name": ["TestCaseActual", "BReportFixed", "TestCaseActual"],
+            "Metric_Value": [10, 2, 12],
+        })
+
+    async def slow_call_backend_api(payload, endpoint):
+        calls["backend"] += 1
+        await asyncio.sleep(llm_seconds)
+        if fail:
+            raise RuntimeError("simulated backend failure")
+        return {"status": "success", "message": "ok"}
+
+    server.get_data_from_db = slow_get_data_from_db
+    server.call_backend_api = slow_call_backend_api
+    server.ask_ai_flight = SingleFlight(enabled=coalescing)
+    calls.update(sql=0, backend=0)
+
+    payload = {
+        "filters": {"Project Identifier": ["PROJECT_A", "PROJECT_B"], "Redmine Infra": ["(All)"]},
+        "period": {"start_date": "2025-01-01", "end_date": "2025-03-31"},
+        "mode_type": "Analyze Report",
+    }
+    transport = httpx.ASGITransport(app=server.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        started = time.perf_counter()
+        responses = await asyncio.gather(*(client.post("/ask-ai", json=payload) for _ in range(n_requests)))
+        elapsed = time.perf_counter() - started
+
+    statuses = sorted({r.status_code for r in responses})
+    return elapsed, statuses, dict(calls), server.ask_ai_flight.stats()
+
+
+async def main(args):
+    print(f"{args.requests} identical /ask-ai requests, SQL {args.sql_seconds}s, LLM {args.llm_seconds}s")
+    print(f"{'mode':<14} {'wall (s)':>9} {'SQL runs':>9} {'LLM calls':>10} {'coalesced':>10} {'statuses':>10}")
+    for label, coalescing, fail in (("off", False, False), ("on", True, False), ("on + failure", True, True)):
+        elapsed, statuses, counts, stats = await run_burst(args.requests, coalescing, args.sql_seconds, args.llm_seconds, fail)
+        print(f"{label:<14} {elapsed:>9.2f} {counts['sql']:>9} {counts['backend']:>10} "
+              f"{stats['coalesced_total']:>10} {','.join(map(str, statuses)):>10}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Request coalescing load test")
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--sql-seconds", type=float, default=0.3)
+    parser.add_argument("--llm-seconds", type=float, default=1.0)
+    asyncio.run(main(parser.parse_args()))
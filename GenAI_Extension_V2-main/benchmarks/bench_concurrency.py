@@ -0,0 +1,101 @@
+"""
+Load test: do concurrent /ask-ai requests still serialize on the event loop?
+
+The SQL stage is simulated with a blocking sleep (like a slow pyodbc query)
+and the Backend API call with an instant stub, then N concurrent /ask-ai
+requests plus one static-file request are sent through the ASGI app.
+
+  --inline   run the blocking stages directly on the event loop (old behaviour)
+
+Usage:
+    python benchmarks/bench_concurrency.py [--requests 16] [--sql-seconds 0.5] [--inline]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import httpx
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+for _var in ("AZURE_SQL_DRIVER", "AZURE_SQL_SERVER", "AZURE_SQL_DATABASE", "AZURE_SQL_USER", "AZURE_SQL_PASSWORD"):
+    os.environ.setdefault(_var, "bench")
+os.environ.setdefault("DB_POOL_MIN_SIZE", "0")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+import server  # noqa: E402
+from core.logging import setup_logging  # noqa: E402
+
+# server installs its log handlers at startup, which is not run here
+setup_logging(server.settings.LOG_LEVEL, server.settings.LOG_FORMAT, use_queue=False)
+
+SQL_SECONDS = 0.5
+
+
+def slow_get_data_from_db(filters, period_start, period_end):
+    time.sleep(SQL_SECONDS)
+    return pd.DataFrame({
+        "date": ["2025-01-01", "2025-01-01", "2025-01-02"],
+        "Metric_Name": ["TestCaseActual", "BReportFixed", "TestCaseActual"],
+        "Metric_Value": [10, 2, 12],
+    })
+
+
+async def stub_call_backend_api(payload, endpoint):
+    return {"status": "success", "message": "ok"}
+
+
+class InlineExecutor:
+    """Old behaviour: blocking stages run directly inside the async handler"""
+
+    async def run(self, fn, *args, **kwargs):
+        return fn(*args, **kwargs)
+
+
+async def main(n_requests: int, inline: bool):
+    server.get_data_from_db = slow_get_data_from_db
+    server.call_backend_api = stub_call_backend_api
+    if inline:
+        server.blocking_executor = InlineExecutor()
+
+    transport = httpx.ASGITransport(app=server.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def ask(i):
+            # Distinct filters per request, so neither the result cache nor
+            # request coalescing collapses the burst into one query
+            payload = {"filters": {"Project Identifier": [f"PROJECT_{i}"]}, "mode_type": "Analyze Report"}
+            r = await client.post("/ask-ai", json=payload)
+            r.raise_for_status()
+
+        async def static():
+            # Issued 50 ms into the /ask-ai burst; latency is measured from
+            # that point so time spent waiting for a blocked loop is counted
+            due = started + 0.05
+            await asyncio.sleep(0.05)
+            r = await client.get("/style.css")
+            r.raise_for_status()
+            return time.perf_counter() - due
+
+        started = time.perf_counter()
+        results = await asyncio.gather(static(), *(ask(i) for i in range(n_requests)))
+        elapsed = time.perf_counter() - started
+
+    mode = "inline (event loop)" if inline else f"executor ({server.settings.BLOCKING_WORKERS} workers)"
+    print(f"Mode: {mode}")
+    print(f"  {n_requests} x /ask-ai with {SQL_SECONDS}s SQL each: {elapsed:.2f}s wall "
+          f"(fully serialized would be {n_requests * SQL_SECONDS:.2f}s)")
+    print(f"  /style.css latency during the burst: {results[0] * 1000:.1f} ms")
+    if not inline:
+        print(f"  executor stats: {server.blocking_executor.stats()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Concurrent /ask-ai load test")
+    parser.add_argument("--requests", type=int, default=16)
+    parser.add_argument("--sql-seconds", type=float, default=0.5)
+    parser.add_argument("--inline", action="store_true")
+    args = parser.parse_args()
+    SQL_SECONDS = args.sql_seconds
+    asyncio.run(main(args.requests, args.inline))
@@ -0,0 +1,106 @@
+"""
+Benchmark: metrics_data downsampling (core.downsample) vs the daily records
+
+Synthetic daily records with the 13 mapped metrics over --days days: noisy
+per-day counts with a few spikes, cumulative totals, and upper / lower bound
+curves that BReportActualTotal crosses several times. For each method it
+prints the records and JSON bytes sent, the estimated prompt tokens, the
+downsampling time, and checks what must survive:
+  - flow sums: per-day counts summed over all records are unchanged
+  - peaks:     each flow metric's daily peak value still appears
+  - crossings: every day on which the bound series crosses a bound is still a record
+
+Usage:
+    python benchmarks/bench_downsample.py [--days 365 1825 3650] [--max-records 400] [--repeat 5]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core.downsample import (  # noqa: E402
+    BOUND_SERIES, CHARS_PER_TOKEN, FLOW_METRICS, LOWER_BOUND, UPPER_BOUND, downsample,
+)
+
+
+def make_records(days: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    dates = np.arange(np.datetime64("2020-01-01"), np.datetime64("2020-01-01") + days).astype(str)
+    t = np.arange(days)
+    flows = {
+        "TestCaseExpected": np.full(days, 30),
+        "TestCaseActual": rng.poisson(28, days),
+        "BReportExpected": np.full(days, 4),
+        "BReportActual": rng.poisson(4 + 2 * np.sin(t / 45), days),
+        "BReportFixed": rng.poisson(3.5, days),
+    }
+    for name in ("TestCaseActual", "BReportActual"):
+        flows[name][rng.choice(days, 3, replace=False)] += 60  # spikes
+    totals = {f"{name}Total": np.cumsum(values) for name, values in flows.items() if name != "BReportExpected"}
+    totals["BReportExpectedTotal"] = np.cumsum(flows["BReportExpected"])
+    expected = totals["BReportExpectedTotal"]
+    columns = {
+        **flows,
+        **totals,
+        "BReportOutstanding": totals["BReportActualTotal"] - totals["BReportFixedTotal"],
+        UPPER_BOUND: (expected * 1.05 + 10).astype(np.int64),
+        LOWER_BOUND: (expected * 0.95 - 10).astype(np.int64),
+    }
+    names = sorted(columns)
+    matrix = np.column_stack([columns[name] for name in names]).tolist()
+    return [dict(zip(["date", *names], (day, *row))) for day, row in zip(dates.tolist(), matrix)]
+
+
+def crossing_days(records):
+    series = np.array([r[BOUND_SERIES] for r in records])
+    days = set()
+    for bound in (UPPER_BOUND, LOWER_BOUND):
+        side = np.sign(series - np.array([r[bound] for r in records]))
+        days.update(records[i]["date"] for i in np.flatnonzero(side[1:] != side[:-1]) + 1)
+    return days
+
+
+def check(original, sampled):
+    sums = all(sum(r[m] for r in original) == sum(r[m] for r in sampled) for m in FLOW_METRICS)
+    peaks = all(max(r[m] for r in original) in {r[m] for r in sampled} for m in FLOW_METRICS)
+    crossings = crossing_days(original) <= {r["date"] for r in sampled}
+    return "ok" if sums else "LOST", "ok" if peaks else "LOST", "ok" if crossings else "LOST"
+
+
+def best_of(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="metrics_data downsampling benchmark")
+    parser.add_argument("--days", type=int, nargs="+", default=[365, 1825, 3650])
+    parser.add_argument("--max-records", type=int, default=400)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"budget {args.max_records} records")
+    print(f"{'days':>5} {'method':<8} {'->':<8} {'records':>8} {'bytes':>9} {'tokens~':>8} {'ratio':>6} {'ms':>7}  sums peaks crossings")
+    for days in args.days:
+        records = make_records(days)
+        baseline = len(json.dumps(records, separators=(",", ":")))
+        print(f"{days:>5} {'(none)':<8} {'daily':<8} {len(records):>8} {baseline:>9} {baseline // CHARS_PER_TOKEN:>8} {1:>6.2f} {0:>7.2f}")
+        for method in ("weekly", "monthly", "lttb", "auto"):
+            sampled, granularity = downsample(records, args.max_records, method)
+            size = len(json.dumps(sampled, separators=(",", ":")))
+            seconds = best_of(lambda: downsample(records, args.max_records, method), args.repeat)
+            sums, peaks, crossings = check(records, sampled)
+            print(f"{days:>5} {method:<8} {granularity:<8} {len(sampled):>8} {size:>9} {size // CHARS_PER_TOKEN:>8} "
+                  f"{size / baseline:>6.2f} {seconds * 1000:>7.2f}  {sums:<4} {peaks:<5} {crossings}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Benchmark: stdlib json vs orjson on the /ask-ai serialization paths
+
+  backend body   -- payload with N metrics_data records, as POSTed to the
+                    Backend API (old path: httpx json= i.e. json.dumps)
+  numpy matrix   -- the pivoted int64 matrix: tolist() + json.dumps vs
+                    orjson serializing the ndarray natively
+  /ask-ai reply  -- rendering a response returned to the browser that
+                    carries the records (worst case; Starlette JSONResponse
+                    vs AskAIResponse)
+  parse          -- json.loads vs orjson.loads of the backend body
+
+Usage:
+    python benchmarks/bench_json.py [--records 365 1825 3650] [--repeat 20]
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+from fastapi.responses import JSONResponse
+
+from verify_query_modes import server
+
+from core.json_codec import JSON_LIBRARY_ORJSON, JSON_LIBRARY_STDLIB, CodecJSONResponse, JsonCodec, orjson_available
+from core.pivot import WideMetrics
+
+
+def make_wide(n_records: int) -> WideMetrics:
+    rng = np.random.default_rng(0)
+    dates = [str(day) for day in np.datetime64("2015-01-01") + np.arange(n_records)]
+    metrics = sorted(server.METRIC_VALUE_MAPPING.values())
+    return WideMetrics(dates, metrics, rng.integers(0, 5000, (n_records, len(metrics)), dtype=np.int64))
+
+
+def best_of(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JSON serialization benchmark")
+    parser.add_argument("--records", type=int, nargs="+", default=[365, 1825, 3650])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    if not orjson_available():
+        raise SystemExit("orjson is not installed (pip install orjson)")
+
+    stdlib = JsonCodec(JSON_LIBRARY_STDLIB)
+    orjson_codec = JsonCodec(JSON_LIBRARY_ORJSON)
+
+    class StdlibResponse(CodecJSONResponse):
+        codec = stdlib
+
+    class OrjsonResponse(CodecJSONResponse):
+        codec = orjson_codec
+
+    print(f"{'records':>7} {'path':<14} {'old (ms)':>9} {'stdlib codec':>13} {'orjson (ms)':>12} {'speed-up':>9}")
+    for n_records in args.records:
+        wide = make_wide(n_records)
+        records = wide.to_records()
+        request = server.RequestPayload(filters={"Project Identifier": ["PROJECT_A"]})
+        payload = server.build_backend_payload(request, records, {"start_date": wide.dates[0], "end_date": wide.dates[-1]}, "bench")
+        body = json.dumps(payload).encode("utf-8")
+        if json.loads(orjson_codec.dumps(payload)) != json.loads(body):
+            raise SystemExit("orjson output differs from json.dumps")
+        reply = {"answer": "<div style='white-space:pre-wrap;'>" + "analysis text " * 200 + "</div>",
+                 "data": {"status": "success", "message": "analysis text " * 200, "metrics_data": records}}
+
+        rows = [
+            ("backend body",
+             lambda: json.dumps(payload).encode("utf-8"),
+             lambda: stdlib.dumps(payload),
+             lambda: orjson_codec.dumps(payload)),
+            ("numpy matrix",
+             lambda: json.dumps(wide.values.tolist()).encode("utf-8"),
+             lambda: stdlib.dumps(wide.values),
+             lambda: orjson_codec.dumps(wide.values)),
+            ("/ask-ai reply",
+             lambda: JSONResponse(content=reply),
+             lambda: StdlibResponse(content=reply),
+             lambda: OrjsonResponse(content=reply)),
+            ("parse",
+             lambda: json.loads(body),
+             lambda: stdlib.loads(body),
+             lambda: orjson_codec.loads(body)),
+        ]
+        for label, old, via_stdlib, via_orjson in rows:
+            old_ms = best_of(old, args.repeat)
+            stdlib_ms = best_of(via_stdlib, args.repeat)
+            orjson_ms = best_of(via_orjson, args.repeat)
+            print(f"{n_records:>7} {label:<14} {old_ms:>9.3f} {stdlib_ms:>13.3f} {orjson_ms:>12.3f} {old_ms / orjson_ms:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Benchmark: per-request logging overhead in the /ask-ai data pipeline
+
+Runs build_query -> get_data_from_db -> process_data_to_metrics ->
+build_backend_payload against the SQLite stand-in from verify_query_modes.py
+with logging off and at WARNING/INFO/DEBUG, through both the queue handler
+and a plain synchronous stdout handler. "sync DEBUG" renders and writes
+everything on the request thread, which is roughly what the old print()
+calls cost. Output goes to /dev/null, so only formatting/dispatch is measured.
+
+Usage:
+    python benchmarks/bench_logging.py [--requests 200] [--days 365] [--projects 20]
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+
+from verify_query_modes import create_stand_in, server
+
+from core.db_pool import ConnectionPool
+from core.logging import setup_logging, shutdown_logging
+
+FILTERS = {"Project Identifier": ["PROJECT_3"], "Redmine Infra": ["(All)"]}
+PERIOD = ("2024-01-01", "2024-12-31")
+
+
+def one_request():
+    df = server.get_data_from_db(FILTERS, *PERIOD, server.QUERY_MODE_EAV)
+    metrics_data = server.process_data_to_metrics(df, server.QUERY_MODE_EAV)
+    request = server.RequestPayload(filters=FILTERS)
+    server.build_backend_payload(request, metrics_data, {"start_date": PERIOD[0], "end_date": PERIOD[1]}, "bench")
+
+
+def run(n_requests, level, use_queue):
+    real_stdout = sys.stdout
+    sys.stdout = open(os.devnull, "w")
+    try:
+        if level is None:
+            setup_logging("CRITICAL", "text", use_queue)
+            logging.disable(logging.CRITICAL)
+        else:
+            setup_logging(level, "text", use_queue)
+        one_request()  # warm-up
+        started = time.perf_counter()
+        for _ in range(n_requests):
+            one_request()
+        elapsed = time.perf_counter() - started
+        shutdown_logging()
+    finally:
+        logging.disable(logging.NOTSET)
+        sys.stdout.close()
+        sys.stdout = real_stdout
+    return elapsed / n_requests
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Logging overhead benchmark")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--projects", type=int, default=20)
+    args = parser.parse_args()
+
+    conn = create_stand_in(args.days, args.projects)
+    server.db_pool = ConnectionPool(lambda: conn, min_size=0, max_size=1)
+    server.db_pool.open()
+
+    print(f"{args.requests} requests, {args.days} days x {args.projects} projects")
+    print(f"{'handler':<8} {'level':<8} {'ms/request':>11} {'overhead':>10}")
+    baseline = run(args.requests, None, True) * 1000
+    print(f"{'-':<8} {'off':<8} {baseline:>11.3f} {'':>10}")
+    for use_queue in (True, False):
+        for level in ("WARNING", "INFO", "DEBUG"):
+            per_request = run(args.requests, level, use_queue) * 1000
+            print(f"{'queue' if use_queue else 'sync':<8} {level:<8} {per_request:>11.3f} {per_request - baseline:>+9.3f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Micro-benchmark: legacy pandas pivot_table pipeline vs core.pivot.pivot_eav
+
+Synthetic EAV rows shaped like vw_bug_report_by_testplan (datetime.date
+objects as returned by pyodbc, the 13 mapped metrics plus some unmapped
+names, several project rows per date/metric). Both implementations are
+checked to return identical records before timing; the check runs the
+legacy pipeline with aggfunc='max', the duplicate rule pivot_eav now
+shares with the SQL "pivot" query mode (the legacy code used 'first').
+
+Usage:
+    python benchmarks/bench_pivot.py [--rows 10000 100000 1000000 5000000] [--repeat 3]
+"""
+import argparse
+import datetime
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core.pivot import pivot_eav  # noqa: E402
+
+# Same as server.METRIC_VALUE_MAPPING (not imported to keep the benchmark free of DB settings)
+METRIC_VALUE_MAPPING = {name: name for name in [
+    "TestCaseExpected", "TestCaseExpectedTotal", "TestCaseActual", "TestCaseActualTotal",
+    "BReportExpected", "BReportExpectedTotal", "BReportActual", "BReportActualTotal",
+    "BReportFixed", "BReportFixedTotal", "BReportOutstanding", "BReportUpperBound", "BReportLowerBound",
+]}
+
+
+# The legacy code assigns to a filtered frame; keep its warnings out of the table
+warnings.simplefilter("ignore", pd.errors.SettingWithCopyWarning)
+
+
+def legacy_process(df: pd.DataFrame, aggfunc: str = 'first'):
+    """process_data_to_metrics before the pivot engine, without the prints"""
+    if df.empty:
+        return []
+    df['date'] = pd.to_datetime(df['date']).dt.strftime('%Y-%m-%d')
+    df = df[df['Metric_Name'].isin(list(METRIC_VALUE_MAPPING.keys()))]
+    if len(df) == 0:
+        return []
+    df['Metric_Name'] = df['Metric_Name'].map(METRIC_VALUE_MAPPING)
+    df['Metric_Value'] = pd.to_numeric(df['Metric_Value'], errors='coerce')
+    df_pivot = df.pivot_table(index='date', columns='Metric_Name', values='Metric_Value', aggfunc=aggfunc).reset_index()
+    df_pivot = df_pivot.fillna(0)
+    for col in df_pivot.columns:
+        if col != 'date':
+            df_pivot[col] = pd.to_numeric(df_pivot[col], errors='coerce').fillna(0).astype(int)
+    df_pivot = df_pivot.sort_values('date').reset_index(drop=True)
+    return df_pivot.to_dict(orient='records')
+
+
+def engine_process(df: pd.DataFrame):
+    return pivot_eav(df['date'], df['Metric_Name'], df['Metric_Value'], METRIC_VALUE_MAPPING).to_records()
+
+
+def make_eav(n_rows: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    names = np.array(list(METRIC_VALUE_MAPPING.keys()) + ["UnmappedMetricA", "UnmappedMetricB"], dtype=object)
+    # ~20 rows per (date, metric) cell, i.e. many projects/test plans per day
+    n_dates = max(1, n_rows // (len(names) * 20))
+    start = datetime.date(2020, 1, 1)
+    dates = np.array([start + datetime.timedelta(days=i) for i in range(n_dates)], dtype=object)
+    return pd.DataFrame({
+        "date": dates[rng.integers(0, n_dates, n_rows)],
+        "Metric_Name": names[rng.integers(0, len(names), n_rows)],
+        "Metric_Value": rng.integers(0, 5000, n_rows).astype(np.float64),
+    })
+
+
+def best_of(fn, df: pd.DataFrame, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        frame = df.copy()
+        started = time.perf_counter()
+        fn(frame)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pivot micro-benchmark")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000, 1_000_000, 5_000_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'dates':>7} {'legacy (s)':>11} {'engine (s)':>11} {'speed-up':>9}")
+    for n_rows in args.rows:
+        df = make_eav(n_rows)
+        expected = legacy_process(df.copy(), aggfunc='max')
+        if engine_process(df.copy()) != expected:
+            raise SystemExit(f"Output mismatch at {n_rows} rows")
+
+        legacy_s = best_of(legacy_process, df, args.repeat)
+        engine_s = best_of(engine_process, df, args.repeat)
+        print(f"{n_rows:>10} {len(expected):>7} {legacy_s:>11.4f} {engine_s:>11.4f} {legacy_s / engine_s:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Resilience test: retries and circuit breaker against a faulty Backend API
+
+Starts fault_backend.FaultBackend on a local port (real TCP, so injected
+connection resets are real) and sends distinct /ask-ai requests through the
+full call path. SQL is stubbed out.
+
+  transient -- 20% 503s and 10% connection resets; retries off vs on.
+               Counts answers vs the red "Backend API Error" fallback.
+               The resets happen after the response headers, so they are
+               not retried (only 503s and connect-phase errors are).
+  outage    -- the backend answers 503 to everything for --outage seconds
+               while requests keep arriving; breaker off vs on. Counts calls
+               that hit the dead backend, how fast callers got an answer,
+               and when the first success came after recovery.
+
+Usage:
+    python benchmarks/bench_resilience.py [--requests 60] [--outage 3]
+"""
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import sys
+import time
+
+import httpx
+import pandas as pd
+import uvicorn
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+for _var in ("AZURE_SQL_DRIVER", "AZURE_SQL_SERVER", "AZURE_SQL_DATABASE", "AZURE_SQL_USER", "AZURE_SQL_PASSWORD"):
+    os.environ.setdefault(_var, "bench")
+os.environ.setdefault("DB_POOL_MIN_SIZE", "0")
+os.environ.setdefault("LOG_LEVEL", "CRITICAL")
+os.environ["RESULT_CACHE_TTL_SECONDS"] = "0"
+
+import server  # noqa: E402
+from core.logging import setup_logging  # noqa: E402
+from core.resilience import CircuitBreaker, RetryPolicy  # noqa: E402
+from fault_backend import FaultBackend  # noqa: E402
+
+# server installs its log handlers at startup, which is not run here
+setup_logging(server.settings.LOG_LEVEL, server.settings.LOG_FORMAT, use_queue=False)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def ask(client, i: int):
+    payload = {
+        "filters": {"Project Identifier": ["PROJECT_A"]},
+        "period": {"start_date": "2025-01-01", "end_date": "2025-03-31"},
+        "mode_type": "Analyze Report",
+        "user_question": f"question {i}",
+    }
+    started = time.perf_counter()
+    response = await client.post("/ask-ai", json=payload)
+    if response.status_code == 200 and "error" not in response.json():
+        kind = "answered"
+    elif response.status_code == 503:
+        kind = "fail_fast"
+    else:
+        kind = "error"
+    return kind, started, time.perf_counter() - started
+
+
+def configure(max_attempts: int, failure_threshold: int, recovery: float):
+    server.backend_retry_policy = RetryPolicy(max_attempts=max_attempts, base_delay=0.1, max_delay=1.0, deadline=10.0)
+    server.backend_breakers["analysis"] = CircuitBreaker("analysis", failure_threshold, recovery)
+
+
+async def transient(client, backend, args):
+    print(f"\ntransient faults: {args.requests} requests, 20% 503 + 10% connection resets")
+    print(f"{'retries':<10} {'answered':>8} {'errors':>7} {'backend calls':>14} {'p50 (s)':>8} {'p95 (s)':>8}")
+    backend.error_rate, backend.reset_rate = 0.2, 0.1
+    for label, attempts in (("off", 1), ("3 attempts", 3)):
+        configure(attempts, failure_threshold=10_000, recovery=1.0)
+        backend.reset_counters()
+        results = []
+        for batch in range(0, args.requests, 10):
+            results += await asyncio.gather(*(ask(client, i) for i in range(batch, min(batch + 10, args.requests))))
+        latencies = sorted(r[2] for r in results)
+        answered = sum(r[0] == "answered" for r in results)
+        print(f"{label:<10} {answered:>8} {len(results) - answered:>7} {backend.counters['calls']:>14} "
+              f"{statistics.median(latencies):>8.2f} {latencies[int(len(latencies) * 0.95) - 1]:>8.2f}")
+    backend.error_rate, backend.reset_rate = 0.0, 0.0
+
+
+async def outage(client, backend, args):
+    duration = args.outage * 2
+    print(f"\noutage: backend down for {args.outage}s, one request every 0.1s for {duration}s")
+    print(f"{'breaker':<26} {'calls to dead backend':>22} {'failed p50 (s)':>15} {'fail-fast':>10} {'first success after':>20}")
+    for label, threshold in (("off", 10_000), ("open after 5, probe 1s", 5)):
+        configure(3, failure_threshold=threshold, recovery=1.0)
+        backend.reset_counters()
+        backend.go_down(args.outage)
+        start = time.perf_counter()
+        tasks = []
+        while time.perf_counter() - start < duration:
+            tasks.append(asyncio.create_task(ask(client, len(tasks))))
+            await asyncio.sleep(0.1)
+        results = await asyncio.gather(*tasks)
+        failed = [r[2] for r in results if r[0] != "answered"]
+        recovered = [r[1] + r[2] - start for r in results if r[0] == "answered"]
+        first_success = min(recovered) - args.outage if recovered else float("nan")
+        print(f"{label:<26} {backend.counters['down']:>22} {statistics.median(failed) if failed else 0:>15.2f} "
+              f"{sum(r[0] == 'fail_fast' for r in results):>10} {first_success:>19.2f}s")
+        await asyncio.sleep(1.5)
+
+
+async def main(args):
+    backend = FaultBackend(latency=0.05)
+    port = free_port()
+    stand_in = uvicorn.Server(uvicorn.Config(backend, host="127.0.0.1", port=port, lifespan="off", log_level="critical"))
+    serve_task = asyncio.create_task(stand_in.serve())
+    while not stand_in.started:
+        await asyncio.sleep(0.05)
+
+    server.ANALYSIS_API_ENDPOINT = f"http://127.0.0.1:{port}/api/v1/analysis"
+    server.get_data_from_db = lambda filters, start, end: pd.DataFrame({
+        "date": ["2025-01-01", "2025-01-02"],
+        "Metric_Name": ["TestCaseActual", "TestCaseActual"],
+        "Metric_Value": [10, 12],
+    })
+    server.backend_client = httpx.AsyncClient()
+    try:
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            await transient(client, backend, args)
+            await outage(client, backend, args)
+    finally:
+        await server.backend_client.aclose()
+        stand_in.should_exit = True
+        await serve_task
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backend retry / circuit breaker test")
+    parser.add_argument("--requests", type=int, default=60)
+    parser.add_argument("--outage", type=float, default=3.0)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,132 @@
+"""
+Benchmark: time to first token, streamed vs buffered /ask-ai
+
+A stand-in Backend API generates an answer of --tokens tokens, one every
+--token-seconds (an LLM decoding), either as SSE token events or, without
+`Accept: text/event-stream`, as one JSON document once generation is done.
+Both the stand-in and the extension server run under uvicorn on local ports,
+so the measurement covers real HTTP framing end to end. SQL is stubbed out.
+
+Usage:
+    python benchmarks/bench_streaming.py [--tokens 200] [--token-seconds 0.01] [--repeat 3]
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import sys
+import time
+
+import httpx
+import pandas as pd
+import uvicorn
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+for _var in ("AZURE_SQL_DRIVER", "AZURE_SQL_SERVER", "AZURE_SQL_DATABASE", "AZURE_SQL_USER", "AZURE_SQL_PASSWORD"):
+    os.environ.setdefault(_var, "bench")
+os.environ.setdefault("DB_POOL_MIN_SIZE", "0")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+os.environ["RESULT_CACHE_TTL_SECONDS"] = "0"
+os.environ["ASK_AI_STREAMING"] = "true"
+
+import server  # noqa: E402
+from core.logging import setup_logging  # noqa: E402
+from core.sse import SSEParser  # noqa: E402
+
+# server installs its log handlers at startup, which is not run here
+setup_logging(server.settings.LOG_LEVEL, server.settings.LOG_FORMAT, use_queue=False)
+
+
+class TokenBackend:
+    """ASGI stand-in for the Backend API that generates tokens at a fixed rate"""
+
+    def __init__(self, tokens: int, token_seconds: float):
+        self.tokens = tokens
+        self.token_seconds = token_seconds
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return
+        while (await receive()).get("more_body"):
+            pass
+        stream = any(name == b"accept" and b"text/event-stream" in value for name, value in scope["headers"])
+        words = [f" word{i}" for i in range(self.tokens)]
+        if not stream:
+            await asyncio.sleep(self.token_seconds * self.tokens)
+            body = json.dumps({"status": "success", "message": "".join(words)}).encode()
+            await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"application/json")]})
+            await send({"type": "http.response.body", "body": body})
+            return
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"text/event-stream")]})
+        for word in words:
+            await asyncio.sleep(self.token_seconds)
+            event = f"event: token\ndata: {json.dumps({'text': word})}\n\n".encode()
+            await send({"type": "http.response.body", "body": event, "more_body": True})
+        done = f"event: done\ndata: {json.dumps({'status': 'success', 'message': ''.join(words)})}\n\n".encode()
+        await send({"type": "http.response.body", "body": done})
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def start(app, port: int, **kwargs) -> uvicorn.Server:
+    instance = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="critical", **kwargs))
+    asyncio.create_task(instance.serve())
+    while not instance.started:
+        await asyncio.sleep(0.05)
+    return instance
+
+
+async def measure(client: httpx.AsyncClient, url: str, stream: bool):
+    payload = {"filters": {"Project Identifier": ["PROJECT_A"]}, "mode_type": "Analyze Report", "user_question": str(time.time())}
+    headers = {"Accept": "text/event-stream"} if stream else {}
+    started = time.perf_counter()
+    first = None
+    async with client.stream("POST", url, json=payload, headers=headers) as response:
+        parser = SSEParser()
+        async for chunk in response.aiter_bytes():
+            if not stream:
+                continue
+            for event, _ in parser.feed(chunk):
+                if event == "token" and first is None:
+                    first = time.perf_counter() - started
+    total = time.perf_counter() - started
+    return (first if first is not None else total), total
+
+
+async def main(args):
+    backend_port, ext_port = free_port(), free_port()
+    backend = await start(TokenBackend(args.tokens, args.token_seconds), backend_port, lifespan="off")
+
+    server.ANALYSIS_API_ENDPOINT = f"http://127.0.0.1:{backend_port}/api/v1/analysis"
+    server.get_data_from_db = lambda filters, start, end: pd.DataFrame({
+        "date": ["2025-01-01", "2025-01-02"],
+        "Metric_Name": ["TestCaseActual", "TestCaseActual"],
+        "Metric_Value": [10, 12],
+    })
+    extension = await start(server.app, ext_port)
+
+    url = f"http://127.0.0.1:{ext_port}/ask-ai"
+    print(f"answer of {args.tokens} tokens at {args.token_seconds * 1000:.0f} ms/token")
+    print(f"{'mode':<10} {'first token (s)':>16} {'complete (s)':>13}")
+    async with httpx.AsyncClient(timeout=None) as client:
+        for label, stream in (("buffered", False), ("streamed", True)):
+            results = [await measure(client, url, stream) for _ in range(args.repeat)]
+            first = min(r[0] for r in results)
+            total = min(r[1] for r in results)
+            print(f"{label:<10} {first:>16.3f} {total:>13.3f}")
+
+    extension.should_exit = backend.should_exit = True
+    await asyncio.sleep(0.2)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Streaming /ask-ai benchmark")
+    parser.add_argument("--tokens", type=int, default=200)
+    parser.add_argument("--token-seconds", type=float, default=0.01)
+    parser.add_argument("--repeat", type=int, default=3)
+    asyncio.run(main(parser.parse_args()))
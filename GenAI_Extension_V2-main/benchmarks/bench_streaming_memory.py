@@ -0,0 +1,65 @@
+"""
+Memory benchmark: pd.read_sql + pivot vs streamed fetchmany + incremental pivot
+
+Loads the SQLite stand-in of the view from verify_query_modes.py, then
+measures peak Python heap (tracemalloc) and wall time for an "all available
+data" request (no period, no filters) in both modes.
+
+Usage:
+    python benchmarks/bench_streaming_memory.py [--days 1500] [--projects 50] [--batch-size 5000]
+"""
+import argparse
+import contextlib
+import os
+import time
+import tracemalloc
+
+from verify_query_modes import create_stand_in, server
+
+from core.db_pool import ConnectionPool
+
+
+def measure(fn):
+    tracemalloc.start()
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(open(os.devnull, "w")):
+        result = fn()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, peak, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Streaming fetch memory benchmark")
+    parser.add_argument("--days", type=int, default=1500)
+    parser.add_argument("--projects", type=int, default=50)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    conn = create_stand_in(args.days, args.projects)
+    server.db_pool = ConnectionPool(lambda: conn, min_size=0, max_size=1)
+    server.db_pool.open()
+
+    def full_load():
+        df = server.get_data_from_db({}, None, None, server.QUERY_MODE_EAV)
+        return server.process_data_to_metrics(df, server.QUERY_MODE_EAV)
+
+    def streamed():
+        return server.stream_metrics_from_db({}, None, None, args.batch_size)
+
+    full_records, full_peak, full_s = measure(full_load)
+    stream_records, stream_peak, stream_s = measure(streamed)
+    if full_records != stream_records:
+        raise SystemExit("❌ Streaming and full load produced different metrics_data")
+
+    raw_rows = args.days * args.projects * (len(server.METRIC_VALUE_MAPPING) + 1)
+    print(f"Raw EAV rows: {raw_rows}, dates: {len(full_records)}, batch size: {args.batch_size}")
+    print(f"{'mode':<22} {'peak heap (MB)':>15} {'time (s)':>9}")
+    print(f"{'pd.read_sql + pivot':<22} {full_peak / 1e6:>15.1f} {full_s:>9.2f}")
+    print(f"{'fetchmany streaming':<22} {stream_peak / 1e6:>15.1f} {stream_s:>9.2f}")
+    print(f"Peak memory reduction: {full_peak / stream_peak:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
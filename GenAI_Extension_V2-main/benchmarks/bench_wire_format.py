@@ -0,0 +1,106 @@
+"""
+Benchmark: metrics_data wire formats between extension server and backend
+
+For each period length, builds a backend payload of daily records with all 13
+metrics and measures, per format / Content-Encoding:
+  - bytes on the wire
+  - serialize: encode_backend_body (columnar conversion + json.dumps + compression)
+  - parse: decompression + json.loads + AnalysisRequest.model_validate, i.e.
+    what the backend's middleware and FastAPI do with the body
+
+Needs the backend package next to this repo (../GenAI_Backend_Server_AzFunc).
+
+Usage:
+    python benchmarks/bench_wire_format.py [--days 90 365 1825] [--repeat 5]
+"""
+import argparse
+import datetime
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+from verify_query_modes import server
+
+from core.wire_format import (
+    ENCODING_GZIP,
+    ENCODING_IDENTITY,
+    ENCODING_ZSTD,
+    METRICS_FORMAT_COLUMNAR,
+    METRICS_FORMAT_RECORDS,
+    zstd_available,
+)
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "GenAI_Backend_Server_AzFunc")
+sys.path.insert(0, BACKEND_DIR)
+from app.core.content_encoding import DECODERS  # noqa: E402
+from app.models.schemas.analysis import AnalysisRequest  # noqa: E402
+
+
+def make_payload(days: int):
+    rng = np.random.default_rng(0)
+    start = datetime.date(2020, 1, 1)
+    values = rng.integers(0, 5000, (days, len(server.METRIC_VALUE_MAPPING)))
+    records = [
+        {"date": (start + datetime.timedelta(days=i)).isoformat(),
+         **{name: int(v) for name, v in zip(server.METRIC_VALUE_MAPPING, row)}}
+        for i, row in enumerate(values)
+    ]
+    request = server.RequestPayload(filters={"Project Identifier": ["PROJECT_A"], "Redmine Infra": ["INFRA_1"]})
+    period = {"start_date": records[0]["date"], "end_date": records[-1]["date"]}
+    return server.build_backend_payload(request, records, period, "bench")
+
+
+def parse(body: bytes, headers: dict):
+    encoding = headers.get("Content-Encoding")
+    if encoding:
+        body = DECODERS[encoding](body, 1 << 30)
+    return AnalysisRequest.model_validate(json.loads(body))
+
+
+def best_of(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="metrics_data wire format benchmark")
+    parser.add_argument("--days", type=int, nargs="+", default=[90, 365, 1825])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    server.settings.BACKEND_COMPRESSION_MIN_BYTES = 0
+    variants = [
+        (METRICS_FORMAT_RECORDS, ENCODING_IDENTITY),
+        (METRICS_FORMAT_COLUMNAR, ENCODING_IDENTITY),
+        (METRICS_FORMAT_RECORDS, ENCODING_GZIP),
+        (METRICS_FORMAT_COLUMNAR, ENCODING_GZIP),
+    ]
+    if zstd_available():
+        variants.append((METRICS_FORMAT_COLUMNAR, ENCODING_ZSTD))
+
+    print(f"{'days':>5} {'format':<9} {'encoding':<9} {'bytes':>9} {'ratio':>6} {'serialize ms':>13} {'parse ms':>9} {'total ms':>9}")
+    for days in args.days:
+        payload = make_payload(days)
+        baseline = None
+        for metrics_format, encoding in variants:
+            body, headers = server.encode_backend_body(payload, metrics_format, encoding)
+            parsed = parse(body, headers)
+            if len(parsed.metrics_data) != days:
+                raise SystemExit(f"Round trip lost records: {metrics_format}/{encoding}")
+
+            serialize_s = best_of(lambda: server.encode_backend_body(payload, metrics_format, encoding), args.repeat)
+            parse_s = best_of(lambda: parse(body, headers), args.repeat)
+            baseline = baseline or len(body)
+            print(f"{days:>5} {metrics_format:<9} {encoding:<9} {len(body):>9} {baseline / len(body):>5.1f}x "
+                  f"{serialize_s * 1000:>13.2f} {parse_s * 1000:>9.2f} {(serialize_s + parse_s) * 1000:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
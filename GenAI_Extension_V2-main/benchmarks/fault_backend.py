@@ -0,0 +1,106 @@
+"""
+Fault-injecting stand-in for the Backend API
+
+Answers POST {prefix}/analysis and {prefix}/assistant like the real backend,
+after `latency` seconds, except that a share of calls fail:
+  - error_rate: 503 Service Unavailable
+  - reset_rate: the connection is dropped after the response headers, which
+    the client sees as a protocol/connection error
+  - POST /fault/down?seconds=N: every call answers 503 for N seconds (outage)
+GET /fault/stats returns the call counters; POST /fault/reset clears them.
+
+Used by bench_resilience.py in-process, or standalone in place of the backend:
+    python benchmarks/fault_backend.py --port 7071 --error-rate 0.2 --reset-rate 0.1
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from urllib.parse import parse_qs
+
+
+class FaultBackend:
+    """Plain ASGI app (no lifespan) so it can also run under uvicorn directly"""
+
+    def __init__(self, error_rate: float = 0.0, reset_rate: float = 0.0, latency: float = 0.05,
+                 prefix: str = "/api/v1", seed: int = 0):
+        self.error_rate = error_rate
+        self.reset_rate = reset_rate
+        self.latency = latency
+        self.prefix = prefix
+        self.down_until = 0.0
+        self.random = random.Random(seed)
+        self.counters = {}
+        self.reset_counters()
+
+    def reset_counters(self):
+        self.counters = {"calls": 0, "ok": 0, "errors": 0, "resets": 0, "down": 0}
+
+    def go_down(self, seconds: float):
+        self.down_until = time.monotonic() + seconds
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return
+        path, method = scope["path"], scope["method"]
+        if path == "/fault/stats":
+            await self._send(send, 200, self.counters)
+        elif path == "/fault/reset" and method == "POST":
+            self.reset_counters()
+            await self._send(send, 200, self.counters)
+        elif path == "/fault/down" and method == "POST":
+            seconds = float(parse_qs(scope["query_string"].decode()).get("seconds", ["10"])[0])
+            self.go_down(seconds)
+            await self._send(send, 200, {"down_for": seconds})
+        elif path in (f"{self.prefix}/analysis", f"{self.prefix}/assistant") and method == "POST":
+            await self._drain(receive)
+            await self._backend_call(send)
+        else:
+            await self._send(send, 404, {"detail": "Not Found"})
+
+    async def _backend_call(self, send):
+        self.counters["calls"] += 1
+        await asyncio.sleep(self.latency)
+        if time.monotonic() < self.down_until:
+            self.counters["down"] += 1
+            await self._send(send, 503, {"detail": "backend down"})
+            return
+        roll = self.random.random()
+        if roll < self.reset_rate:
+            self.counters["resets"] += 1
+            await send({"type": "http.response.start", "status": 200,
+                        "headers": [(b"content-type", b"application/json"), (b"content-length", b"100")]})
+            raise ConnectionResetError("injected connection reset")
+        if roll < self.reset_rate + self.error_rate:
+            self.counters["errors"] += 1
+            await self._send(send, 503, {"detail": "injected failure"})
+            return
+        self.counters["ok"] += 1
+        await self._send(send, 200, {"status": "success", "message": "analysis result"})
+
+    @staticmethod
+    async def _drain(receive):
+        more_body = True
+        while more_body:
+            message = await receive()
+            more_body = message.get("more_body", False)
+
+    @staticmethod
+    async def _send(send, status: int, content: dict):
+        body = json.dumps(content).encode()
+        await send({"type": "http.response.start", "status": status,
+                    "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]})
+        await send({"type": "http.response.body", "body": body})
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Fault-injecting Backend API stand-in")
+    parser.add_argument("--port", type=int, default=7071)
+    parser.add_argument("--error-rate", type=float, default=0.2)
+    parser.add_argument("--reset-rate", type=float, default=0.1)
+    parser.add_argument("--latency", type=float, default=0.5)
+    args = parser.parse_args()
+    uvicorn.run(FaultBackend(args.error_rate, args.reset_rate, args.latency), port=args.port, lifespan="off", log_level="warning")
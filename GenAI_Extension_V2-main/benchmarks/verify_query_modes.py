@@ -0,0 +1,143 @@
+"""
+Verify "eav" (buffered and streamed) and "pivot" query modes give identical
+metrics_data, and compare rows/bytes fetched and Python processing time.
+
+Checked for one project, several projects and all projects, so duplicate
+(date, metric) rows are covered; one project also carries extra duplicate
+rows per date/metric. Every mode must reduce duplicates with MAX.
+
+Uses SQLite as a local stand-in for Azure SQL: the view is loaded into an
+attached database named like DB_SCHEMA_NAME so the [schema].[view] names in
+build_query work unchanged. The only dialect difference is TRY_CAST, which
+SQLite lacks; it is rewritten to CAST (the generated data is all numeric).
+
+Usage:
+    python benchmarks/verify_query_modes.py [--days 730] [--projects 20] [--batch 5000]
+"""
+import argparse
+import datetime
+import os
+import sqlite3
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+for _var in ("AZURE_SQL_DRIVER", "AZURE_SQL_SERVER", "AZURE_SQL_DATABASE", "AZURE_SQL_USER", "AZURE_SQL_PASSWORD"):
+    os.environ.setdefault(_var, "bench")
+os.environ.setdefault("DB_POOL_MIN_SIZE", "0")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+import server  # noqa: E402
+from core.pivot import MetricsAccumulator  # noqa: E402
+
+
+def create_stand_in(days: int, projects: int) -> sqlite3.Connection:
+    conn = sqlite3.connect(":memory:", check_same_thread=False)
+    conn.execute(f"ATTACH DATABASE ':memory:' AS [{server.DB_SCHEMA_NAME}]")
+    conn.execute(f"""
+        CREATE TABLE [{server.DB_SCHEMA_NAME}].[{server.DB_VIEW_NAME}] (
+            date TEXT, Metric_Name TEXT, Metric_Value REAL,
+            project_identifier TEXT, redmine_infra TEXT, redmine_server TEXT, redmine_instance TEXT,
+            filter_1 TEXT, filter_2 TEXT, filter_3 TEXT, filter_4 TEXT, filter_5 TEXT
+        )
+    """)
+
+    rng = np.random.default_rng(0)
+    metric_names = list(server.METRIC_VALUE_MAPPING.keys()) + ["UnmappedMetric"]
+    start = datetime.date(2024, 1, 1)
+    rows = []
+    for p in range(projects):
+        for d in range(days):
+            day = (start + datetime.timedelta(days=d)).isoformat()
+            values = rng.integers(0, 1000, len(metric_names))
+            for name, value in zip(metric_names, values):
+                rows.append((day, name, float(value), f"PROJECT_{p}", "INFRA_1", "SERVER_1", "INSTANCE_1",
+                             "F1", None, None, None, None))
+                # Duplicate rows within one project (e.g. several test plans per day)
+                if p == 0 and d % 3 == 0:
+                    rows.append((day, name, float(value + rng.integers(-500, 500)), f"PROJECT_{p}", "INFRA_1",
+                                 "SERVER_1", "INSTANCE_1", "F2", None, None, None, None))
+    conn.executemany(
+        f"INSERT INTO [{server.DB_SCHEMA_NAME}].[{server.DB_VIEW_NAME}] VALUES ({', '.join(['?'] * 12)})", rows
+    )
+    # Committed: the pool rolls connections back when they are returned
+    conn.commit()
+    return conn
+
+
+def fetch(conn, filters, period_start, period_end, mode):
+    sql, params = server.build_query(filters, period_start, period_end, mode)
+    sql = sql.replace("TRY_CAST(", "CAST(")
+    started = time.perf_counter()
+    df = pd.read_sql(sql, conn, params=params)
+    fetch_s = time.perf_counter() - started
+    return df, fetch_s
+
+
+def stream(df: pd.DataFrame, batch: int):
+    """The DB_STREAM_BATCH_SIZE path: EAV rows folded batch by batch into MetricsAccumulator"""
+    accumulator = MetricsAccumulator(server.METRIC_VALUE_MAPPING)
+    for start in range(0, len(df), batch):
+        chunk = df.iloc[start:start + batch]
+        accumulator.add_batch(chunk["date"], chunk["Metric_Name"], chunk["Metric_Value"])
+    return accumulator.result().to_records()
+
+
+def compare(conn, label, filters, period, batch):
+    df_eav, eav_fetch = fetch(conn, filters, *period, server.QUERY_MODE_EAV)
+    df_pivot, pivot_fetch = fetch(conn, filters, *period, server.QUERY_MODE_PIVOT)
+
+    started = time.perf_counter()
+    eav_records = server.process_data_to_metrics(df_eav.copy(), server.QUERY_MODE_EAV)
+    eav_process = time.perf_counter() - started
+
+    started = time.perf_counter()
+    pivot_records = server.process_data_to_metrics(df_pivot.copy(), server.QUERY_MODE_PIVOT)
+    pivot_process = time.perf_counter() - started
+
+    # Reversed row order: MAX must not depend on the order rows come back in
+    streamed_records = stream(df_eav.iloc[::-1], batch)
+
+    if eav_records != pivot_records:
+        raise SystemExit(f"❌ {label}: eav and pivot modes produced different metrics_data")
+    if streamed_records != eav_records:
+        raise SystemExit(f"❌ {label}: streamed eav produced different metrics_data")
+
+    print(f"✅ {label}: identical output, {len(eav_records)} records")
+    for mode, df, fetch_s, process_s in (
+        ("eav", df_eav, eav_fetch, eav_process),
+        ("pivot", df_pivot, pivot_fetch, pivot_process),
+    ):
+        size = int(df.memory_usage(index=False, deep=True).sum())
+        print(f"   {mode:<6} {len(df):>8} {size:>11} {fetch_s:>10.4f} {process_s:>12.4f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare eav vs pivot query modes on SQLite")
+    parser.add_argument("--days", type=int, default=730)
+    parser.add_argument("--projects", type=int, default=20)
+    parser.add_argument("--batch", type=int, default=5000, help="rows per batch for the streamed eav check")
+    args = parser.parse_args()
+
+    conn = create_stand_in(args.days, args.projects)
+    period = ("2024-01-01", "2025-12-31")
+    cases = [
+        # One project per request, as the dashboard usually does
+        ("one project", {"Project Identifier": ["PROJECT_3"], "Redmine Infra": ["(All)"]}),
+        # Duplicate rows within the project
+        ("duplicate rows", {"Project Identifier": ["PROJECT_0"]}),
+        # Several projects: one row per project for every date/metric
+        ("several projects", {"Project Identifier": [f"PROJECT_{p}" for p in range(min(3, args.projects))]}),
+        ("all projects", {"Project Identifier": ["(All)"]}),
+    ]
+
+    print(f"   {'mode':<6} {'rows':>8} {'bytes':>11} {'fetch (s)':>10} {'process (s)':>12}")
+    for label, filters in cases:
+        compare(conn, label, filters, period, args.batch)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -8,6 +10,98 @@ class Settings(BaseSettings):
     AZURE_SQL_PASSWORD: str
     AZURE_CONNECT_TIMEOUT: int = 30
 
+    # Logging: level (DEBUG shows SQL, params, DataFrame previews), "text" or "json",
+    # and whether records are written by a background queue thread
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: Literal["text", "json"] = "text"
+    LOG_ASYNC: bool = True
+
+    # "eav": fetch raw (date, Metric_Name, Metric_Value) rows and pivot in pandas
+    # "pivot": let SQL Server pivot, one row per date
+    DB_QUERY_MODE: Literal["eav", "pivot"] = "eav"
+    # > 0: stream EAV rows with cursor.fetchmany(batch) into an incremental pivot
+    # instead of loading the whole result with pd.read_sql (eav mode only)
+    DB_STREAM_BATCH_SIZE: int = 0
+
+    # Database connection pool
+    DB_POOL_MIN_SIZE: int = 1
+    DB_POOL_MAX_SIZE: int = 10
+    DB_POOL_ACQUIRE_TIMEOUT: float = 30.0
+    DB_POOL_MAX_IDLE_SECONDS: float = 300.0
+    DB_POOL_MAX_LIFETIME_SECONDS: float = 1800.0
+
+    # Shared HTTP client for Backend API calls
+    BACKEND_MAX_CONNECTIONS: int = 100
+    BACKEND_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    BACKEND_KEEPALIVE_EXPIRY: float = 30.0
+    BACKEND_HTTP2: bool = False
+    BACKEND_CONNECT_TIMEOUT: float = 5.0
+    BACKEND_READ_TIMEOUT: float = 60.0
+    BACKEND_WRITE_TIMEOUT: float = 10.0
+    BACKEND_POOL_TIMEOUT: float = 5.0
+
+    # metrics_data wire format and request compression, used once the backend
+    # advertises support for them (X-Accept-Metrics-Formats / Accept-Encoding)
+    BACKEND_METRICS_FORMAT: Literal["records", "columnar"] = "records"
+    BACKEND_CONTENT_ENCODING: Literal["identity", "gzip", "zstd"] = "identity"
+    BACKEND_COMPRESSION_MIN_BYTES: int = 1024
+
+    # Downsampling of metrics_data above a record / estimated token budget (see core.downsample):
+    # "auto" = weekly, else monthly, else lttb, whichever fits; METRICS_MAX_TOKENS <= 0 means no token budget.
+    # Off by default: the result is sent with request_meta.metrics_granularity, which the Backend API
+    # must honor (per-record rather than per-day figures)
+    METRICS_DOWNSAMPLE: Literal["off", "auto", "weekly", "monthly", "lttb"] = "off"
+    METRICS_MAX_RECORDS: int = 730
+    METRICS_MAX_TOKENS: int = 0
+
+    # Admission control per Backend API endpoint (analysis / assistant): concurrent
+    # calls, callers allowed to queue for a slot, and how long they may wait.
+    # Beyond that /ask-ai answers 429 (queue full) or 503 (wait timed out) with Retry-After
+    BACKEND_ANALYSIS_MAX_CONCURRENCY: int = 8
+    BACKEND_ASSISTANT_MAX_CONCURRENCY: int = 8
+    BACKEND_MAX_QUEUE: int = 32
+    BACKEND_QUEUE_TIMEOUT: float = 10.0
+
+    # Retries of transient Backend API failures (connect errors / timeouts, pool timeouts, 502/503/504;
+    # not read timeouts, the backend may still be working on the request):
+    # attempts in total, exponential backoff with full jitter, and a deadline (seconds)
+    # for all attempts together that also caps each attempt's timeouts
+    BACKEND_RETRY_MAX_ATTEMPTS: int = 3
+    BACKEND_RETRY_BASE_DELAY: float = 0.5
+    BACKEND_RETRY_MAX_DELAY: float = 4.0
+    BACKEND_RETRY_DEADLINE: float = 90.0
+    # Circuit breaker per endpoint: opens after this many consecutive failures and
+    # lets one probe through after the recovery time (seconds)
+    BACKEND_BREAKER_FAILURE_THRESHOLD: int = 5
+    BACKEND_BREAKER_RECOVERY_SECONDS: float = 30.0
+
+    # Worker threads for blocking DB/pandas stages (keep <= DB_POOL_MAX_SIZE)
+    BLOCKING_WORKERS: int = 8
+
+    # metrics_data result cache (TTL <= 0 disables it)
+    RESULT_CACHE_TTL_SECONDS: float = 300.0
+    RESULT_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    # Shared secret for POST /cache/invalidate, sent as header X-Admin-Token;
+    # empty (the default) disables the endpoint
+    CACHE_ADMIN_TOKEN: str = ""
+
+    # JSON library for the /ask-ai response and Backend API body ("orjson" needs the orjson package)
+    JSON_LIBRARY: Literal["stdlib", "orjson"] = "stdlib"
+
+    # Share one execution between identical concurrent /ask-ai requests
+    ASK_AI_COALESCING: bool = True
+    # Stream /ask-ai answers as Server-Sent Events to clients that accept them.
+    # Off by default: streamed requests are not coalesced (one Backend API call each),
+    # and a Backend API on Azure Functions buffers the whole answer anyway
+    ASK_AI_STREAMING: bool = False
+
+    # gzip/brotli response compression ("br" needs the brotli package);
+    # responses smaller than COMPRESSION_MIN_SIZE bytes are sent as-is
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_SIZE: int = 1024
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 5
+
     class Config:
         env_file = ".env"
 
@@ -0,0 +1,147 @@
+"""
+Admission control for Backend API (LLM) calls.
+
+Each backend endpoint gets an AdmissionLimiter: at most `max_concurrency`
+calls run at once, up to `max_queue` more wait (FIFO) for at most
+`queue_timeout` seconds, and everything beyond that is shed immediately:
+
+  - queue full        -> AdmissionRejected(429)
+  - waited too long   -> AdmissionRejected(503)
+
+both with a Retry-After estimate derived from the recent call duration.
+Shedding early keeps a burst of dashboard users from piling unbounded
+60-second calls onto the backend until they all time out together.
+
+Like SingleFlight, a limiter is only used from the event loop thread.
+"""
+import asyncio
+import contextlib
+import math
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Deque, Dict, Optional
+
+REJECT_QUEUE_FULL = "queue_full"
+REJECT_QUEUE_TIMEOUT = "queue_timeout"
+
+# Weight of the latest call in the moving average used for Retry-After
+_SERVICE_TIME_ALPHA = 0.2
+_MAX_RETRY_AFTER_S = 120
+
+
+class AdmissionRejected(Exception):
+    """Request shed by an AdmissionLimiter; carries the HTTP status and Retry-After"""
+
+    def __init__(self, name: str, status_code: int, retry_after: int, reason: str):
+        super().__init__(f"{name}: {reason}, retry after {retry_after}s")
+        self.name = name
+        self.status_code = status_code
+        self.retry_after = retry_after
+        self.reason = reason
+
+
+class AdmissionLimiter:
+    # stats() keys that only grow: exported as counters by GET /metrics
+    STATS_COUNTERS = ("admitted_total", "queued_total", "rejected_queue_full", "rejected_queue_timeout")
+
+    def __init__(self, name: str, max_concurrency: int, max_queue: int, queue_timeout: float):
+        if max_concurrency < 1:
+            raise ValueError(f"max_concurrency must be >= 1, got {max_concurrency}")
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.max_queue = max(max_queue, 0)
+        self.queue_timeout = queue_timeout
+
+        self._active = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._service_time: Optional[float] = None
+
+        self._admitted_total = 0
+        self._queued_total = 0
+        self._rejected_queue_full = 0
+        self._rejected_timeout = 0
+        self._max_queue_depth = 0
+        self._queue_waits = 0
+        self._queue_wait_total = 0.0
+        self._queue_wait_max = 0.0
+
+    @contextlib.asynccontextmanager
+    async def slot(self) -> AsyncIterator[float]:
+        """Hold one of the concurrent slots; yields the seconds spent queued"""
+        waited = await self._acquire()
+        started = time.monotonic()
+        try:
+            yield waited
+        finally:
+            elapsed = time.monotonic() - started
+            if self._service_time is None:
+                self._service_time = elapsed
+            else:
+                self._service_time += _SERVICE_TIME_ALPHA * (elapsed - self._service_time)
+            self._release()
+
+    def retry_after(self) -> int:
+        """Seconds until the current queue has likely drained"""
+        service_time = self._service_time if self._service_time is not None else self.queue_timeout
+        estimate = service_time * (len(self._waiters) + 1) / self.max_concurrency
+        return min(max(math.ceil(estimate), 1), _MAX_RETRY_AFTER_S)
+
+    async def _acquire(self) -> float:
+        if self._active < self.max_concurrency and not self._waiters:
+            self._active += 1
+            self._admitted_total += 1
+            return 0.0
+
+        if len(self._waiters) >= self.max_queue:
+            self._rejected_queue_full += 1
+            raise AdmissionRejected(self.name, 429, self.retry_after(), REJECT_QUEUE_FULL)
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._queued_total += 1
+        self._max_queue_depth = max(self._max_queue_depth, len(self._waiters))
+        queued_at = time.monotonic()
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except BaseException as exc:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as we gave up: pass it on
+                self._release()
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+            if isinstance(exc, asyncio.TimeoutError):
+                self._rejected_timeout += 1
+                raise AdmissionRejected(self.name, 503, self.retry_after(), REJECT_QUEUE_TIMEOUT) from None
+            raise
+
+        waited = time.monotonic() - queued_at
+        self._admitted_total += 1
+        self._queue_waits += 1
+        self._queue_wait_total += waited
+        self._queue_wait_max = max(self._queue_wait_max, waited)
+        return waited
+
+    def _release(self) -> None:
+        # Hand the slot straight to the oldest live waiter, so newcomers cannot overtake the queue
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self._active -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "active": self._active,
+            "queue_depth": len(self._waiters),
+            "max_queue_depth": self._max_queue_depth,
+            "admitted_total": self._admitted_total,
+            "queued_total": self._queued_total,
+            "rejected_queue_full": self._rejected_queue_full,
+            "rejected_queue_timeout": self._rejected_timeout,
+            "queue_wait_avg_s": round(self._queue_wait_total / self._queue_waits, 6) if self._queue_waits else 0.0,
+            "queue_wait_max_s": round(self._queue_wait_max, 6),
+            "retry_after_s": self.retry_after(),
+        }
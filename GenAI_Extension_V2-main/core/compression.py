@@ -0,0 +1,213 @@
+"""
+Response compression (gzip / brotli) negotiated via Accept-Encoding.
+
+CompressionMiddleware compresses compressible responses (HTML, JSON, JS,
+CSS, ...) of at least `minimum_size` bytes. Responses that already carry a
+Content-Encoding (e.g. precompressed static files) and Server-Sent Events
+are passed through untouched. Streaming bodies are compressed chunk by chunk
+with a sync flush, so nothing is held back waiting for the end of the body.
+A strong ETag on a response compressed here is weakened (W/"..."): it was
+computed for the identity bytes, which the client no longer receives.
+
+brotli needs the optional `brotli` package; without it only gzip is offered.
+"""
+import importlib.util
+import zlib
+from typing import List, Optional, Sequence
+
+ENCODING_BROTLI = "br"
+ENCODING_GZIP = "gzip"
+
+COMPRESSIBLE_MEDIA_TYPES = (
+    "text/",
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+)
+# Compressing per event would add latency and break proxies' event framing
+EXCLUDED_MEDIA_TYPES = ("text/event-stream",)
+
+
+def brotli_available() -> bool:
+    return importlib.util.find_spec("brotli") is not None
+
+
+def available_encodings() -> List[str]:
+    """Supported encodings, preferred first"""
+    if brotli_available():
+        return [ENCODING_BROTLI, ENCODING_GZIP]
+    return [ENCODING_GZIP]
+
+
+def negotiate_encoding(accept_encoding: Optional[str], offered: Sequence[str]) -> Optional[str]:
+    """
+    Pick the best of `offered` (in server preference order) that the client
+    accepts with q > 0; None means identity
+    """
+    if not accept_encoding:
+        return None
+
+    accepted = {}
+    for item in accept_encoding.split(","):
+        token, _, params = item.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[token] = q
+
+    for encoding in offered:
+        q = accepted.get(encoding, accepted.get("*", 0.0))
+        if q > 0:
+            return encoding
+    return None
+
+
+def is_compressible(content_type: str) -> bool:
+    content_type = content_type.split(";", 1)[0].strip().lower()
+    if content_type in EXCLUDED_MEDIA_TYPES:
+        return False
+    return content_type.startswith(COMPRESSIBLE_MEDIA_TYPES) or content_type.endswith("+json")
+
+
+class _GzipEncoder:
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        out = self._compressor.compress(data)
+        return out + self._compressor.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+class _BrotliEncoder:
+    def __init__(self, quality: int):
+        import brotli
+
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        out = self._compressor.process(data)
+        return out + (self._compressor.finish() if final else self._compressor.flush())
+
+
+def compress_bytes(data: bytes, encoding: str, gzip_level: int = 6, brotli_quality: int = 5) -> bytes:
+    """One-shot compression, e.g. for precompressed static variants"""
+    encoder = _BrotliEncoder(brotli_quality) if encoding == ENCODING_BROTLI else _GzipEncoder(gzip_level)
+    return encoder.compress(data, final=True)
+
+
+def _weaken_etag(headers: list) -> list:
+    return [
+        (name, b"W/" + value if name == b"etag" and not value.startswith(b"W/") else value)
+        for name, value in headers
+    ]
+
+
+def _add_vary(headers: list) -> list:
+    for i, (name, value) in enumerate(headers):
+        if name == b"vary":
+            if b"accept-encoding" not in value.lower():
+                headers[i] = (name, value + b", Accept-Encoding")
+            return headers
+    headers.append((b"vary", b"Accept-Encoding"))
+    return headers
+
+
+class CompressionMiddleware:
+    def __init__(self, app, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 5):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.encodings = available_encodings()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding = None
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accept_encoding = value.decode("latin-1")
+                break
+        encoding = negotiate_encoding(accept_encoding, self.encodings)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        await self.app(scope, receive, _CompressingSend(self, encoding, send))
+
+
+class _CompressingSend:
+    """The `send` callable handed to the app for one compressible request"""
+
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self.send = send
+        self.start_message = None
+        self.encoder = None
+        self.passthrough = False
+
+    def _new_encoder(self):
+        if self.encoding == ENCODING_BROTLI:
+            return _BrotliEncoder(self.middleware.brotli_quality)
+        return _GzipEncoder(self.middleware.gzip_level)
+
+    async def __call__(self, message):
+        message_type = message["type"]
+        if message_type == "http.response.start":
+            self.start_message = message
+            headers = {name: value for name, value in message.get("headers", [])}
+            content_type = headers.get(b"content-type", b"").decode("latin-1")
+            self.passthrough = (
+                b"content-encoding" in headers
+                or not is_compressible(content_type)
+                or message["status"] < 200
+                or message["status"] in (204, 206, 304)
+            )
+            if self.passthrough:
+                await self.send(message)
+            return
+
+        if message_type != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.start_message is not None:
+            start, self.start_message = self.start_message, None
+            headers = [(name, value) for name, value in start.get("headers", []) if name != b"content-length"]
+
+            if not more_body and len(body) < self.middleware.minimum_size:
+                # Too small to be worth it: send unchanged
+                self.passthrough = True
+                await self.send(start)
+                await self.send(message)
+                return
+
+            self.encoder = self._new_encoder()
+            headers.append((b"content-encoding", self.encoding.encode("latin-1")))
+            headers = _add_vary(_weaken_etag(headers))
+            compressed = self.encoder.compress(body, final=not more_body)
+            if not more_body:
+                headers.append((b"content-length", str(len(compressed)).encode("latin-1")))
+            await self.send({**start, "headers": headers})
+            await self.send({"type": "http.response.body", "body": compressed, "more_body": more_body})
+            return
+
+        await self.send({
+            "type": "http.response.body",
+            "body": self.encoder.compress(body, final=not more_body),
+            "more_body": more_body,
+        })
@@ -0,0 +1,305 @@
+"""
+Thread-safe connection pool for pyodbc (or any DB-API) connections.
+
+The pool keeps long-lived connections open between requests so /ask-ai does
+not pay a full TLS handshake + SQL login on every call.
+"""
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no connection could be borrowed within acquire_timeout."""
+
+
+class PoolClosedError(Exception):
+    """Raised when borrowing from a pool that has been closed."""
+
+
+class _PooledConnection:
+    __slots__ = ("raw", "created_at", "last_used_at")
+
+    def __init__(self, raw: Any):
+        now = time.monotonic()
+        self.raw = raw
+        self.created_at = now
+        self.last_used_at = now
+
+
+class ConnectionPool:
+    """
+    Bounded pool of DB-API connections
+
+    - min_size connections are opened on open() and kept warm
+    - at most max_size connections exist at any time (idle + in use)
+    - every borrowed connection is health-checked with `health_check_query`
+    - connections idle longer than max_idle_seconds, or older than
+      max_lifetime_seconds, are closed and replaced instead of being reused
+    - returned connections are rolled back (pyodbc runs with autocommit off,
+      so reads leave a transaction open) and discarded if that fails
+    """
+
+    # stats() keys that only grow: exported as counters by GET /metrics
+    STATS_COUNTERS = (
+        "connections_created", "connections_closed", "failed_health_checks",
+        "acquired_total", "acquire_timeouts", "wait_time_total_s",
+    )
+
+    def __init__(
+        self,
+        connect: Callable[[], Any],
+        min_size: int = 1,
+        max_size: int = 10,
+        acquire_timeout: float = 30.0,
+        max_idle_seconds: float = 300.0,
+        max_lifetime_seconds: float = 1800.0,
+        health_check_query: Optional[str] = "SELECT 1",
+    ):
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError(f"Invalid pool size: min={min_size}, max={max_size}")
+
+        self._connect = connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.acquire_timeout = acquire_timeout
+        self.max_idle_seconds = max_idle_seconds
+        self.max_lifetime_seconds = max_lifetime_seconds
+        self.health_check_query = health_check_query
+
+        self._idle: Deque[_PooledConnection] = deque()
+        self._cond = threading.Condition()
+        self._size = 0
+        self._in_use = 0
+        self._closed = True
+
+        # Metrics
+        self._created_total = 0
+        self._closed_total = 0
+        self._failed_health_checks = 0
+        self._acquired_total = 0
+        self._wait_time_total = 0.0
+        self._wait_time_max = 0.0
+        self._timeouts_total = 0
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+    def open(self):
+        """Open the pool and pre-create min_size connections."""
+        with self._cond:
+            self._closed = False
+
+        for _ in range(self.min_size):
+            try:
+                conn = self._create()
+            except Exception as e:
+                # Don't block server startup: missing warm connections are
+                # created lazily on first borrow.
+                logger.warning("Could not pre-open pooled DB connection: %s", e)
+                break
+            with self._cond:
+                self._idle.append(conn)
+                self._cond.notify()
+
+    def close(self):
+        """Close all idle connections and reject further borrows."""
+        with self._cond:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._size -= len(idle)
+            self._cond.notify_all()
+
+        for conn in idle:
+            self._close_raw(conn)
+
+    # ------------------------------------------------------------------
+    # Borrow / return
+    # ------------------------------------------------------------------
+    @contextmanager
+    def connection(self):
+        """
+        Borrow a connection for the duration of a `with` block
+
+        If the block raises, the connection is discarded rather than
+        returned, since its state is unknown.
+        """
+        conn = self.acquire()
+        try:
+            yield conn.raw
+        except BaseException:
+            self.release(conn, discard=True)
+            raise
+        else:
+            self.release(conn)
+
+    def acquire(self) -> _PooledConnection:
+        started = time.monotonic()
+        deadline = started + self.acquire_timeout
+
+        while True:
+            conn = None
+            create = False
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise PoolClosedError("Connection pool is closed")
+                    if self._idle:
+                        conn = self._idle.pop()
+                        self._in_use += 1
+                        break
+                    if self._size < self.max_size:
+                        self._size += 1
+                        self._in_use += 1
+                        create = True
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._timeouts_total += 1
+                        raise PoolTimeoutError(
+                            f"Timed out after {self.acquire_timeout}s waiting for a DB connection "
+                            f"(max_size={self.max_size})"
+                        )
+                    self._cond.wait(remaining)
+
+            if create:
+                try:
+                    conn = self._create(reserved=True)
+                except BaseException:
+                    with self._cond:
+                        self._size -= 1
+                        self._in_use -= 1
+                        self._cond.notify()
+                    raise
+            elif not self._is_usable(conn):
+                self._discard(conn)
+                continue
+
+            waited = time.monotonic() - started
+            with self._cond:
+                self._acquired_total += 1
+                self._wait_time_total += waited
+                if waited > self._wait_time_max:
+                    self._wait_time_max = waited
+            return conn
+
+    def release(self, conn: _PooledConnection, discard: bool = False):
+        if discard or not self._reset(conn):
+            self._discard(conn)
+            return
+
+        conn.last_used_at = time.monotonic()
+        with self._cond:
+            self._in_use -= 1
+            if self._closed:
+                self._size -= 1
+                to_close = [conn]
+            else:
+                self._idle.append(conn)
+                to_close = self._pop_expired_idle_locked()
+            self._cond.notify()
+
+        for expired in to_close:
+            self._close_raw(expired)
+
+    # ------------------------------------------------------------------
+    # Metrics
+    # ------------------------------------------------------------------
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            acquired = self._acquired_total
+            return {
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                "size": self._size,
+                "in_use": self._in_use,
+                "idle": len(self._idle),
+                "connections_created": self._created_total,
+                "connections_closed": self._closed_total,
+                "failed_health_checks": self._failed_health_checks,
+                "acquired_total": acquired,
+                "acquire_timeouts": self._timeouts_total,
+                "wait_time_total_s": round(self._wait_time_total, 6),
+                "wait_time_avg_s": round(self._wait_time_total / acquired, 6) if acquired else 0.0,
+                "wait_time_max_s": round(self._wait_time_max, 6),
+            }
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+    def _create(self, reserved: bool = False) -> _PooledConnection:
+        raw = self._connect()
+        with self._cond:
+            if not reserved:
+                self._size += 1
+            self._created_total += 1
+        return _PooledConnection(raw)
+
+    def _is_usable(self, conn: _PooledConnection) -> bool:
+        now = time.monotonic()
+        if self.max_idle_seconds and now - conn.last_used_at > self.max_idle_seconds:
+            return False
+        if self.max_lifetime_seconds and now - conn.created_at > self.max_lifetime_seconds:
+            return False
+        if not self.health_check_query:
+            return True
+
+        try:
+            cursor = conn.raw.cursor()
+            try:
+                cursor.execute(self.health_check_query)
+                cursor.fetchall()
+            finally:
+                cursor.close()
+            return True
+        except Exception as e:
+            logger.info("Pooled DB connection failed health check, recycling: %s", e)
+            with self._cond:
+                self._failed_health_checks += 1
+            return False
+
+    def _reset(self, conn: _PooledConnection) -> bool:
+        # End the implicit transaction so no locks are held while idle
+        try:
+            conn.raw.rollback()
+            return True
+        except Exception as e:
+            logger.info("Pooled DB connection failed to roll back on release, discarding: %s", e)
+            return False
+
+    def _pop_expired_idle_locked(self):
+        # Idle connections are reused LIFO, so the least recently used ones sit
+        # at the left end; recycle those past max_idle_seconds down to min_size.
+        expired = []
+        if not self.max_idle_seconds:
+            return expired
+        now = time.monotonic()
+        while (
+            self._idle
+            and self._size > self.min_size
+            and now - self._idle[0].last_used_at > self.max_idle_seconds
+        ):
+            expired.append(self._idle.popleft())
+            self._size -= 1
+        return expired
+
+    def _discard(self, conn: _PooledConnection):
+        with self._cond:
+            self._size -= 1
+            self._in_use -= 1
+            self._cond.notify()
+        self._close_raw(conn)
+
+    def _close_raw(self, conn: _PooledConnection):
+        try:
+            conn.raw.close()
+        except Exception:
+            pass
+        with self._cond:
+            self._closed_total += 1
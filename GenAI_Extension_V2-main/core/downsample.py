@@ -0,0 +1,174 @@
+"""
+Downsampling of metrics_data to a record / token budget before it is sent
+to the Backend API.
+
+Every method chooses bucket boundaries over the daily records and turns
+each bucket into one record, dated on the bucket's last day:
+  - flow metrics (per-day counts such as TestCaseActual, BReportFixed) are
+    summed, so the total over any run of buckets is still exact
+  - every other metric (cumulative totals, outstanding, bounds) keeps the
+    value of the bucket's last day
+
+Boundaries:
+  - "weekly" / "monthly": calendar weeks (Monday to Sunday) / months
+  - "lttb": Largest-Triangle-Three-Buckets over all metrics (min-max
+    normalized), which keeps the days where the curves change direction
+  - "auto": records within budget are sent as they are; otherwise the
+    finest of weekly / monthly that fits, else lttb
+
+Some days always get a bucket of their own, whatever the method:
+  - each flow metric's peak day, so the one-day record keeps the exact peak
+  - each day on which the bound series (BReportActualTotal) crosses the
+    upper or lower bound
+"""
+import json
+from operator import itemgetter
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+METHOD_OFF = "off"
+METHOD_AUTO = "auto"
+METHOD_WEEKLY = "weekly"
+METHOD_MONTHLY = "monthly"
+METHOD_LTTB = "lttb"
+# Granularity reported when the records are left as they are
+DAILY = "daily"
+
+FLOW_METRICS = ("TestCaseExpected", "TestCaseActual", "BReportExpected", "BReportActual", "BReportFixed")
+BOUND_SERIES = "BReportActualTotal"
+UPPER_BOUND = "BReportUpperBound"
+LOWER_BOUND = "BReportLowerBound"
+
+# Rough JSON characters per LLM token, for the token budget
+CHARS_PER_TOKEN = 4
+MIN_RECORDS = 3
+
+
+def record_budget(records: List[Dict[str, Any]], max_records: int, max_tokens: int = 0) -> int:
+    """Records allowed by max_records and, if set, by an estimated token budget"""
+    budget = max_records if max_records > 0 else len(records)
+    if max_tokens > 0 and records:
+        tokens_per_record = max(1, len(json.dumps(records[0], separators=(",", ":"))) // CHARS_PER_TOKEN)
+        budget = min(budget, max_tokens // tokens_per_record)
+    return max(budget, MIN_RECORDS)
+
+
+def lttb_indices(x: np.ndarray, values: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Indices of the n_out points kept by Largest-Triangle-Three-Buckets
+
+    values has one column per series; the triangle areas of all (normalized)
+    series are added up, so a point is kept if it matters for any of them.
+    """
+    n = len(x)
+    if n_out >= n or n_out < MIN_RECORDS:
+        return np.arange(n) if n_out >= n else np.array([0, n - 1])
+    low, span = values.min(axis=0), np.ptp(values, axis=0)
+    y = (values - low) / np.where(span > 0, span, 1)
+
+    # n_out - 2 buckets between the fixed first and last points
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, stop = edges[i], edges[i + 1]
+        next_start, next_stop = (edges[i + 1], edges[i + 2]) if i + 2 < len(edges) else (n - 1, n)
+        avg_x = x[next_start:next_stop].mean()
+        avg_y = y[next_start:next_stop].mean(axis=0)
+        areas = np.abs(
+            (x[a] - avg_x) * (y[start:stop] - y[a]) - (x[a] - x[start:stop])[:, None] * (avg_y - y[a])
+        ).sum(axis=1)
+        a = start + int(areas.argmax())
+        selected[i + 1] = a
+    return selected
+
+
+def _calendar_ends(days: np.ndarray, method: str) -> np.ndarray:
+    """ends[i] is True when record i is the last one of its week / month"""
+    if method == METHOD_WEEKLY:
+        # Day 0 (1970-01-01) is a Thursday: +3 starts weeks on Monday
+        period = (days.astype(np.int64) + 3) // 7
+    else:
+        period = days.astype("datetime64[M]").astype(np.int64)
+    ends = np.ones(len(days), dtype=bool)
+    ends[:-1] = period[1:] != period[:-1]
+    return ends
+
+
+def _pinned_ends(names: Sequence[str], values: np.ndarray, flow_metrics: Sequence[str]) -> np.ndarray:
+    """Boundaries that isolate peak days and bound crossings in one-day buckets"""
+    n = len(values)
+    ends = np.zeros(n, dtype=bool)
+    column = {name: i for i, name in enumerate(names)}
+    pinned = []
+
+    flow_columns = [column[name] for name in flow_metrics if name in column]
+    if flow_columns:
+        pinned.append(values[:, flow_columns].argmax(axis=0))
+
+    if BOUND_SERIES in column:
+        series = values[:, column[BOUND_SERIES]]
+        for bound in (UPPER_BOUND, LOWER_BOUND):
+            if bound in column and values[:, column[bound]].any():
+                side = np.sign(series - values[:, column[bound]])
+                pinned.append(np.flatnonzero(side[1:] != side[:-1]) + 1)
+
+    if pinned:
+        days = np.unique(np.concatenate(pinned))
+        ends[days] = True
+        ends[days[days > 0] - 1] = True
+    return ends
+
+
+def _aggregate(dates: List[str], names: Sequence[str], values: np.ndarray, ends: np.ndarray,
+               flow_metrics: Sequence[str]) -> List[Dict[str, Any]]:
+    last = np.flatnonzero(ends)
+    first = np.concatenate(([0], last[:-1] + 1))
+    out = values[last]
+    flow_columns = [i for i, name in enumerate(names) if name in flow_metrics]
+    if flow_columns:
+        out[:, flow_columns] = np.add.reduceat(values[:, flow_columns], first, axis=0)
+    keys = ["date", *names]
+    return [dict(zip(keys, (dates[i], *row))) for i, row in zip(last.tolist(), out.tolist())]
+
+
+def downsample(
+    records: List[Dict[str, Any]],
+    max_records: int,
+    method: str = METHOD_AUTO,
+    flow_metrics: Sequence[str] = FLOW_METRICS,
+) -> Tuple[List[Dict[str, Any]], str]:
+    """
+    Fit date-sorted metrics_data records (as produced by the pivot) into
+    max_records. Returns (records, granularity), granularity being "daily"
+    when the records are returned unchanged.
+    """
+    n = len(records)
+    if method == METHOD_OFF or n <= max(max_records, MIN_RECORDS):
+        return records, DAILY
+
+    names = [key for key in records[0] if key != "date"]
+    dates = [record["date"] for record in records]
+    days = np.array(dates, dtype="datetime64[D]")
+    values = np.array(list(map(itemgetter(*names), records)), dtype=np.int64).reshape(n, len(names))
+    pinned = _pinned_ends(names, values, flow_metrics)
+    pinned[-1] = True
+
+    if method == METHOD_AUTO:
+        candidates = (METHOD_WEEKLY, METHOD_MONTHLY)
+    elif method in (METHOD_WEEKLY, METHOD_MONTHLY):
+        candidates = (method,)
+    else:
+        candidates = ()
+    for candidate in candidates:
+        ends = _calendar_ends(days, candidate) | pinned
+        if method != METHOD_AUTO or np.count_nonzero(ends) <= max_records:
+            return _aggregate(dates, names, values, ends, flow_metrics), candidate
+
+    # LTTB fills whatever the pinned days leave of the budget
+    n_lttb = max(max_records - np.count_nonzero(pinned), MIN_RECORDS)
+    ends = pinned.copy()
+    ends[lttb_indices(days.astype(np.int64).astype(float), values.astype(float), n_lttb)] = True
+    return _aggregate(dates, names, values, ends, flow_metrics), METHOD_LTTB
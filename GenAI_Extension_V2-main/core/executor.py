@@ -0,0 +1,97 @@
+"""
+Bounded thread executor for blocking work (pyodbc queries, pandas pivots).
+
+Running these stages through `await executor.run(...)` keeps the event loop
+free, so one slow SQL query no longer stalls every other request on the worker.
+"""
+import asyncio
+import contextvars
+import functools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+
+class BoundedExecutor:
+    """
+    ThreadPoolExecutor with a fixed number of workers plus queue metrics
+
+    Jobs beyond `max_workers` wait in the executor queue; the current and
+    peak queue depth and the time jobs spend waiting are reported by stats().
+    """
+
+    # stats() keys that only grow: exported as counters by GET /metrics
+    STATS_COUNTERS = ("submitted_total", "completed_total", "failed_total", "queue_wait_total_s")
+
+    def __init__(self, max_workers: int, name: str = "blocking"):
+        if max_workers < 1:
+            raise ValueError(f"max_workers must be >= 1, got {max_workers}")
+        self.name = name
+        self.max_workers = max_workers
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._lock = threading.Lock()
+
+        self._queued = 0
+        self._active = 0
+        self._max_queue_depth = 0
+        self._submitted_total = 0
+        self._completed_total = 0
+        self._failed_total = 0
+        self._queue_wait_total = 0.0
+        self._queue_wait_max = 0.0
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run fn(*args, **kwargs) on a worker thread and await its result"""
+        loop = asyncio.get_running_loop()
+        ctx = contextvars.copy_context()
+        call = functools.partial(ctx.run, fn, *args, **kwargs)
+        submitted_at = time.monotonic()
+
+        with self._lock:
+            self._queued += 1
+            self._submitted_total += 1
+            if self._queued > self._max_queue_depth:
+                self._max_queue_depth = self._queued
+
+        def job():
+            waited = time.monotonic() - submitted_at
+            with self._lock:
+                self._queued -= 1
+                self._active += 1
+                self._queue_wait_total += waited
+                if waited > self._queue_wait_max:
+                    self._queue_wait_max = waited
+            failed = False
+            try:
+                return call()
+            except BaseException:
+                failed = True
+                raise
+            finally:
+                with self._lock:
+                    self._active -= 1
+                    self._completed_total += 1
+                    if failed:
+                        self._failed_total += 1
+
+        return await loop.run_in_executor(self._pool, job)
+
+    def shutdown(self, wait: bool = True):
+        self._pool.shutdown(wait=wait, cancel_futures=True)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            started = self._submitted_total - self._queued
+            return {
+                "max_workers": self.max_workers,
+                "active": self._active,
+                "queue_depth": self._queued,
+                "max_queue_depth": self._max_queue_depth,
+                "submitted_total": self._submitted_total,
+                "completed_total": self._completed_total,
+                "failed_total": self._failed_total,
+                "queue_wait_total_s": round(self._queue_wait_total, 6),
+                "queue_wait_avg_s": round(self._queue_wait_total / started, 6) if started else 0.0,
+                "queue_wait_max_s": round(self._queue_wait_max, 6),
+            }
@@ -0,0 +1,46 @@
+"""
+Factory for the long-lived httpx.AsyncClient used to call the Backend API.
+
+One client is created per application lifespan so TCP/TLS connections to the
+Azure Functions backend are kept alive and reused across /ask-ai requests.
+"""
+import importlib.util
+import logging
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+def http2_available() -> bool:
+    """HTTP/2 in httpx needs the optional `h2` package (httpx[http2])."""
+    return importlib.util.find_spec("h2") is not None
+
+
+def create_async_client(
+    max_connections: int = 100,
+    max_keepalive_connections: int = 20,
+    keepalive_expiry: float = 30.0,
+    http2: bool = False,
+    connect_timeout: float = 5.0,
+    read_timeout: float = 60.0,
+    write_timeout: float = 10.0,
+    pool_timeout: float = 5.0,
+) -> httpx.AsyncClient:
+    """Build an AsyncClient with explicit connection limits and per-phase timeouts"""
+    if http2 and not http2_available():
+        logger.warning("HTTP/2 requested but the 'h2' package is not installed; using HTTP/1.1")
+        http2 = False
+
+    limits = httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=max_keepalive_connections,
+        keepalive_expiry=keepalive_expiry,
+    )
+    timeout = httpx.Timeout(
+        connect=connect_timeout,
+        read=read_timeout,
+        write=write_timeout,
+        pool=pool_timeout,
+    )
+    return httpx.AsyncClient(limits=limits, timeout=timeout, http2=http2)
@@ -0,0 +1,72 @@
+"""
+JSON encoding for the /ask-ai response and the Backend API request body.
+
+JsonCodec("orjson") uses orjson when it is installed: it serializes NumPy
+scalars/arrays and datetime/date values natively (no tolist() / isoformat()
+pass over metrics_data first) and is several times faster than the stdlib.
+JsonCodec("stdlib") keeps the json module and handles the same types through
+a `default` hook, so both produce equivalent documents.
+"""
+import datetime
+import importlib.util
+import json
+import logging
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+logger = logging.getLogger(__name__)
+
+JSON_LIBRARY_STDLIB = "stdlib"
+JSON_LIBRARY_ORJSON = "orjson"
+
+
+def orjson_available() -> bool:
+    return importlib.util.find_spec("orjson") is not None
+
+
+def _default(obj: Any) -> Any:
+    """Types the stdlib encoder does not know, mirroring orjson's output"""
+    if isinstance(obj, (datetime.datetime, datetime.date, datetime.time)):
+        return obj.isoformat()
+    # NumPy is always present alongside pandas; imported lazily to keep this module light
+    import numpy as np
+
+    if isinstance(obj, np.integer):
+        return int(obj)
+    if isinstance(obj, np.floating):
+        return float(obj)
+    if isinstance(obj, np.bool_):
+        return bool(obj)
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class JsonCodec:
+    """dumps() -> UTF-8 bytes, loads() from bytes/str, with the selected library"""
+
+    def __init__(self, library: str = JSON_LIBRARY_STDLIB):
+        if library == JSON_LIBRARY_ORJSON and not orjson_available():
+            logger.warning("JSON_LIBRARY=orjson but the 'orjson' package is not installed; using the stdlib json module")
+            library = JSON_LIBRARY_STDLIB
+        self.library = library
+
+        if library == JSON_LIBRARY_ORJSON:
+            import orjson
+
+            option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+            self.dumps = lambda obj: orjson.dumps(obj, default=_default, option=option)
+            self.loads = orjson.loads
+        else:
+            self.dumps = lambda obj: json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=_default).encode("utf-8")
+            self.loads = json.loads
+
+
+class CodecJSONResponse(JSONResponse):
+    """JSONResponse rendered with a JsonCodec; subclass and set `codec`"""
+
+    codec = JsonCodec()
+
+    def render(self, content: Any) -> bytes:
+        return self.codec.dumps(content)
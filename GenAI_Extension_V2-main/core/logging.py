@@ -0,0 +1,128 @@
+"""
+Logging setup for the extension server.
+
+Records are handed to a QueueHandler and written by a background
+QueueListener thread, so request handlers never block on stdout. Every record
+carries the current request id (see request_id_var), which also flows into
+blocking_executor threads because BoundedExecutor copies the context.
+"""
+import contextvars
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+from typing import Any, Callable, Optional
+
+request_id_var: contextvars.ContextVar[str] = contextvars.ContextVar("request_id", default="-")
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional[logging.Handler] = None
+
+TEXT_FORMAT = "%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s"
+
+
+class LazyRepr:
+    """
+    Defer an expensive rendering (e.g. a DataFrame preview) until a handler
+    actually formats the record, i.e. only when its level is enabled:
+
+        logger.debug("Sample data:\\n%s", LazyRepr(lambda: df.head(10)))
+    """
+
+    __slots__ = ("_fn",)
+
+    def __init__(self, fn: Callable[[], Any]):
+        self._fn = fn
+
+    def __str__(self):
+        return str(self._fn())
+
+
+class RequestIdFilter(logging.Filter):
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, for log collectors"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "request_id": getattr(record, "request_id", "-"),
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _PreformattedQueueHandler(logging.handlers.QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # QueueHandler.prepare() formats the message on the calling thread.
+        # Only resolve args here (so lazy values are rendered with the record
+        # still valid) and leave the final formatting to the listener thread.
+        record.msg = record.getMessage()
+        record.args = None
+        record.exc_text = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def setup_logging(level: str = "INFO", fmt: str = "text", use_queue: bool = True):
+    """
+    Configure the root logger
+
+    level     -- standard level name; DEBUG enables per-step details such as
+                 the full SQL, parameters and DataFrame previews
+    fmt       -- "text" or "json"
+    use_queue -- write through a background QueueListener thread
+    """
+    global _listener, _queue_handler
+    shutdown_logging()
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(JsonFormatter() if fmt == "json" else logging.Formatter(TEXT_FORMAT))
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.setLevel(level.upper())
+
+    if use_queue:
+        log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+        _queue_handler = _PreformattedQueueHandler(log_queue)
+        _queue_handler.addFilter(RequestIdFilter())
+        _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+        _listener.start()
+        root.addHandler(_queue_handler)
+    else:
+        stream_handler.addFilter(RequestIdFilter())
+        root.addHandler(stream_handler)
+
+
+def shutdown_logging():
+    """
+    Flush and stop the background listener (no-op if not started) and put
+    its stream handler on the root logger in place of the queue handler, so
+    records logged after shutdown are still written, synchronously
+    """
+    global _listener, _queue_handler
+    if _listener is None:
+        return
+    _listener.stop()
+    root = logging.getLogger()
+    if _queue_handler in root.handlers:
+        root.removeHandler(_queue_handler)
+        for handler in _listener.handlers:
+            # Stamped on the logging thread now, not by the queue handler
+            handler.addFilter(RequestIdFilter())
+            root.addHandler(handler)
+    _listener = None
+    _queue_handler = None
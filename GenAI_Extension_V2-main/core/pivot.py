@@ -0,0 +1,203 @@
+"""
+Vectorized EAV -> wide pivot for the fixed metric grid.
+
+Produces the same records as the previous pandas pipeline
+(to_datetime/strftime -> isin -> map -> to_numeric -> pivot_table
+-> fillna(0) -> astype(int) -> to_dict('records')) but in one pass over the
+raw rows, using categorical codes and a preallocated NumPy matrix.
+
+Duplicate (date, metric) rows -- e.g. several projects selected in one
+request -- are reduced with MAX, the same aggregate the "pivot" query mode
+uses in SQL, so both query modes return the same metrics_data. (The old
+pipeline kept the first row, which depends on the unspecified SQL row order.)
+"""
+from typing import Any, Dict, List, Mapping, Sequence
+
+import numpy as np
+import pandas as pd
+
+
+class WideMetrics:
+    """
+    Date x metric matrix
+
+    dates   -- sorted 'YYYY-MM-DD' strings, one per row
+    metrics -- metric (output) names, one per column, sorted
+    values  -- int64 matrix of shape (len(dates), len(metrics))
+    """
+
+    __slots__ = ("dates", "metrics", "values")
+
+    def __init__(self, dates: List[str], metrics: List[str], values: np.ndarray):
+        self.dates = dates
+        self.metrics = metrics
+        self.values = values
+
+    def __len__(self):
+        return len(self.dates)
+
+    def to_records(self) -> List[Dict[str, Any]]:
+        """[{'date': ..., '<metric>': int, ...}, ...] with native Python ints"""
+        keys = ["date", *self.metrics]
+        return [dict(zip(keys, (d, *row))) for d, row in zip(self.dates, self.values.tolist())]
+
+
+def output_metric_names(metric_mapping: Mapping[str, str]) -> List[str]:
+    """Distinct output names of METRIC_VALUE_MAPPING, in mapping order"""
+    return list(dict.fromkeys(metric_mapping.values()))
+
+
+def metric_column_index(names: Any, metric_mapping: Mapping[str, str]) -> np.ndarray:
+    """
+    Column index (into output_metric_names) for each raw Metric_Name,
+    -1 for names that are not in the mapping
+    """
+    db_names = list(metric_mapping.keys())
+    out_names = output_metric_names(metric_mapping)
+    out_pos = {name: i for i, name in enumerate(out_names)}
+    code_to_col = np.array([out_pos[metric_mapping[n]] for n in db_names] + [-1], dtype=np.int64)
+
+    codes = pd.Categorical(names, categories=db_names).codes.astype(np.int64)
+    # codes == -1 (unknown name) picks the trailing -1 sentinel
+    return code_to_col[codes]
+
+
+def normalize_date_labels(dates: Any):
+    """
+    Factorize raw date values into (row codes, 'YYYY-MM-DD' labels)
+
+    Only the unique raw values are parsed and formatted; values that fall on
+    the same calendar day share one label. Unparseable/null dates get -1.
+    """
+    raw_codes, raw_uniques = pd.factorize(pd.Series(dates), use_na_sentinel=True)
+    labels = pd.to_datetime(pd.Series(raw_uniques)).dt.strftime('%Y-%m-%d')
+    label_codes, label_uniques = pd.factorize(labels, use_na_sentinel=True)
+    label_codes = np.append(label_codes.astype(np.int64), -1)
+    # raw -1 (null date) picks the trailing -1 sentinel
+    return label_codes[raw_codes], np.asarray(label_uniques, dtype=object)
+
+
+def finalize_matrix(date_labels: Sequence[str], metric_names: Sequence[str], matrix: np.ndarray) -> WideMetrics:
+    """
+    Turn a float matrix with NaN for missing cells into WideMetrics
+
+    Mirrors pivot_table(dropna=True) + fillna(0) + astype(int): metrics and
+    dates without any value are dropped, remaining gaps become 0, values are
+    truncated toward zero, rows sorted by date and columns by metric name.
+    """
+    present = ~np.isnan(matrix)
+    keep_cols = np.flatnonzero(present.any(axis=0))
+    keep_rows = np.flatnonzero(present.any(axis=1))
+    if len(keep_cols) == 0 or len(keep_rows) == 0:
+        return WideMetrics([], [], np.zeros((0, 0), dtype=np.int64))
+
+    kept_labels = np.asarray(date_labels, dtype=object)[keep_rows]
+    row_sort = np.argsort(kept_labels, kind="stable")
+    row_order = keep_rows[row_sort]
+    col_names = np.asarray([metric_names[i] for i in keep_cols], dtype=object)
+    col_order = keep_cols[np.argsort(col_names, kind="stable")]
+
+    wide = matrix[np.ix_(row_order, col_order)]
+    values = np.trunc(np.nan_to_num(wide, nan=0.0)).astype(np.int64)
+    return WideMetrics(
+        [str(d) for d in kept_labels[row_sort]],
+        [metric_names[i] for i in col_order],
+        values,
+    )
+
+
+def pivot_eav(dates: Any, names: Any, values: Any, metric_mapping: Mapping[str, str]) -> WideMetrics:
+    """
+    Pivot raw EAV rows (date, Metric_Name, Metric_Value) into WideMetrics
+
+    For duplicate (date, metric) pairs the largest non-null value wins, as with
+    pivot_table(aggfunc='max') and the SQL MAX of the "pivot" query mode.
+    """
+    metric_names = output_metric_names(metric_mapping)
+
+    cols = metric_column_index(names, metric_mapping)
+    vals = pd.to_numeric(pd.Series(values), errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+    rows, date_labels = normalize_date_labels(dates)
+
+    keep = (cols >= 0) & (rows >= 0) & ~np.isnan(vals)
+    cols, rows, vals = cols[keep], rows[keep], vals[keep]
+
+    n_cols = len(metric_names)
+    cells = rows * n_cols + cols
+
+    matrix = np.full((len(date_labels), n_cols), np.nan)
+    # fmax ignores the NaN of unset cells
+    np.fmax.at(matrix.ravel(), cells, vals)
+    return finalize_matrix(date_labels, metric_names, matrix)
+
+
+def pivot_wide(dates: Any, metric_columns: Mapping[str, Any], metric_mapping: Mapping[str, str]) -> WideMetrics:
+    """
+    Normalize rows that are already one-per-date (e.g. pivoted by SQL Server)
+
+    metric_columns maps DB metric name -> column of values aligned with dates.
+    Dates falling on the same day are merged with the same MAX rule as
+    pivot_eav, so both query modes yield identical WideMetrics.
+    """
+    dates = pd.Series(dates).reset_index(drop=True)
+    n_rows = len(dates)
+    names = list(metric_columns.keys())
+    if n_rows == 0 or not names:
+        return WideMetrics([], [], np.zeros((0, 0), dtype=np.int64))
+
+    long_dates = pd.concat([dates] * len(names), ignore_index=True)
+    long_names = np.repeat(np.asarray(names, dtype=object), n_rows)
+    long_values = np.concatenate([
+        pd.to_numeric(pd.Series(metric_columns[name]), errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+        for name in names
+    ])
+    return pivot_eav(long_dates, long_names, long_values, metric_mapping)
+
+
+class MetricsAccumulator:
+    """
+    Incremental pivot for streamed EAV batches
+
+    Each add_batch() folds rows into a date x metric matrix that only grows
+    with the number of distinct dates, so raw rows can be discarded batch by
+    batch. Cells keep the largest non-null value seen, as pivot_eav does.
+    """
+
+    def __init__(self, metric_mapping: Mapping[str, str], initial_dates: int = 64):
+        self.metric_mapping = metric_mapping
+        self.metric_names = output_metric_names(metric_mapping)
+        self.rows_seen = 0
+        self._labels: List[str] = []
+        self._date_index: Dict[str, int] = {}
+        self._matrix = np.full((max(1, initial_dates), len(self.metric_names)), np.nan)
+
+    def add_batch(self, dates: Any, names: Any, values: Any):
+        self.rows_seen += len(dates)
+        cols = metric_column_index(names, self.metric_mapping)
+        vals = pd.to_numeric(pd.Series(values), errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+        local_rows, local_labels = normalize_date_labels(dates)
+
+        keep = (cols >= 0) & (local_rows >= 0) & ~np.isnan(vals)
+        if not keep.any():
+            return
+
+        global_rows = np.fromiter((self._row_for(label) for label in local_labels), dtype=np.int64, count=len(local_labels))
+        n_cols = len(self.metric_names)
+        cells = global_rows[local_rows[keep]] * n_cols + cols[keep]
+        np.fmax.at(self._matrix.ravel(), cells, vals[keep])
+
+    def result(self) -> WideMetrics:
+        n_dates = len(self._labels)
+        return finalize_matrix(self._labels, self.metric_names, self._matrix[:n_dates])
+
+    def _row_for(self, label: str) -> int:
+        row = self._date_index.get(label)
+        if row is None:
+            row = len(self._labels)
+            if row >= self._matrix.shape[0]:
+                grown = np.full((self._matrix.shape[0] * 2, self._matrix.shape[1]), np.nan)
+                grown[:row] = self._matrix
+                self._matrix = grown
+            self._labels.append(label)
+            self._date_index[label] = row
+        return row
@@ -0,0 +1,247 @@
+"""
+Retry and circuit breaking for Backend API calls.
+
+- RetryPolicy / retry_call: retries transient failures (errors before the
+  request reached the backend -- connect errors and timeouts, pool timeouts --
+  and 502/503/504) with exponential backoff and full jitter, within a total
+  deadline that also caps each attempt's timeout. A read timeout or a dropped
+  connection is not retried: the backend may still be working on the
+  request, and a slow LLM call would otherwise be repeated on a backend that
+  is already overloaded; it counts as a failure for the breaker. Calls that
+  belong together (the 415 format fallback) share one RetryBudget.
+- CircuitBreaker: after `failure_threshold` consecutive failed calls (a call
+  and its retries count once) the circuit opens and calls fail fast with
+  CircuitOpenError (503 + Retry-After) instead of hammering a backend that
+  is down. After `recovery_timeout` it goes
+  half-open and lets a single probe through; its outcome closes or reopens it.
+
+Like SingleFlight, these are only used from the event loop thread.
+"""
+import asyncio
+import logging
+import math
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import httpx
+
+from core.admission import AdmissionRejected
+
+logger = logging.getLogger(__name__)
+
+STATE_CLOSED = "closed"
+STATE_HALF_OPEN = "half_open"
+STATE_OPEN = "open"
+# Numeric state for the Prometheus gauge
+STATE_CODES = {STATE_CLOSED: 0, STATE_HALF_OPEN: 1, STATE_OPEN: 2}
+
+RETRYABLE_STATUS_CODES = frozenset({502, 503, 504})
+# Failures before the request was sent: safe to retry, the backend never saw it
+RETRYABLE_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+
+class CircuitOpenError(AdmissionRejected):
+    """Call rejected without being attempted because the circuit is open"""
+
+    def __init__(self, name: str, retry_after: int):
+        super().__init__(name, 503, retry_after, "circuit_open")
+
+
+class CircuitBreaker:
+    # stats() keys that only grow: exported as counters by GET /metrics
+    STATS_COUNTERS = ("opened_total", "rejected_total", "failures_total", "successes_total")
+
+    def __init__(self, name: str, failure_threshold: int = 5, recovery_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = max(failure_threshold, 1)
+        self.recovery_timeout = recovery_timeout
+
+        self._state = STATE_CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+        self._opened_total = 0
+        self._rejected_total = 0
+        self._failures_total = 0
+        self._successes_total = 0
+
+    @property
+    def state(self) -> str:
+        if self._state == STATE_OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout:
+            return STATE_HALF_OPEN
+        return self._state
+
+    def reject_if_open(self) -> None:
+        """Fail fast while open, without claiming the half-open probe"""
+        if self.state == STATE_OPEN:
+            self._rejected_total += 1
+            raise CircuitOpenError(self.name, self._retry_after())
+
+    def allow(self) -> None:
+        """Raise CircuitOpenError unless a call may go ahead now"""
+        state = self.state
+        if state == STATE_CLOSED:
+            return
+        if state == STATE_HALF_OPEN and not self._probe_in_flight:
+            if self._state != STATE_HALF_OPEN:
+                logger.info("Circuit %s half-open: probing the backend", self.name)
+                self._state = STATE_HALF_OPEN
+            self._probe_in_flight = True
+            return
+        self._rejected_total += 1
+        raise CircuitOpenError(self.name, self._retry_after())
+
+    def record_success(self) -> None:
+        self._successes_total += 1
+        self._consecutive_failures = 0
+        self._probe_in_flight = False
+        if self._state != STATE_CLOSED:
+            logger.info("Circuit %s closed: backend recovered", self.name)
+            self._state = STATE_CLOSED
+
+    def record_failure(self) -> None:
+        self._failures_total += 1
+        self._consecutive_failures += 1
+        self._probe_in_flight = False
+        if self._state == STATE_HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+            if self._state != STATE_OPEN:
+                self._opened_total += 1
+                logger.warning("Circuit %s open after %d consecutive failures", self.name, self._consecutive_failures)
+            self._state = STATE_OPEN
+            self._opened_at = time.monotonic()
+
+    def release(self) -> None:
+        """The allowed call ended without an outcome (e.g. cancelled)"""
+        self._probe_in_flight = False
+
+    def _retry_after(self) -> int:
+        remaining = self.recovery_timeout - (time.monotonic() - self._opened_at)
+        return max(math.ceil(remaining), 1)
+
+    def stats(self) -> Dict[str, Any]:
+        state = self.state
+        return {
+            "state": state,
+            "state_code": STATE_CODES[state],
+            "consecutive_failures": self._consecutive_failures,
+            "failure_threshold": self.failure_threshold,
+            "opened_total": self._opened_total,
+            "rejected_total": self._rejected_total,
+            "failures_total": self._failures_total,
+            "successes_total": self._successes_total,
+        }
+
+
+class RetryPolicy:
+    def __init__(self, max_attempts: int = 3, base_delay: float = 0.5, max_delay: float = 4.0, deadline: float = 90.0):
+        self.max_attempts = max(max_attempts, 1)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+
+    def backoff(self, attempt: int) -> float:
+        """Full jitter: uniform in [0, min(max_delay, base_delay * 2**attempt)]"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+
+class RetryBudget:
+    """
+    Attempts and deadline of one logical call. Pass the same budget to
+    several retry_call()s (e.g. a resend in another format) so that together
+    they stay within the policy's max_attempts and deadline.
+    """
+
+    def __init__(self, policy: RetryPolicy):
+        self.policy = policy
+        self.deadline = time.monotonic() + policy.deadline
+        self.attempts = 0
+
+    def remaining(self) -> float:
+        return max(self.deadline - time.monotonic(), 0.0)
+
+    def allows_retry(self, delay: float) -> bool:
+        return self.attempts < self.policy.max_attempts and time.monotonic() + delay < self.deadline
+
+
+def _retry_after_seconds(response: httpx.Response) -> Optional[float]:
+    value = response.headers.get("retry-after")
+    if value is None:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        return None
+
+
+async def retry_call(
+    attempt_fn: Callable[[float], Awaitable[httpx.Response]],
+    policy: RetryPolicy,
+    breaker: CircuitBreaker,
+    on_retry: Optional[Callable[[str], None]] = None,
+    budget: Optional[RetryBudget] = None,
+) -> httpx.Response:
+    """
+    Call attempt_fn(remaining_seconds) until it returns a non-retryable
+    response, the attempts or the deadline run out, or the circuit opens.
+    The last retryable response is returned / the last transport error raised;
+    other transport errors (read timeout, connection dropped mid-response)
+    are raised without a retry. The breaker sees one outcome per call, not
+    one per attempt.
+
+    budget -- shared with earlier calls of the same logical call; the first
+              attempt is always made, retries only while the budget lasts
+    """
+    if budget is None:
+        budget = RetryBudget(policy)
+    first = True
+    breaker.allow()
+    while True:
+        error: Optional[httpx.TransportError] = None
+        response: Optional[httpx.Response] = None
+        try:
+            if not first:
+                # Stop retrying once other calls have opened the circuit
+                breaker.reject_if_open()
+            response = await attempt_fn(budget.remaining())
+        except RETRYABLE_ERRORS as exc:
+            error = exc
+        except httpx.TransportError:
+            breaker.record_failure()
+            raise
+        except BaseException:
+            breaker.release()
+            raise
+        finally:
+            budget.attempts += 1
+        first = False
+
+        if error is None and response.status_code not in RETRYABLE_STATUS_CODES:
+            # 4xx are the caller's problem, not a sign of an unhealthy backend
+            breaker.record_success()
+            return response
+
+        delay = policy.backoff(budget.attempts - 1)
+        if response is not None:
+            server_delay = _retry_after_seconds(response)
+            if server_delay is not None:
+                delay = max(delay, server_delay)
+        if not budget.allows_retry(delay):
+            breaker.record_failure()
+            if error is not None:
+                raise error
+            return response
+
+        reason = type(error).__name__ if error is not None else str(response.status_code)
+        logger.warning("Backend call failed (%s), retry %d/%d in %.2fs", reason, budget.attempts, policy.max_attempts - 1, delay)
+        if on_retry is not None:
+            on_retry(reason)
+        if response is not None:
+            # Frees the connection of a streamed response that is being discarded
+            await response.aclose()
+        try:
+            await asyncio.sleep(delay)
+        except BaseException:
+            breaker.release()
+            raise
@@ -0,0 +1,138 @@
+"""
+In-process TTL + LRU cache for /ask-ai query results.
+
+Entries are bounded by an approximate total size in bytes rather than by
+count, since one multi-year metrics_data list can be thousands of records
+while a one-week selection is a handful.
+"""
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+
+def make_cache_key(*parts: Any) -> str:
+    """Stable hash of JSON-serializable parts (dict keys are sorted)"""
+    raw = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def estimate_size(value: Any) -> int:
+    """
+    Approximate footprint of a cached value via its JSON length
+
+    Lists are extrapolated from their first item so sizing a large
+    metrics_data list stays O(1) on the event loop.
+    """
+    if isinstance(value, list) and value:
+        return len(value) * (len(json.dumps(value[0], separators=(",", ":"), default=str)) + 1)
+    return len(json.dumps(value, separators=(",", ":"), default=str))
+
+
+class ResultCache:
+    """
+    Thread-safe TTL cache with LRU eviction bounded by total bytes
+
+    ttl_seconds <= 0 or max_bytes <= 0 disables the cache (get always misses).
+    """
+
+    # stats() keys that only grow: exported as counters by GET /metrics
+    STATS_COUNTERS = ("hits", "misses", "evictions", "expirations", "invalidations")
+
+    def __init__(self, ttl_seconds: float = 300.0, max_bytes: int = 64 * 1024 * 1024):
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[float, int, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0 and self.max_bytes > 0
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value, or None on miss/expiry"""
+        if not self.enabled:
+            return None
+
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+
+            expires_at, size, value = entry
+            if expires_at <= now:
+                del self._entries[key]
+                self._bytes -= size
+                self._expirations += 1
+                self._misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def set(self, key: str, value: Any, size: Optional[int] = None):
+        if not self.enabled:
+            return
+
+        if size is None:
+            size = estimate_size(value)
+        if size > self.max_bytes:
+            # Never cache an entry that would evict everything else
+            return
+
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, size, value)
+            self._bytes += size
+
+            while self._bytes > self.max_bytes and self._entries:
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self._evictions += 1
+
+    def invalidate(self, key: Optional[str] = None) -> int:
+        """Drop one key, or every entry when key is None. Returns entries removed."""
+        with self._lock:
+            if key is None:
+                removed = len(self._entries)
+                self._entries.clear()
+                self._bytes = 0
+            else:
+                entry = self._entries.pop(key, None)
+                removed = 0 if entry is None else 1
+                if entry is not None:
+                    self._bytes -= entry[1]
+            self._invalidations += removed
+            return removed
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_ratio": round(self._hits / lookups, 4) if lookups else 0.0,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+                "invalidations": self._invalidations,
+            }
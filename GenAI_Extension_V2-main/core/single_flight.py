@@ -0,0 +1,74 @@
+"""
+Request coalescing ("single flight") for identical concurrent async calls.
+
+The first caller for a key (the leader) starts the work as a task; callers
+arriving with the same key while it is still running (followers) await that
+same task instead of repeating the SQL query, pivot and backend LLM call.
+The result - or the exception - is delivered to every caller. Nothing is
+kept once the task finishes; reuse across time is result_cache's job.
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls that share a key
+
+    The shared task is shielded from cancellation of individual callers, so a
+    leader whose client disconnects does not fail its followers.
+    """
+
+    # stats() keys that only grow: exported as counters by GET /metrics
+    STATS_COUNTERS = ("leaders_total", "coalesced_total", "failed_total")
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        # Only touched from the event loop thread, so no lock is needed
+        self._inflight: Dict[str, "asyncio.Task[Any]"] = {}
+
+        self._leaders_total = 0
+        self._coalesced_total = 0
+        self._failed_total = 0
+        self._max_followers = 0
+        self._followers: Dict[str, int] = {}
+
+    async def run(self, key: str, fn: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        """Await fn(*args, **kwargs), sharing one execution per in-flight key"""
+        if not self.enabled:
+            return await fn(*args, **kwargs)
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn(*args, **kwargs))
+            self._inflight[key] = task
+            self._followers[key] = 0
+            task.add_done_callback(lambda done: self._finish(key, done))
+            self._leaders_total += 1
+        else:
+            self._followers[key] += 1
+            self._coalesced_total += 1
+            if self._followers[key] > self._max_followers:
+                self._max_followers = self._followers[key]
+
+        return await asyncio.shield(task)
+
+    def _finish(self, key: str, task: "asyncio.Task[Any]"):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+            self._followers.pop(key, None)
+        # Mark the exception as retrieved even if every caller was cancelled
+        if not task.cancelled() and task.exception() is not None:
+            self._failed_total += 1
+
+    def stats(self) -> Dict[str, Any]:
+        calls = self._leaders_total + self._coalesced_total
+        return {
+            "enabled": self.enabled,
+            "in_flight": len(self._inflight),
+            "leaders_total": self._leaders_total,
+            "coalesced_total": self._coalesced_total,
+            "coalesced_ratio": round(self._coalesced_total / calls, 4) if calls else 0.0,
+            "failed_total": self._failed_total,
+            "max_followers": self._max_followers,
+        }
@@ -0,0 +1,55 @@
+"""
+Server-Sent Events: incremental parsing of the Backend API stream and
+formatting of the events /ask-ai relays to the browser.
+
+Backend and /ask-ai streams use the same events, each with one line of JSON
+data: `token` {"text"}, `done` (final document) and `error`.
+"""
+from typing import Any, Callable, List, Tuple
+
+EVENT_STREAM = "text/event-stream"
+EVENT_TOKEN = "token"
+EVENT_DONE = "done"
+EVENT_ERROR = "error"
+
+# Sent with every event stream so proxies do not buffer or cache it
+STREAM_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+def format_event(event: str, data: Any, dumps: Callable[[Any], bytes]) -> bytes:
+    return b"event: " + event.encode("utf-8") + b"\ndata: " + dumps(data) + b"\n\n"
+
+
+class SSEParser:
+    """Feed raw chunks as they arrive; returns the (event, data) pairs completed so far"""
+
+    def __init__(self):
+        self._buffer = b""
+        self._event = "message"
+        self._data: List[bytes] = []
+
+    def feed(self, chunk: bytes) -> List[Tuple[str, str]]:
+        self._buffer += chunk
+        events = []
+        while True:
+            newline = self._buffer.find(b"\n")
+            if newline < 0:
+                return events
+            line = self._buffer[:newline].rstrip(b"\r")
+            self._buffer = self._buffer[newline + 1:]
+
+            if not line:
+                # Blank line: dispatch
+                if self._data:
+                    events.append((self._event, b"\n".join(self._data).decode("utf-8")))
+                self._event, self._data = "message", []
+            elif line.startswith(b":"):
+                continue  # comment / keep-alive
+            else:
+                field, _, value = line.partition(b":")
+                if value.startswith(b" "):
+                    value = value[1:]
+                if field == b"event":
+                    self._event = value.decode("utf-8")
+                elif field == b"data":
+                    self._data.append(value)
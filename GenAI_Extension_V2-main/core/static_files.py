@@ -0,0 +1,258 @@
+"""
+In-memory store for the extension's static assets.
+
+Only the allow-listed files in STATIC_ASSETS are served. They are read once
+at startup (or on the first lookup, for hosts that skip the startup
+hooks) together with their compressed variants (precompressed `.br` /
+`.gz` files written by precompress_static.py when present and fresh,
+otherwise compressed in memory), so a request is a dict lookup with no
+filesystem calls, and nothing else under the source directory is reachable.
+
+- every non-HTML asset is also published under a content-hashed name
+  (`app.<hash>.js`) with `Cache-Control: immutable`; index.html is rewritten
+  to reference the hashed names, so only index.html needs revalidation
+- plain names keep `Cache-Control: no-cache` with ETag / Last-Modified, and
+  If-None-Match / If-Modified-Since return 304 Not Modified
+- single `Range: bytes=...` requests (with If-Range) return 206 from the
+  uncompressed representation
+"""
+import hashlib
+import logging
+import mimetypes
+import os
+import re
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Any, Dict, Iterable, Mapping, Optional, Sequence, Tuple
+
+from fastapi.responses import Response
+
+from core.compression import ENCODING_BROTLI, ENCODING_GZIP, compress_bytes, is_compressible, negotiate_encoding
+
+logger = logging.getLogger(__name__)
+
+STATIC_ASSETS = ("index.html", "app.js", "style.css", "tableau.extensions.1.latest.js", "manifest.trex")
+PRECOMPRESSED_SUFFIXES = {ENCODING_BROTLI: ".br", ENCODING_GZIP: ".gz"}
+MEDIA_TYPES = {".trex": "application/xml"}
+
+CACHE_CONTROL_REVALIDATE = "no-cache"
+CACHE_CONTROL_IMMUTABLE = "public, max-age=31536000, immutable"
+HASH_LENGTH = 12
+
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def is_not_modified(request_headers: Mapping[str, str], etag: str, last_modified: float) -> bool:
+    """RFC 9110 13.1: If-None-Match wins over If-Modified-Since"""
+    if_none_match = request_headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        candidates = [tag.strip() for tag in if_none_match.split(",")]
+        # Weak comparison, as required for If-None-Match
+        return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+    if_modified_since = request_headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        return int(last_modified) <= since
+    return False
+
+
+def parse_byte_range(range_header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    (start, end) inclusive for a single byte range; None means "ignore the
+    header and send the full body" (absent, malformed or multi-range).
+    Raises ValueError when the range cannot be satisfied
+    """
+    if not range_header:
+        return None
+    match = _RANGE_RE.match(range_header.strip())
+    if match is None:
+        return None
+    first, last = match.groups()
+    if not first:
+        if not last:
+            return None
+        # Suffix range: the last N bytes
+        suffix = int(last)
+        if suffix == 0:
+            raise ValueError("empty suffix range")
+        return max(size - suffix, 0), size - 1
+    start = int(first)
+    end = int(last) if last else size - 1
+    if last and end < start:
+        return None
+    if start >= size:
+        raise ValueError("range starts past the end")
+    return start, min(end, size - 1)
+
+
+def hashed_name(name: str, digest: str) -> str:
+    root, ext = os.path.splitext(name)
+    return f"{root}.{digest}{ext}"
+
+
+class StaticAsset:
+    __slots__ = ("name", "media_type", "digest", "etag", "last_modified", "last_modified_http", "variants")
+
+    def __init__(self, name: str, media_type: str, body: bytes, mtime: float):
+        self.name = name
+        self.media_type = media_type
+        self.digest = hashlib.sha256(body).hexdigest()[:HASH_LENGTH]
+        self.etag = f'"{self.digest}"'
+        self.last_modified = mtime
+        self.last_modified_http = formatdate(mtime, usegmt=True)
+        # Content-Encoding (None = identity) -> body
+        self.variants: Dict[Optional[str], bytes] = {None: body}
+
+    @property
+    def body(self) -> bytes:
+        return self.variants[None]
+
+
+class StaticAssetStore:
+    # stats() keys that only grow: exported as counters by GET /metrics
+    STATS_COUNTERS = ("responses", "not_modified", "partial", "not_found")
+
+    def __init__(self, root: str, names: Iterable[str] = STATIC_ASSETS, encodings: Sequence[str] = (),
+                 gzip_level: int = 6, brotli_quality: int = 5):
+        self.root = root
+        self.names = tuple(names)
+        self.encodings = [e for e in encodings if e in PRECOMPRESSED_SUFFIXES]
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        # URL path -> (asset, immutable)
+        self._routes: Dict[str, Tuple[StaticAsset, bool]] = {}
+        self._loaded = False
+        self._responses = 0
+        self._not_modified = 0
+        self._partial = 0
+        self._not_found = 0
+
+    # --------------------------------------------------------------------------
+    # Startup
+    # --------------------------------------------------------------------------
+
+    def load(self) -> None:
+        """Read the allow-listed assets into memory; called at startup, else by the first lookup"""
+        assets = {}
+        for name in self.names:
+            path = os.path.join(self.root, name)
+            try:
+                with open(path, "rb") as f:
+                    body = f.read()
+                mtime = os.stat(path).st_mtime
+            except OSError as exc:
+                logger.warning("Static asset %s not loaded: %s", name, exc)
+                continue
+            media_type = MEDIA_TYPES.get(os.path.splitext(name)[1]) or mimetypes.guess_type(name)[0] or "application/octet-stream"
+            assets[name] = StaticAsset(name, media_type, body, mtime)
+
+        # HTML pages reference the hashed, immutable names of the other assets
+        hashed = {name: hashed_name(name, asset.digest) for name, asset in assets.items() if asset.media_type != "text/html"}
+        for asset in assets.values():
+            if asset.media_type == "text/html" and hashed:
+                html = asset.body
+                for name, url in hashed.items():
+                    for quote in (b'"', b"'"):
+                        html = html.replace(b"=" + quote + name.encode() + quote, b"=" + quote + url.encode() + quote)
+                assets[asset.name] = StaticAsset(asset.name, asset.media_type, html, asset.last_modified)
+
+        routes = {}
+        for name, asset in assets.items():
+            self._add_variants(asset)
+            routes[name] = (asset, False)
+            if name in hashed:
+                routes[hashed[name]] = (asset, True)
+        self._routes = routes
+        self._loaded = True
+        logger.info("Loaded %d static assets (%d bytes)", len(assets), sum(len(a.body) for a in assets.values()))
+
+    def _add_variants(self, asset: StaticAsset) -> None:
+        if not is_compressible(asset.media_type):
+            return
+        source_path = os.path.join(self.root, asset.name)
+        for encoding in self.encodings:
+            body = self._read_precompressed(source_path, encoding, asset) or compress_bytes(
+                asset.body, encoding, gzip_level=self.gzip_level, brotli_quality=self.brotli_quality)
+            if len(body) < len(asset.body):
+                asset.variants[encoding] = body
+
+    @staticmethod
+    def _read_precompressed(source_path: str, encoding: str, asset: StaticAsset) -> Optional[bytes]:
+        # A rewritten HTML body no longer matches the file on disk
+        if asset.media_type == "text/html":
+            return None
+        variant_path = source_path + PRECOMPRESSED_SUFFIXES[encoding]
+        try:
+            if os.stat(variant_path).st_mtime < asset.last_modified:
+                return None
+            with open(variant_path, "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    # --------------------------------------------------------------------------
+    # Requests
+    # --------------------------------------------------------------------------
+
+    def response(self, path: str, request_headers: Mapping[str, str]) -> Optional[Response]:
+        """Response for URL path, or None if it is not a known asset"""
+        if not self._loaded:
+            self.load()
+        route = self._routes.get(path)
+        if route is None:
+            self._not_found += 1
+            return None
+        asset, immutable = route
+
+        encoding = None
+        if "range" not in request_headers:
+            offered = [e for e in self.encodings if e in asset.variants]
+            encoding = negotiate_encoding(request_headers.get("accept-encoding"), offered)
+        etag = asset.etag if encoding is None else f'"{asset.digest}-{encoding}"'
+        headers = {
+            "ETag": etag,
+            "Last-Modified": asset.last_modified_http,
+            "Cache-Control": CACHE_CONTROL_IMMUTABLE if immutable else CACHE_CONTROL_REVALIDATE,
+            "Vary": "Accept-Encoding",
+        }
+        if is_not_modified(request_headers, etag, asset.last_modified):
+            self._not_modified += 1
+            return Response(status_code=304, headers=headers)
+
+        self._responses += 1
+        if encoding is not None:
+            headers["Content-Encoding"] = encoding
+            return Response(content=asset.variants[encoding], media_type=asset.media_type, headers=headers)
+
+        body = asset.body
+        headers["Accept-Ranges"] = "bytes"
+        if_range = request_headers.get("if-range")
+        if if_range is None or if_range.strip() in (asset.etag, asset.last_modified_http):
+            try:
+                byte_range = parse_byte_range(request_headers.get("range"), len(body))
+            except ValueError:
+                headers["Content-Range"] = f"bytes */{len(body)}"
+                return Response(status_code=416, headers=headers)
+            if byte_range is not None:
+                self._partial += 1
+                start, end = byte_range
+                headers["Content-Range"] = f"bytes {start}-{end}/{len(body)}"
+                return Response(content=body[start:end + 1], status_code=206, media_type=asset.media_type, headers=headers)
+        return Response(content=body, media_type=asset.media_type, headers=headers)
+
+    def stats(self) -> Dict[str, Any]:
+        assets = {asset.name: asset for asset, _ in self._routes.values()}
+        return {
+            "assets": len(assets),
+            "bytes": sum(len(asset.body) for asset in assets.values()),
+            "compressed_bytes": sum(len(body) for asset in assets.values() for enc, body in asset.variants.items() if enc),
+            "responses": self._responses,
+            "not_modified": self._not_modified,
+            "partial": self._partial,
+            "not_found": self._not_found,
+        }
@@ -0,0 +1,117 @@
+"""
+Wire format of the metrics_data sent to the Backend API.
+
+"records" is the original list of per-date dicts, which repeats all 13 metric
+key names in every record. "columnar" sends one dates array plus one integer
+array per metric:
+
+    {"format": "columnar",
+     "dates": ["2025-01-01", "2025-01-02", ...],
+     "metrics": {"TestCaseActual": [10, 12, ...], "BReportFixed": [2, 0, ...], ...}}
+
+The request body can additionally be gzip or zstd compressed
+(Content-Encoding). Both are negotiated: the backend lists what it accepts
+in the X-Accept-Metrics-Formats and Accept-Encoding response headers, and
+BackendCapabilities only switches to them after seeing those headers, so an
+older backend keeps receiving plain records.
+"""
+import gzip
+import importlib.util
+import threading
+from typing import Any, Dict, List, Mapping, Tuple
+
+METRICS_FORMAT_RECORDS = "records"
+METRICS_FORMAT_COLUMNAR = "columnar"
+
+ENCODING_IDENTITY = "identity"
+ENCODING_GZIP = "gzip"
+ENCODING_ZSTD = "zstd"
+
+# Request header: format of metrics_data in this body
+METRICS_FORMAT_HEADER = "X-Metrics-Format"
+# Response headers: what the backend accepts
+ACCEPT_METRICS_FORMATS_HEADER = "X-Accept-Metrics-Formats"
+ACCEPT_ENCODING_HEADER = "Accept-Encoding"
+
+
+def zstd_available() -> bool:
+    """zstd needs the optional `zstandard` package"""
+    return importlib.util.find_spec("zstandard") is not None
+
+
+def records_to_columnar(records: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Convert metrics_data records (as produced by WideMetrics.to_records) to
+    the columnar form. Every record carries the same metric keys, so the
+    columns are taken from the first record.
+    """
+    if not records:
+        return {"format": METRICS_FORMAT_COLUMNAR, "dates": [], "metrics": {}}
+
+    metric_names = [key for key in records[0] if key != "date"]
+    return {
+        "format": METRICS_FORMAT_COLUMNAR,
+        "dates": [record["date"] for record in records],
+        "metrics": {name: [record[name] for record in records] for name in metric_names},
+    }
+
+
+def encode_body(body: bytes, encoding: str, level: int = 6) -> bytes:
+    """Compress a request body with the given Content-Encoding"""
+    if encoding == ENCODING_IDENTITY:
+        return body
+    if encoding == ENCODING_GZIP:
+        # mtime=0 keeps the output deterministic for identical payloads
+        return gzip.compress(body, compresslevel=level, mtime=0)
+    if encoding == ENCODING_ZSTD:
+        import zstandard
+
+        return zstandard.ZstdCompressor(level=level).compress(body)
+    raise ValueError(f"Unsupported content encoding: {encoding}")
+
+
+def _parse_list_header(value: str) -> List[str]:
+    # "gzip, zstd;q=0.5" -> ["gzip", "zstd"]
+    return [item.split(";", 1)[0].strip().lower() for item in value.split(",") if item.strip()]
+
+
+class BackendCapabilities:
+    """
+    Formats / encodings the Backend API has advertised
+
+    Starts with what every backend understands (records, identity) and is
+    updated from the headers of each backend response.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._formats = {METRICS_FORMAT_RECORDS}
+        self._encodings = {ENCODING_IDENTITY}
+
+    def update(self, headers: Mapping[str, str]):
+        formats = headers.get(ACCEPT_METRICS_FORMATS_HEADER)
+        encodings = headers.get(ACCEPT_ENCODING_HEADER)
+        with self._lock:
+            if formats is not None:
+                self._formats = {METRICS_FORMAT_RECORDS, *_parse_list_header(formats)}
+            if encodings is not None:
+                self._encodings = {ENCODING_IDENTITY, *_parse_list_header(encodings)}
+
+    def reset(self):
+        """Forget advertised capabilities (e.g. after a 415 from a redeployed backend)"""
+        with self._lock:
+            self._formats = {METRICS_FORMAT_RECORDS}
+            self._encodings = {ENCODING_IDENTITY}
+
+    def choose(self, preferred_format: str, preferred_encoding: str) -> Tuple[str, str]:
+        """Preferred format / encoding if the backend accepts them, else the plain ones"""
+        if preferred_encoding == ENCODING_ZSTD and not zstd_available():
+            preferred_encoding = ENCODING_GZIP
+        with self._lock:
+            fmt = preferred_format if preferred_format in self._formats else METRICS_FORMAT_RECORDS
+            encoding = preferred_encoding if preferred_encoding in self._encodings else ENCODING_IDENTITY
+        return fmt, encoding
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"formats": sorted(self._formats), "encodings": sorted(self._encodings)}
@@ -0,0 +1,37 @@
+"""
+Script to write precompressed variants of the static assets
+
+Creates `<file>.gz` (and `<file>.br` when the brotli package is installed) next
+to each asset at maximum compression, so the server sends them as-is instead
+of compressing them in memory at startup. Re-run after editing an asset:
+variants older than their source file are ignored by the server.
+
+Usage:
+    python precompress_static.py
+"""
+import os
+
+from core.compression import ENCODING_BROTLI, available_encodings, compress_bytes
+from core.static_files import PRECOMPRESSED_SUFFIXES, STATIC_ASSETS
+
+
+def main():
+    static_folder = os.path.dirname(os.path.abspath(__file__))
+    for name in STATIC_ASSETS:
+        # index.html is rewritten to the hashed asset names at startup, so a disk variant would be stale
+        if name.endswith(".html"):
+            continue
+        path = os.path.join(static_folder, name)
+        with open(path, "rb") as f:
+            data = f.read()
+        for encoding in available_encodings():
+            compressed = compress_bytes(data, encoding, gzip_level=9, brotli_quality=11)
+            with open(path + PRECOMPRESSED_SUFFIXES[encoding], "wb") as f:
+                f.write(compressed)
+            print(f"{name + PRECOMPRESSED_SUFFIXES[encoding]:<40} {len(data):>9} -> {len(compressed):>8} bytes")
+    if ENCODING_BROTLI not in available_encodings():
+        print("brotli is not installed (pip install brotli): only .gz variants were written")
+
+
+if __name__ == "__main__":
+    main()
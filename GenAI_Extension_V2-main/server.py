@@ -1,6 +1,6 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from typing import Dict, List, Optional, Any
@@ -8,11 +8,41 @@ import pandas as pd
 import pyodbc
 import os
 import json
+import hmac
 from datetime import datetime
 from config.settings import settings
+from core.db_pool import ConnectionPool
+from core.executor import BoundedExecutor
+from core.result_cache import ResultCache, make_cache_key
+from core.pivot import MetricsAccumulator, pivot_eav, pivot_wide
+from core.downsample import DAILY, FLOW_METRICS, downsample, record_budget
+from core.single_flight import SingleFlight
+from core.admission import AdmissionLimiter, AdmissionRejected
+from core.resilience import CircuitBreaker, RetryBudget, RetryPolicy, retry_call
+from core.compression import CompressionMiddleware, available_encodings
+from core.static_files import StaticAssetStore
+from core.sse import EVENT_DONE, EVENT_ERROR, EVENT_STREAM, EVENT_TOKEN, STREAM_HEADERS, SSEParser, format_event
+from core.json_codec import CodecJSONResponse, JsonCodec
+from core.wire_format import (
+    ENCODING_IDENTITY,
+    METRICS_FORMAT_COLUMNAR,
+    METRICS_FORMAT_HEADER,
+    METRICS_FORMAT_RECORDS,
+    BackendCapabilities,
+    encode_body,
+    records_to_columnar,
+)
+from core.http_client import create_async_client
+from core.logging import LazyRepr, request_id_var, setup_logging, shutdown_logging
+from core.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, SIZE_BUCKETS, MetricsRegistry
+import logging
+import time
 import uuid
 import httpx
 
+# Root handlers are installed by on_startup: importing server has no logging side effects
+logger = logging.getLogger("tableau_ext")
+
 app = FastAPI(title="Tableau Extension API")
 
 # Configure CORS
@@ -24,6 +54,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress responses for the browser (static assets, /ask-ai JSON)
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MIN_SIZE,
+        gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+        brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+    )
+
 # ==============================================================================
 # 1. CẤU HÌNH
 # ==============================================================================
@@ -47,6 +86,12 @@ DEBUG_MODE = False  # os.getenv("DEBUG_MODE", "false").lower() == "true"
 DB_VIEW_NAME = "vw_bug_report_by_testplan" 
 DB_SCHEMA_NAME = "bug-management_dm_test"  
 
+# Query mode: "eav" = pivot in Python, "pivot" = pivot pushed down to SQL Server
+QUERY_MODE_EAV = "eav"
+QUERY_MODE_PIVOT = "pivot"
+DB_QUERY_MODE = settings.DB_QUERY_MODE
+DB_STREAM_BATCH_SIZE = settings.DB_STREAM_BATCH_SIZE
+
 # 1. Mapping Filter: Tên Filter UI -> Tên Cột DB (Dùng cho WHERE clause)
 FILTER_COLUMN_MAPPING = {
     "Project Identifier": "project_identifier",
@@ -95,6 +140,8 @@ METRIC_VALUE_MAPPING = {
     "BReportUpperBound": "BReportUpperBound",
     "BReportLowerBound": "BReportLowerBound"
 }
+# Per-day count metrics (output names), summed when metrics_data is downsampled
+DOWNSAMPLE_FLOW_METRICS = [METRIC_VALUE_MAPPING[name] for name in FLOW_METRICS]
 
 # ==============================================================================
 # 2. PYDANTIC MODELS
@@ -147,15 +194,91 @@ def get_db_connection():
         )
         return pyodbc.connect(conn_str)
     except Exception as e:
-        print("❌ Database Connection Error")
-        print(e)
+        logger.error("Database connection error: %s", e)
         raise
 
 
+# Long-lived pooled connections, opened/closed by the app startup/shutdown hooks
+db_pool = ConnectionPool(
+    get_db_connection,
+    min_size=settings.DB_POOL_MIN_SIZE,
+    max_size=settings.DB_POOL_MAX_SIZE,
+    acquire_timeout=settings.DB_POOL_ACQUIRE_TIMEOUT,
+    max_idle_seconds=settings.DB_POOL_MAX_IDLE_SECONDS,
+    max_lifetime_seconds=settings.DB_POOL_MAX_LIFETIME_SECONDS,
+)
+
+# Bounded worker threads for the blocking pyodbc + pandas stages of /ask-ai
+blocking_executor = BoundedExecutor(settings.BLOCKING_WORKERS, name="ask-ai-db")
+
+# Cache of final metrics_data lists, keyed by normalized filters + period
+result_cache = ResultCache(
+    ttl_seconds=settings.RESULT_CACHE_TTL_SECONDS,
+    max_bytes=settings.RESULT_CACHE_MAX_BYTES,
+)
+
+# JSON encoding of the /ask-ai response and the Backend API body (stdlib or orjson)
+json_codec = JsonCodec(settings.JSON_LIBRARY)
+
+
+class AskAIResponse(CodecJSONResponse):
+    codec = json_codec
+
+
+# Identical concurrent /ask-ai requests share one DB query + backend call
+ask_ai_flight = SingleFlight(enabled=settings.ASK_AI_COALESCING)
+
+# Per-stage latency histograms and sizes, served in Prometheus format by GET /metrics
+metrics = MetricsRegistry("tableau_ext")
+STAGE_SECONDS = metrics.histogram(
+    "ask_ai_stage_seconds",
+    "Latency of each /ask-ai stage (build_query, connect, sql_fetch, pivot, downsample, payload_build, serialize, backend_call)",
+    ["stage"],
+)
+REQUEST_SECONDS = metrics.histogram("ask_ai_request_seconds", "End-to-end /ask-ai latency", ["outcome"])
+DB_ROWS = metrics.histogram("db_rows_fetched", "Rows returned by the metrics query", ["query_mode"], SIZE_BUCKETS)
+METRICS_RECORDS = metrics.histogram("metrics_data_records", "Date records in metrics_data after the pivot", buckets=SIZE_BUCKETS)
+METRICS_SENT_RECORDS = metrics.histogram(
+    "metrics_data_sent_records", "metrics_data records sent to the Backend API, by granularity", ["granularity"], SIZE_BUCKETS
+)
+BACKEND_REQUEST_BYTES = metrics.histogram("backend_request_bytes", "Backend API request body size", ["endpoint"], SIZE_BUCKETS)
+BACKEND_RESPONSE_BYTES = metrics.histogram("backend_response_bytes", "Backend API response body size", ["endpoint"], SIZE_BUCKETS)
+BACKEND_RESPONSES = metrics.counter(
+    "backend_responses_total",
+    "Backend API calls by HTTP status code (or timeout / connection_error)",
+    ["endpoint", "status"],
+)
+BACKEND_QUEUE_WAIT_SECONDS = metrics.histogram(
+    "backend_queue_wait_seconds", "Time /ask-ai waited for a Backend API admission slot", ["endpoint"]
+)
+BACKEND_SHED = metrics.counter(
+    "backend_shed_total", "Backend API calls rejected by admission control or an open circuit", ["endpoint", "reason"]
+)
+ASK_AI_FIRST_TOKEN_SECONDS = metrics.histogram(
+    "ask_ai_first_token_seconds", "Streaming /ask-ai: time from request to the first relayed answer token", ["endpoint"]
+)
+BACKEND_RETRIES = metrics.counter(
+    "backend_retries_total", "Backend API retries by failure (HTTP status or transport error)", ["endpoint", "reason"]
+)
+# Looked up at scrape time so replacing the module globals (tests, benchmarks) is picked up
+metrics.register_stats("db_pool", lambda: db_pool.stats(), ConnectionPool.STATS_COUNTERS)
+metrics.register_stats("blocking_executor", lambda: blocking_executor.stats(), BoundedExecutor.STATS_COUNTERS)
+metrics.register_stats("result_cache", lambda: result_cache.stats(), ResultCache.STATS_COUNTERS)
+metrics.register_stats("ask_ai_flight", lambda: ask_ai_flight.stats(), SingleFlight.STATS_COUNTERS)
+metrics.register_stats("static_assets", lambda: static_assets.stats(), StaticAssetStore.STATS_COUNTERS)
+for _endpoint in ("analysis", "assistant"):
+    metrics.register_stats(
+        f"backend_admission_{_endpoint}", lambda e=_endpoint: backend_admission[e].stats(), AdmissionLimiter.STATS_COUNTERS
+    )
+    metrics.register_stats(
+        f"backend_circuit_{_endpoint}", lambda e=_endpoint: backend_breakers[e].stats(), CircuitBreaker.STATS_COUNTERS
+    )
+
+
 # ==============================================================================
 # 5. BUILD QUERY & GET DATA FROM DATABASE
 # ==============================================================================
-def build_query(filters: Dict, period_start: Optional[str], period_end: Optional[str]):
+def build_query(filters: Dict, period_start: Optional[str], period_end: Optional[str], query_mode: str = DB_QUERY_MODE):
     """
     Build dynamic SQL query based on filters
     
@@ -166,43 +289,67 @@ def build_query(filters: Dict, period_start: Optional[str], period_end: Optional
       - "Project Identifier" -> column "project_identifier"
       - "Filter 1 (Vw Bug Report By Testplan)" -> column "filter_1"
       ...
+
+    query_mode:
+      - "eav":   SELECT raw (date, Metric_Name, Metric_Value) rows
+      - "pivot": conditional aggregation on the server, one row per date and
+                 one column per METRIC_VALUE_MAPPING key. Metric_Value is
+                 TRY_CAST to FLOAT (like pd.to_numeric(errors='coerce')).
+                 Duplicate (date, metric) rows (e.g. several projects
+                 selected) are reduced with MAX; the "eav" pivot in
+                 core/pivot.py applies the same MAX, so both modes agree.
     """
-    # SELECT 3 cột chính từ EAV model
-    sql = f"""
+    params = []
+
+    if query_mode == QUERY_MODE_PIVOT:
+        # SELECT date + 1 cột cho mỗi metric hợp lệ (pivot trên SQL Server)
+        valid_metrics = list(METRIC_VALUE_MAPPING.keys())
+        metric_columns = ",\n".join(
+            f"            MAX(CASE WHEN Metric_Name = ? THEN TRY_CAST(Metric_Value AS FLOAT) END) AS [{name.replace(']', ']]')}]"
+            for name in valid_metrics
+        )
+        params.extend(valid_metrics)
+        select_clause = f"""
+        SELECT 
+            date,
+{metric_columns}"""
+    else:
+        # SELECT 3 cột chính từ EAV model
+        select_clause = """
         SELECT 
             date, 
             Metric_Name, 
-            Metric_Value 
+            Metric_Value """
+
+    sql = f"""{select_clause}
         FROM [{DB_SCHEMA_NAME}].[{DB_VIEW_NAME}]
         WHERE 1=1
             AND date IS NOT NULL
     """
-    
-    params = []
 
     # 1. XỬ LÝ PERIOD (DATE RANGE) - Chỉ thêm nếu cả hai date được cung cấp
     if period_start and period_end:
         sql += " AND date BETWEEN ? AND ?"
         params.append(period_start)
         params.append(period_end)
-        print(f"   📅 Period filter: {period_start} to {period_end}")
+        logger.debug("Period filter: %s to %s", period_start, period_end)
     else:
-        print(f"   📅 Period filter: NONE (will fetch all available data)")
+        logger.debug("Period filter: NONE (will fetch all available data)")
 
     # 2. XỬ LÝ FILTERS
-    print(f"   🔍 Processing {len(filters)} filters:")
+    logger.debug("Processing %d filters", len(filters))
     for filter_name, filter_value in filters.items():
         # Tìm mapping từ filter name (từ dashboard) sang column name (trong DB)
         db_column = FILTER_COLUMN_MAPPING.get(filter_name)
         
         if not db_column:
             # Nếu không có mapping, skip
-            print(f"      ⊘ {filter_name}: NO MAPPING (skipped)")
+            logger.debug("  %s: NO MAPPING (skipped)", filter_name)
             continue
         
         # Bỏ qua nếu value là (All) hoặc rỗng
         if not filter_value or filter_value == "(All)" or filter_value == ["(All)"] or filter_value == []:
-            print(f"      ⊘ {filter_name}: ALL VALUES (skipped)")
+            logger.debug("  %s: ALL VALUES (skipped)", filter_name)
             continue
         
         # Xử lý list values
@@ -212,132 +359,189 @@ def build_query(filters: Dict, period_start: Optional[str], period_end: Optional
                 placeholders = ', '.join(['?' for _ in clean_values])
                 sql += f" AND [{db_column}] IN ({placeholders})"
                 params.extend(clean_values)
-                print(f"      ✓ {filter_name} IN ({', '.join(clean_values)})")
+                logger.debug("  %s IN (%s)", filter_name, LazyRepr(lambda: ', '.join(map(str, clean_values))))
         
         # Xử lý string value
         elif isinstance(filter_value, str):
             sql += f" AND [{db_column}] = ?"
             params.append(filter_value)
-            print(f"      ✓ {filter_name} = '{filter_value}'")
+            logger.debug("  %s = '%s'", filter_name, filter_value)
+
+    # 3. PIVOT MODE: chỉ lấy metric hợp lệ và gom về 1 dòng / date
+    if query_mode == QUERY_MODE_PIVOT:
+        sql += f" AND Metric_Name IN ({', '.join(['?' for _ in valid_metrics])})"
+        params.extend(valid_metrics)
+        sql += " GROUP BY date"
     
-    print(f"\n   ✅ Final SQL:\n{sql}")
-    print(f"   ✅ Params: {params}\n")
+    logger.debug("Final SQL:\n%s", sql)
+    logger.debug("Params: %s", params)
     
     return sql, params
 
 
-def get_data_from_db(filters: Dict, period_start: Optional[str], period_end: Optional[str]):
-    """Query database and return raw data as DataFrame"""
-    print("\n⚙️ STEP 1: BUILD QUERY")
-    print("-" * 80)
-    sql, params = build_query(filters, period_start, period_end)
+def canonical_query_filters(filters: Dict) -> Dict[str, List[str]]:
+    """
+    Filters exactly as they affect the WHERE clause built by build_query:
+    mapped to DB column names, unmapped / "(All)" / empty filters dropped,
+    values de-duplicated and sorted so list order does not matter
+    """
+    canonical = {}
+    for filter_name, filter_value in filters.items():
+        db_column = FILTER_COLUMN_MAPPING.get(filter_name)
+        if not db_column:
+            continue
+
+        if isinstance(filter_value, list):
+            values = [v for v in filter_value if v and v != "(All)"]
+        elif isinstance(filter_value, str):
+            values = [filter_value] if filter_value != "(All)" else []
+        else:
+            values = []
+
+        if values:
+            canonical[db_column] = sorted(set(values), key=str)
+    return canonical
 
-    print("\n🔌 STEP 2: CONNECT & QUERY DATABASE")
-    print("-" * 80)
+
+def build_metrics_cache_key(filters: Dict, period_start: Optional[str], period_end: Optional[str]) -> str:
+    """Cache key for metrics_data: same SQL result <=> same key"""
+    # build_query only applies the period when both dates are given
+    period = [period_start, period_end] if period_start and period_end else [None, None]
+    return make_cache_key("metrics_data", canonical_query_filters(filters), period)
+
+
+def get_data_from_db(filters: Dict, period_start: Optional[str], period_end: Optional[str], query_mode: str = DB_QUERY_MODE):
+    """Query database and return raw data as DataFrame (EAV rows or one row per date, see build_query)"""
+    # STEP 1: BUILD QUERY
+    with STAGE_SECONDS.time(stage="build_query"):
+        sql, params = build_query(filters, period_start, period_end, query_mode)
+
+    # STEP 2: CONNECT & QUERY DATABASE
     try:
-        conn = get_db_connection()
-        print("   ✓ Connected")
-        
-        df = pd.read_sql(sql, conn, params=params)
-        conn.close()
-        print(f"   ✓ Query returned {len(df)} rows")
+        connect_started = time.perf_counter()
+        with db_pool.connection() as conn:
+            STAGE_SECONDS.observe(time.perf_counter() - connect_started, stage="connect")
+            with STAGE_SECONDS.time(stage="sql_fetch"):
+                df = pd.read_sql(sql, conn, params=params)
+        DB_ROWS.observe(len(df), query_mode=query_mode)
+        logger.info("Query returned %d rows (%s mode)", len(df), query_mode)
         
-        if len(df) > 0:
-            print(f"   ✓ Date range in raw data: {df['date'].min()} to {df['date'].max()}")
-            print(f"   ✓ Unique Metric_Names: {df['Metric_Name'].unique().tolist()}")
-            print(f"   ✓ Sample data:\n{df.head(10)}")
+        if len(df) > 0 and logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Date range in raw data: %s to %s", df['date'].min(), df['date'].max())
+            if query_mode == QUERY_MODE_EAV:
+                logger.debug("Unique Metric_Names: %s", df['Metric_Name'].unique().tolist())
+            logger.debug("Sample data:\n%s", LazyRepr(lambda: df.head(10)))
         
         return df
         
     except Exception as db_err:
-        print(f"   ❌ Database error: {str(db_err)}")
+        logger.error("Database error: %s", db_err)
+        raise
+
+
+def stream_metrics_from_db(filters: Dict, period_start: Optional[str], period_end: Optional[str], batch_size: int):
+    """
+    Streaming variant of get_data_from_db + process_data_to_metrics (EAV mode)
+
+    Reads the cursor in fetchmany(batch_size) batches and folds each batch into
+    a MetricsAccumulator, so peak memory scales with the number of dates rather
+    than with the number of raw EAV rows. The "sql_fetch" stage therefore
+    includes the incremental pivot; "pivot" only covers the final matrix.
+    """
+    # STEP 1: BUILD QUERY
+    with STAGE_SECONDS.time(stage="build_query"):
+        sql, params = build_query(filters, period_start, period_end, QUERY_MODE_EAV)
+
+    # STEP 2-3: CONNECT, STREAM & PIVOT
+    accumulator = MetricsAccumulator(METRIC_VALUE_MAPPING)
+    batches = 0
+    try:
+        connect_started = time.perf_counter()
+        with db_pool.connection() as conn:
+            STAGE_SECONDS.observe(time.perf_counter() - connect_started, stage="connect")
+            with STAGE_SECONDS.time(stage="sql_fetch"):
+                cursor = conn.cursor()
+                try:
+                    cursor.execute(sql, params)
+                    while True:
+                        rows = cursor.fetchmany(batch_size)
+                        if not rows:
+                            break
+                        dates, names, values = zip(*rows)
+                        accumulator.add_batch(dates, names, values)
+                        batches += 1
+                finally:
+                    cursor.close()
+    except Exception as db_err:
+        logger.error("Database error: %s", db_err)
         raise
 
+    DB_ROWS.observe(accumulator.rows_seen, query_mode=QUERY_MODE_EAV)
+    with STAGE_SECONDS.time(stage="pivot"):
+        wide = accumulator.result()
+        metrics_data = wide.to_records()
+    METRICS_RECORDS.observe(len(metrics_data))
+    logger.info("Streamed %d rows in %d batches of %d", accumulator.rows_seen, batches, batch_size)
+    if len(wide) == 0:
+        logger.warning("No valid metrics returned from query")
+        return []
+
+    logger.info("Pivoted: %d date rows x %d metrics (%s to %s)", len(wide), len(wide.metrics), wide.dates[0], wide.dates[-1])
+    return metrics_data
+
 
 
 # ==============================================================================
 # 6. PROCESS DATA & BUILD PAYLOAD
 # ==============================================================================
-def process_data_to_metrics(df: pd.DataFrame):
+def process_data_to_metrics(df: pd.DataFrame, query_mode: str = DB_QUERY_MODE):
     """
     Transform raw EAV data to wide format metrics
     Returns list of records with date and metrics
+
+    In "pivot" query mode df is already one row per date; it only needs the
+    same date/metric-name/type normalization as the EAV path.
     """
     if df.empty:
-        print("\n⚠️ STEP 3: PROCESS DATA")
-        print("-" * 80)
-        print("   ⊘ No data returned from query")
+        logger.info("No data returned from query")
         return []
-    
-    print("\n📊 STEP 3: PROCESS DATA (EAV → Wide Format)")
-    print("-" * 80)
-    
-    # 1. Clean & standardize dates
-    print("   Step 3.1: Standardize dates...")
-    df['date'] = pd.to_datetime(df['date']).dt.strftime('%Y-%m-%d')
-    date_min = df['date'].min()
-    date_max = df['date'].max()
-    print(f"      ✓ Date range: {date_min} to {date_max}")
-    print(f"      ✓ Total unique dates: {df['date'].nunique()}")
-
-    # 2. Filter valid metrics
-    print("   Step 3.2: Filter valid metrics...")
-    valid_metrics = list(METRIC_VALUE_MAPPING.keys())
-    print(f"      Expected metrics: {valid_metrics}")
-    metrics_in_data = df['Metric_Name'].unique().tolist()
-    print(f"      Metrics in data: {metrics_in_data}")
-    
-    df_before = len(df)
-    df = df[df['Metric_Name'].isin(valid_metrics)]
-    df_after = len(df)
-    print(f"      ✓ Filtered: {df_before} → {df_after} rows")
-    
-    if df_after == 0:
-        print("      ⚠️ WARNING: No valid metrics found after filtering!")
+
+    # Single-pass pivot: standardize dates, keep valid metrics, map names,
+    # coerce values and take the largest value per (date, metric), like SQL MAX in pivot mode
+    with STAGE_SECONDS.time(stage="pivot"):
+        if query_mode == QUERY_MODE_PIVOT:
+            metric_columns = {name: df[name] for name in METRIC_VALUE_MAPPING if name in df.columns}
+            wide = pivot_wide(df['date'], metric_columns, METRIC_VALUE_MAPPING)
+        else:
+            wide = pivot_eav(df['date'], df['Metric_Name'], df['Metric_Value'], METRIC_VALUE_MAPPING)
+        metrics_data = wide.to_records()
+    METRICS_RECORDS.observe(len(metrics_data))
+
+    if len(wide) == 0:
+        logger.warning("No valid metrics found after filtering (expected: %s)", list(METRIC_VALUE_MAPPING.keys()))
         return []
-    
-    # 3. Map metric names (if needed)
-    print("   Step 3.3: Map metric names...")
-    df['Metric_Name'] = df['Metric_Name'].map(METRIC_VALUE_MAPPING)
-    print(f"      ✓ Mapped")
-
-    # 4. Convert Metric_Value to numeric
-    print("   Step 3.4: Convert Metric_Value to numeric...")
-    df['Metric_Value'] = pd.to_numeric(df['Metric_Value'], errors='coerce')
-    print(f"      ✓ Converted")
-
-    # 5. Pivot: EAV to Wide format
-    print("   Step 3.5: Pivot data (EAV → Wide)...")
-    df_pivot = df.pivot_table(
-        index='date',
-        columns='Metric_Name',
-        values='Metric_Value',
-        aggfunc='first'
-    ).reset_index()
-    print(f"      ✓ Pivoted: {len(df_pivot)} date rows × {len(df_pivot.columns)-1} metrics")
-    print(f"      ✓ Columns: {df_pivot.columns.tolist()}")
-
-    # 6. Fill NaN & Convert to int/float
-    print("   Step 3.6: Clean & convert types...")
-    df_pivot = df_pivot.fillna(0)
-    # Convert numeric columns to numeric type
-    for col in df_pivot.columns:
-        if col != 'date':
-            df_pivot[col] = pd.to_numeric(df_pivot[col], errors='coerce').fillna(0).astype(int)
-    print(f"      ✓ Ready for output")
-    print(f"      ✓ Data types:\n{df_pivot.dtypes}")
-
-    # 7. Sort by date and convert to list of dicts
-    df_pivot = df_pivot.sort_values('date').reset_index(drop=True)
-    metrics_data = df_pivot.to_dict(orient='records')
-    print(f"      ✓ Converted to {len(metrics_data)} records")
-    if len(metrics_data) > 0:
-        print(f"      ✓ First record: {metrics_data[0]}")
-        print(f"      ✓ Last record: {metrics_data[-1]}")
+
+    logger.info("Pivoted: %d date rows x %d metrics (%s to %s)", len(wide), len(wide.metrics), wide.dates[0], wide.dates[-1])
+    logger.debug("Columns: %s", LazyRepr(lambda: ['date', *wide.metrics]))
+
+    logger.debug("First record: %s", metrics_data[0])
+    logger.debug("Last record: %s", metrics_data[-1])
     
     return metrics_data
 
 
+def load_metrics_data(filters: Dict, period_start: Optional[str], period_end: Optional[str]):
+    """
+    Blocking DB + pivot stages (STEP 1-3)
+    Run through blocking_executor so they never block the event loop
+    """
+    if DB_STREAM_BATCH_SIZE > 0 and DB_QUERY_MODE == QUERY_MODE_EAV:
+        return stream_metrics_from_db(filters, period_start, period_end, DB_STREAM_BATCH_SIZE)
+
+    df = get_data_from_db(filters, period_start, period_end)
+    return process_data_to_metrics(df)
+
+
 def normalize_filter_names(filters: Dict):
     """
     Map filter display names to short names for JSON payload
@@ -384,15 +588,14 @@ def normalize_filters_for_backend(filters: Dict):
     return normalized
 
 
-def build_backend_payload(request_data: RequestPayload, metrics_data: List[Dict], actual_period: Dict):
+def build_backend_payload(request_data: RequestPayload, metrics_data: List[Dict], actual_period: Dict, request_id: Optional[str] = None,
+                          granularity: str = DAILY):
     """
     Build JSON payload to send to Backend API
+    granularity: how metrics_data was downsampled ("daily" = one record per day)
     """
-    print("\n📦 STEP 4: BUILD PAYLOAD FOR BACKEND API")
-    print("-" * 80)
-    
     # Generate request metadata
-    request_id = generate_request_id()
+    request_id = request_id or generate_request_id()
     timestamp = get_iso_timestamp()
     
     # Normalize filter names
@@ -404,7 +607,8 @@ def build_backend_payload(request_data: RequestPayload, metrics_data: List[Dict]
         "request_meta": {
             "request_id": request_id,
             "timestamp": timestamp,
-            "mode_type": request_data.mode_type
+            "mode_type": request_data.mode_type,
+            "metrics_granularity": granularity
         },
         "period": actual_period,
         "filters": normalized_filters,
@@ -415,23 +619,101 @@ def build_backend_payload(request_data: RequestPayload, metrics_data: List[Dict]
     if request_data.user_question:
         payload["user_question"] = request_data.user_question
     
-    print(f"   ✓ Request ID: {request_id}")
-    print(f"   ✓ Mode: {request_data.mode_type}")
-    print(f"   ✓ Period: {actual_period}")
-    print(f"   ✓ Filters: {list(normalized_filters.keys())}")
-    print(f"   ✓ Metrics records: {len(metrics_data)}")
-    print("="*80 + "\n")
+    logger.info("Payload built: mode=%s period=%s records=%d", request_data.mode_type, actual_period, len(metrics_data))
+    logger.debug("Payload filters: %s", LazyRepr(lambda: list(normalized_filters.keys())))
     
     return payload
 
 
+def build_ask_ai_flight_key(request_data: RequestPayload) -> str:
+    """
+    Coalescing key for /ask-ai: requests with the same key would send the
+    same backend payload (up to request_id / timestamp)
+    """
+    filters = normalize_filters_for_backend(normalize_filter_names(request_data.filters))
+    filters = {name: sorted(set(values), key=str) for name, values in filters.items()}
+    period = request_data.period or PeriodModel()
+    meta_mode_type = request_data.request_meta.mode_type if request_data.request_meta else None
+    return make_cache_key(
+        "ask_ai",
+        filters,
+        [period.start_date, period.end_date],
+        request_data.mode_type,
+        meta_mode_type,
+        request_data.user_question,
+    )
+
+
+# Shared Backend API client, created/closed by the app startup/shutdown hooks
+backend_client: Optional[httpx.AsyncClient] = None
+
+# metrics_data format / Content-Encoding the Backend API has advertised (see core.wire_format)
+backend_capabilities = BackendCapabilities()
+
+# Concurrent-call limit and bounded wait queue per Backend API endpoint (see core.admission)
+backend_admission = {
+    "analysis": AdmissionLimiter(
+        "analysis", settings.BACKEND_ANALYSIS_MAX_CONCURRENCY, settings.BACKEND_MAX_QUEUE, settings.BACKEND_QUEUE_TIMEOUT
+    ),
+    "assistant": AdmissionLimiter(
+        "assistant", settings.BACKEND_ASSISTANT_MAX_CONCURRENCY, settings.BACKEND_MAX_QUEUE, settings.BACKEND_QUEUE_TIMEOUT
+    ),
+}
+
+# Retries of transient failures and a circuit breaker per endpoint (see core.resilience)
+backend_retry_policy = RetryPolicy(
+    max_attempts=settings.BACKEND_RETRY_MAX_ATTEMPTS,
+    base_delay=settings.BACKEND_RETRY_BASE_DELAY,
+    max_delay=settings.BACKEND_RETRY_MAX_DELAY,
+    deadline=settings.BACKEND_RETRY_DEADLINE,
+)
+backend_breakers = {
+    name: CircuitBreaker(name, settings.BACKEND_BREAKER_FAILURE_THRESHOLD, settings.BACKEND_BREAKER_RECOVERY_SECONDS)
+    for name in ("analysis", "assistant")
+}
+
+
+def backend_timeout(remaining: float) -> httpx.Timeout:
+    """Per-attempt timeout, capped by what is left of the retry deadline"""
+    return httpx.Timeout(
+        connect=min(settings.BACKEND_CONNECT_TIMEOUT, remaining),
+        read=min(settings.BACKEND_READ_TIMEOUT, remaining),
+        write=min(settings.BACKEND_WRITE_TIMEOUT, remaining),
+        pool=min(settings.BACKEND_POOL_TIMEOUT, remaining),
+    )
+
+
+def encode_backend_body(payload: Dict, metrics_format: str, content_encoding: str):
+    """
+    Serialize the backend payload in the given metrics_data format and
+    Content-Encoding; returns (body bytes, extra request headers)
+    """
+    extra_headers = {}
+    if metrics_format == METRICS_FORMAT_COLUMNAR:
+        payload = {**payload, "metrics_data": records_to_columnar(payload["metrics_data"])}
+        extra_headers[METRICS_FORMAT_HEADER] = metrics_format
+
+    body = json_codec.dumps(payload)
+    if content_encoding != ENCODING_IDENTITY and len(body) >= settings.BACKEND_COMPRESSION_MIN_BYTES:
+        raw_size = len(body)
+        body = encode_body(body, content_encoding)
+        extra_headers["Content-Encoding"] = content_encoding
+        logger.debug("Backend body %s-compressed: %d -> %d bytes", content_encoding, raw_size, len(body))
+    return body, extra_headers
+
+
+def get_backend_client() -> httpx.AsyncClient:
+    """Return the app-lifespan Backend API client"""
+    if backend_client is None:
+        raise RuntimeError("Backend API client is not initialized (app startup has not run)")
+    return backend_client
+
+
 async def call_backend_api(payload: Dict, endpoint: str):
     """
     Call Backend API at port 7071 and get response
     """
-    print("\n🚀 STEP 5: CALL BACKEND API")
-    print("-" * 80)
-    print(f"   Endpoint: {endpoint}")
+    logger.debug("Calling Backend API: %s", endpoint)
 
     headers = {
         "Content-Type": "application/json",
@@ -439,47 +721,455 @@ async def call_backend_api(payload: Dict, endpoint: str):
         "Authorization": f"Bearer {BACKEND_JWT_TOKEN}",
     }
     
-    async with httpx.AsyncClient(timeout=60.0) as client:
-        try:
-            response = await client.post(
-                endpoint,
-                json=payload,
-                headers=headers,
+    endpoint_label = endpoint.rstrip("/").rsplit("/", 1)[-1]
+    metrics_format, content_encoding = backend_capabilities.choose(
+        settings.BACKEND_METRICS_FORMAT, settings.BACKEND_CONTENT_ENCODING
+    )
+    with STAGE_SECONDS.time(stage="serialize"):
+        body, wire_headers = encode_backend_body(payload, metrics_format, content_encoding)
+    BACKEND_REQUEST_BYTES.observe(len(body), endpoint=endpoint_label)
+
+    client = get_backend_client()
+    breaker = backend_breakers[endpoint_label]
+    # Shared by the 415 fallback: resending in another format does not get a fresh set of retries
+    retry_budget = RetryBudget(backend_retry_policy)
+
+    async def post(content: bytes, request_headers: Dict[str, str]) -> httpx.Response:
+        """POST with retries of transient failures, through the endpoint's circuit breaker"""
+        async def attempt(remaining: float) -> httpx.Response:
+            return await client.post(endpoint, content=content, headers=request_headers, timeout=backend_timeout(remaining))
+
+        return await retry_call(
+            attempt,
+            backend_retry_policy,
+            breaker,
+            on_retry=lambda reason: BACKEND_RETRIES.inc(endpoint=endpoint_label, reason=reason),
+            budget=retry_budget,
+        )
+
+    try:
+        breaker.reject_if_open()
+        async with backend_admission[endpoint_label].slot() as queued:
+            BACKEND_QUEUE_WAIT_SECONDS.observe(queued, endpoint=endpoint_label)
+            with STAGE_SECONDS.time(stage="backend_call"):
+                response = await post(body, {**headers, **wire_headers})
+                if response.status_code == 415 and wire_headers:
+                    # Backend stopped accepting what it advertised (e.g. redeployed): resend as plain records
+                    logger.warning("Backend API rejected %s, falling back to plain records", wire_headers)
+                    backend_capabilities.reset()
+                    body, _ = encode_backend_body(payload, METRICS_FORMAT_RECORDS, ENCODING_IDENTITY)
+                    response = await post(body, headers)
+        backend_capabilities.update(response.headers)
+        
+        logger.info("Backend API responded %d (%s)", response.status_code, response.http_version)
+        BACKEND_RESPONSES.inc(endpoint=endpoint_label, status=response.status_code)
+        BACKEND_RESPONSE_BYTES.observe(len(response.content), endpoint=endpoint_label)
+        
+        if response.status_code == 200:
+            return json_codec.loads(response.content)
+        else:
+            error_text = response.text
+            logger.error("Backend API error: %s", error_text)
+            raise HTTPException(
+                status_code=response.status_code,
+                detail=f"Backend API error: {error_text}"
             )
             
-            print(f"   ✓ Response status: {response.status_code}")
-            
-            if response.status_code == 200:
-                result = response.json()
-                print(f"   ✓ Response received")
-                print("="*80 + "\n")
-                return result
-            else:
-                error_text = response.text
-                print(f"   ❌ Backend API error: {error_text}")
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=f"Backend API error: {error_text}"
-                )
-                
-        except httpx.TimeoutException:
-            print(f"   ❌ Backend API timeout")
-            raise HTTPException(status_code=504, detail="Backend API timeout")
-        except httpx.RequestError as e:
-            print(f"   ❌ Backend API connection error: {str(e)}")
-            raise HTTPException(
-                status_code=503,
-                detail=f"Cannot connect to Backend API: {str(e)}"
+    except AdmissionRejected as e:
+        BACKEND_SHED.inc(endpoint=endpoint_label, reason=e.reason)
+        logger.warning("Backend API call shed: %s", e)
+        raise
+    except httpx.TimeoutException:
+        BACKEND_RESPONSES.inc(endpoint=endpoint_label, status="timeout")
+        logger.error("Backend API timeout: %s", endpoint)
+        raise HTTPException(status_code=504, detail="Backend API timeout")
+    except httpx.RequestError as e:
+        BACKEND_RESPONSES.inc(endpoint=endpoint_label, status="connection_error")
+        logger.error("Backend API connection error: %s", e)
+        raise HTTPException(
+            status_code=503,
+            detail=f"Cannot connect to Backend API: {str(e)}"
+        )
+
+
+# First item of stream_backend_api: admitted, and the Backend API answered 200
+BACKEND_STREAM_OPEN = "open"
+
+
+async def stream_backend_api(payload: Dict, endpoint: str):
+    """
+    Streaming variant of call_backend_api: asks the Backend API for
+    text/event-stream and yields (event, data) as each event arrives, with
+    the same admission control, retries (until the response headers) and
+    error mapping. A backend answering with one JSON document (no SSE
+    support) yields a single "done" event.
+
+    The first item is (BACKEND_STREAM_OPEN, None), once the call was admitted
+    and the backend answered 200, so the caller can surface a shed call or a
+    backend error as a normal HTTP response before it starts streaming.
+    """
+    logger.debug("Streaming from Backend API: %s", endpoint)
+
+    headers = {
+        "Content-Type": "application/json",
+        "Accept": EVENT_STREAM,
+        "x-api-key": BACKEND_API_KEY,
+        "Authorization": f"Bearer {BACKEND_JWT_TOKEN}",
+    }
+
+    endpoint_label = endpoint.rstrip("/").rsplit("/", 1)[-1]
+    metrics_format, content_encoding = backend_capabilities.choose(
+        settings.BACKEND_METRICS_FORMAT, settings.BACKEND_CONTENT_ENCODING
+    )
+    with STAGE_SECONDS.time(stage="serialize"):
+        body, wire_headers = encode_backend_body(payload, metrics_format, content_encoding)
+    BACKEND_REQUEST_BYTES.observe(len(body), endpoint=endpoint_label)
+
+    client = get_backend_client()
+    breaker = backend_breakers[endpoint_label]
+    retry_budget = RetryBudget(backend_retry_policy)
+
+    async def open_stream(content: bytes, request_headers: Dict[str, str]) -> httpx.Response:
+        """Send the request and return once the response headers are in"""
+        async def attempt(remaining: float) -> httpx.Response:
+            request = client.build_request(
+                "POST", endpoint, content=content, headers=request_headers, timeout=backend_timeout(remaining)
             )
+            return await client.send(request, stream=True)
+
+        return await retry_call(
+            attempt,
+            backend_retry_policy,
+            breaker,
+            on_retry=lambda reason: BACKEND_RETRIES.inc(endpoint=endpoint_label, reason=reason),
+            budget=retry_budget,
+        )
+
+    try:
+        breaker.reject_if_open()
+        async with backend_admission[endpoint_label].slot() as queued:
+            BACKEND_QUEUE_WAIT_SECONDS.observe(queued, endpoint=endpoint_label)
+            started = time.perf_counter()
+            response = await open_stream(body, {**headers, **wire_headers})
+            if response.status_code == 415 and wire_headers:
+                logger.warning("Backend API rejected %s, falling back to plain records", wire_headers)
+                await response.aclose()
+                backend_capabilities.reset()
+                body, _ = encode_backend_body(payload, METRICS_FORMAT_RECORDS, ENCODING_IDENTITY)
+                response = await open_stream(body, headers)
+
+            received = 0
+            try:
+                backend_capabilities.update(response.headers)
+                logger.info("Backend API responded %d (%s)", response.status_code, response.http_version)
+                BACKEND_RESPONSES.inc(endpoint=endpoint_label, status=response.status_code)
+
+                if response.status_code != 200:
+                    error_text = (await response.aread()).decode("utf-8", errors="replace")
+                    received = len(response.content)
+                    logger.error("Backend API error: %s", error_text)
+                    raise HTTPException(
+                        status_code=response.status_code,
+                        detail=f"Backend API error: {error_text}"
+                    )
+
+                yield BACKEND_STREAM_OPEN, None
+                if not response.headers.get("content-type", "").startswith(EVENT_STREAM):
+                    received = len(await response.aread())
+                    yield EVENT_DONE, json_codec.loads(response.content)
+                    return
+
+                parser = SSEParser()
+                async for chunk in response.aiter_bytes():
+                    received += len(chunk)
+                    for event, data in parser.feed(chunk):
+                        yield event, json_codec.loads(data)
+            finally:
+                await response.aclose()
+                STAGE_SECONDS.observe(time.perf_counter() - started, stage="backend_call")
+                BACKEND_RESPONSE_BYTES.observe(received, endpoint=endpoint_label)
+
+    except AdmissionRejected as e:
+        BACKEND_SHED.inc(endpoint=endpoint_label, reason=e.reason)
+        logger.warning("Backend API call shed: %s", e)
+        raise
+    except httpx.TimeoutException:
+        BACKEND_RESPONSES.inc(endpoint=endpoint_label, status="timeout")
+        logger.error("Backend API timeout: %s", endpoint)
+        raise HTTPException(status_code=504, detail="Backend API timeout")
+    except httpx.RequestError as e:
+        BACKEND_RESPONSES.inc(endpoint=endpoint_label, status="connection_error")
+        logger.error("Backend API connection error: %s", e)
+        raise HTTPException(
+            status_code=503,
+            detail=f"Cannot connect to Backend API: {str(e)}"
+        )
+
+
+# ==============================================================================
+# 7. APP LIFECYCLE
+# ==============================================================================
 
+@app.on_event("startup")
+async def on_startup():
+    global backend_client
+    setup_logging(settings.LOG_LEVEL, settings.LOG_FORMAT, settings.LOG_ASYNC)
+    db_pool.open()
+    static_assets.load()
+    backend_client = create_async_client(
+        max_connections=settings.BACKEND_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.BACKEND_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=settings.BACKEND_KEEPALIVE_EXPIRY,
+        http2=settings.BACKEND_HTTP2,
+        connect_timeout=settings.BACKEND_CONNECT_TIMEOUT,
+        read_timeout=settings.BACKEND_READ_TIMEOUT,
+        write_timeout=settings.BACKEND_WRITE_TIMEOUT,
+        pool_timeout=settings.BACKEND_POOL_TIMEOUT,
+    )
+
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    global backend_client
+    if backend_client is not None:
+        await backend_client.aclose()
+        backend_client = None
+    blocking_executor.shutdown(wait=False)
+    db_pool.close()
+    shutdown_logging()
 
 
 # ==============================================================================
-# 7. API ENDPOINTS
+# 8. API ENDPOINTS
 # ==============================================================================
 
+NO_DATA_CONTENT = {
+    "answer": "<div style='background:#fff3cd; padding:12px; border-left:4px solid #ffc107; border-radius:4px;'>No metrics data found for the selected filters.</div>",
+    "data": {"metrics_records": 0}
+}
+
+
+def normalize_backend_response(backend_response: Any) -> Dict:
+    """Backend API document -> /ask-ai response for the frontend"""
+    backend_message = backend_response.get("message") if isinstance(backend_response, dict) else None
+    return {
+        "answer": f"<div style='white-space:pre-wrap;'>{backend_message or ''}</div>",
+        "data": backend_response,
+    }
+
+
+def backend_error_content(backend_endpoint: str, detail: Any) -> Dict:
+    """Displayable /ask-ai content for a failed Backend API call"""
+    # Code debug for: Build error response when backend API fails (commented debug_info)
+    return {
+        "answer": f"""
+        <div style="background:#f8d7da; padding:15px; border-left:4px solid #dc3545; margin-bottom:15px; border-radius:4px;">
+            <h4 style="margin:0 0 10px 0; color:#721c24;">❌ Backend API Error</h4>
+            <p style="margin:5px 0; color:#721c24;">
+                <strong>Cannot connect to Backend API</strong><br>
+                Endpoint: <code>{backend_endpoint}</code><br>
+                Error: {detail}
+            </p>
+            <hr style="border-color:#f5c6cb; margin:10px 0;">
+            <p style="margin:5px 0; font-size:0.9em; color:#721c24;">
+                💡 <strong>Solutions:</strong><br>
+                1. Make sure Backend API is running on port 7071<br>
+                2. Check that JWT token and API key are correct
+            </p>
+        </div>
+        """,
+        "error": str(detail),
+        # Code debug for: Omit payload_sent and backend_endpoint from error response (commented out for cleaner output)
+        # "payload_sent": backend_payload,
+        # "backend_endpoint": backend_endpoint
+    }
+
+
+def busy_content(retry_after: int) -> Dict:
+    """Displayable /ask-ai content when the Backend API call was shed"""
+    return {
+        "answer": f"<div style='background:#fff3cd; padding:12px; border-left:4px solid #ffc107; border-radius:4px;'>The AI service is busy. Please try again in {retry_after} seconds.</div>",
+        "error": f"AI service is busy, retry after {retry_after}s",
+        "retry_after": retry_after,
+    }
+
+
+def system_error_content(error: Exception) -> Dict:
+    """Displayable /ask-ai content for an unexpected server error"""
+    return {
+        "answer": f"<div style='color:#c62828; background:#ffebee; padding:12px; border-left:4px solid #c62828; border-radius:4px;'><h5 style='margin:0;'>❌ Error</h5><p style='margin:8px 0;'>{str(error)}</p></div>",
+        "error": str(error)
+    }
+
+
+async def prepare_backend_call(request_data: RequestPayload, request_id: str):
+    """
+    Steps 1-4 of /ask-ai: metrics_data (cached) and the Backend API payload
+    Returns (backend payload, backend endpoint), or None when there is no data
+    """
+    # Extract period
+    p_start = request_data.period.start_date if request_data.period else None
+    p_end = request_data.period.end_date if request_data.period else None
+
+    # ===== STEP 1, 2 & 3: QUERY DATABASE & PROCESS DATA (cached, off the event loop) =====
+    cache_key = build_metrics_cache_key(request_data.filters, p_start, p_end)
+    metrics_data = result_cache.get(cache_key)
+    if metrics_data is None:
+        metrics_data = await blocking_executor.run(load_metrics_data, request_data.filters, p_start, p_end)
+        result_cache.set(cache_key, metrics_data)
+    else:
+        logger.info("metrics_data cache hit (%d records)", len(metrics_data))
+
+    if not metrics_data:
+        return None
+
+    # Calculate actual period from data
+    actual_period = {
+        "start_date": request_data.period.start_date if request_data.period else None,
+        "end_date": request_data.period.end_date if request_data.period else None
+    }
+
+    if metrics_data and len(metrics_data) > 0:
+        dates = [record.get('date') for record in metrics_data if record.get('date')]
+        if dates:
+            dates_sorted = sorted(dates)
+            actual_period['start_date'] = dates_sorted[0]
+            actual_period['end_date'] = dates_sorted[-1]
+
+    # Fit long periods into the record / token budget (the period above stays the full one)
+    with STAGE_SECONDS.time(stage="downsample"):
+        budget = record_budget(metrics_data, settings.METRICS_MAX_RECORDS, settings.METRICS_MAX_TOKENS)
+        sent_data, granularity = downsample(metrics_data, budget, settings.METRICS_DOWNSAMPLE, DOWNSAMPLE_FLOW_METRICS)
+    METRICS_SENT_RECORDS.observe(len(sent_data), granularity=granularity)
+    if granularity != DAILY:
+        logger.info("metrics_data downsampled (%s): %d -> %d records", granularity, len(metrics_data), len(sent_data))
+    metrics_data = sent_data
+
+    # ===== STEP 4: BUILD PAYLOAD =====
+    with STAGE_SECONDS.time(stage="payload_build"):
+        backend_payload = build_backend_payload(request_data, metrics_data, actual_period, request_id, granularity)
+
+    # Determine backend endpoint based on mode
+    mode_type = request_data.mode_type or (request_data.request_meta.mode_type if request_data.request_meta else None)
+    if mode_type == "AI Assistant":
+        backend_endpoint = ASSISTANT_API_ENDPOINT
+    else:
+        backend_endpoint = ANALYSIS_API_ENDPOINT
+
+    return backend_payload, backend_endpoint
+
+
+async def run_ask_ai_pipeline(request_data: RequestPayload, request_id: str):
+    """
+    Steps 1-6 of /ask-ai for one request
+    Returns (response content, outcome); backend errors become a displayable
+    content with outcome "backend_error", other errors are raised
+    """
+    prepared = await prepare_backend_call(request_data, request_id)
+    if prepared is None:
+        return NO_DATA_CONTENT, "no_data"
+    backend_payload, backend_endpoint = prepared
+
+    # ===== STEP 5: CALL BACKEND API (or return payload in DEBUG mode) =====
+    # Code debug for: DEBUG_MODE check (disabled - always calling backend API now)
+    if DEBUG_MODE:
+        # Code debug for: Build debug response with payload inspection data (disabled)
+        return None, "debug"
+    else:
+        # Production mode - call real backend API
+        try:
+            backend_response = await call_backend_api(backend_payload, backend_endpoint)
+
+            # ===== STEP 6: RETURN RESPONSE =====
+            # Normalize backend response to frontend format
+            return normalize_backend_response(backend_response), "ok"
+
+        except HTTPException as he:
+            # Backend API error - return detailed error message
+            logger.error("Backend API error: %s", he.detail)
+
+            # Code debug for: Return error response with status 200 so frontend can display user-friendly message
+            return backend_error_content(backend_endpoint, he.detail), "backend_error"
+
+
+async def stream_ask_ai(request_data: RequestPayload, request_id: str):
+    """
+    /ask-ai for clients that accept text/event-stream, when ASK_AI_STREAMING is on
+    Steps 1-4 as usual, then the Backend API call is admitted and opened
+    before any byte is sent: a shed call answers 429/503 with Retry-After and
+    a backend error the usual JSON error content, as without streaming. Then
+    the backend's token events are relayed as they arrive, followed by a
+    "done" event with the normalized response (or an "error" event with
+    displayable content). Not coalesced: every stream needs its own backend
+    call (hence off by default).
+    """
+    started = time.perf_counter()
+    outcome = None
+    try:
+        prepared = await prepare_backend_call(request_data, request_id)
+        if prepared is None or DEBUG_MODE:
+            outcome = "no_data" if prepared is None else "debug"
+            return AskAIResponse(content=NO_DATA_CONTENT if prepared is None else None, status_code=200)
+        backend_payload, backend_endpoint = prepared
+        endpoint_label = backend_endpoint.rstrip("/").rsplit("/", 1)[-1]
+
+        backend_events = stream_backend_api(backend_payload, backend_endpoint)
+        # Runs admission, retries and the status check; the generator then holds the slot until it is closed
+        await backend_events.__anext__()
+    except HTTPException as he:
+        outcome = "backend_error"
+        logger.error("Backend API error: %s", he.detail)
+        return AskAIResponse(content=backend_error_content(backend_endpoint, he.detail), status_code=200)
+    except AdmissionRejected as e:
+        outcome = "shed"
+        return AskAIResponse(
+            status_code=e.status_code,
+            headers={"Retry-After": str(e.retry_after)},
+            content=busy_content(e.retry_after),
+        )
+    except Exception as e:
+        outcome = "error"
+        logger.exception("Unhandled error in /ask-ai")
+        return AskAIResponse(status_code=500, content=system_error_content(e))
+    finally:
+        # Once streaming, events() records the outcome when the stream ends
+        if outcome is not None:
+            REQUEST_SECONDS.observe(time.perf_counter() - started, outcome=outcome)
+
+    async def events():
+        outcome = "error"
+        first_token = True
+        try:
+            async for event, data in backend_events:
+                if event == EVENT_TOKEN:
+                    if first_token:
+                        ASK_AI_FIRST_TOKEN_SECONDS.observe(time.perf_counter() - started, endpoint=endpoint_label)
+                        first_token = False
+                    yield format_event(EVENT_TOKEN, data, json_codec.dumps)
+                elif event == EVENT_DONE:
+                    outcome = "ok"
+                    yield format_event(EVENT_DONE, normalize_backend_response(data), json_codec.dumps)
+                elif event == EVENT_ERROR:
+                    outcome = "backend_error"
+                    detail = data.get("detail") if isinstance(data, dict) else data
+                    yield format_event(EVENT_ERROR, backend_error_content(backend_endpoint, detail), json_codec.dumps)
+        except HTTPException as he:
+            # Transport errors after the headers (e.g. the backend dropped the connection mid-answer)
+            outcome = "backend_error"
+            logger.error("Backend API error: %s", he.detail)
+            yield format_event(EVENT_ERROR, backend_error_content(backend_endpoint, he.detail), json_codec.dumps)
+        except Exception as e:
+            logger.exception("Unhandled error in /ask-ai stream")
+            yield format_event(EVENT_ERROR, system_error_content(e), json_codec.dumps)
+        finally:
+            await backend_events.aclose()
+            REQUEST_SECONDS.observe(time.perf_counter() - started, outcome=outcome)
+
+    return StreamingResponse(events(), media_type=EVENT_STREAM, headers=STREAM_HEADERS)
+
+
 @app.post('/ask-ai')
-async def ask_ai(request_data: RequestPayload):
+async def ask_ai(request_data: RequestPayload, http_request: Request):
     """
     Main endpoint: 
     1. Receive filters from Tableau Extension
@@ -487,162 +1177,118 @@ async def ask_ai(request_data: RequestPayload):
     3. Build JSON payload with data
     4. Send to Backend API (port 7071)
     5. Return Backend API response to frontend
+
+    Identical requests arriving while one is in flight (same normalized
+    filters, period, mode_type and user_question) await that request's
+    result instead of repeating steps 1-6.
+
+    With ASK_AI_STREAMING on and `Accept: text/event-stream` the answer is
+    streamed instead (see stream_ask_ai), without coalescing; otherwise
+    every client gets one JSON document.
     """
+    request_id = generate_request_id()
+    request_id_var.set(request_id)
+    if settings.ASK_AI_STREAMING and EVENT_STREAM in http_request.headers.get("accept", ""):
+        logger.info("Streaming request from Tableau Extension: mode=%s period=%s", request_data.mode_type, request_data.period)
+        return await stream_ask_ai(request_data, request_id)
+
+    started = time.perf_counter()
+    outcome = "error"
     try:
-        print("\n" + "="*80)
-        print("📥 REQUEST FROM TABLEAU EXTENSION")
-        print("="*80)
-        print(f"Mode: {request_data.mode_type}")
-        print(f"Period: {request_data.period}")
-        print(f"Filters: {list(request_data.filters.keys())}")
+        logger.info("Request from Tableau Extension: mode=%s period=%s", request_data.mode_type, request_data.period)
+        logger.debug("Filters: %s", LazyRepr(lambda: list(request_data.filters.keys())))
         if request_data.user_question:
-            print(f"User Question: {request_data.user_question}")
-        
-        # Extract period
-        p_start = request_data.period.start_date if request_data.period else None
-        p_end = request_data.period.end_date if request_data.period else None
-
-        # ===== STEP 1 & 2: QUERY DATABASE =====
-        df = get_data_from_db(request_data.filters, p_start, p_end)
-
-        # ===== STEP 3: PROCESS DATA =====
-        metrics_data = process_data_to_metrics(df)
-
-        if not metrics_data:
-            return JSONResponse(
-                content={
-                    "answer": "<div style='background:#fff3cd; padding:12px; border-left:4px solid #ffc107; border-radius:4px;'>No metrics data found for the selected filters.</div>",
-                    "data": {"metrics_records": 0}
-                },
-                status_code=200
-            )
+            logger.debug("User question: %s", request_data.user_question)
         
-        # Calculate actual period from data
-        actual_period = {
-            "start_date": request_data.period.start_date if request_data.period else None,
-            "end_date": request_data.period.end_date if request_data.period else None
-        }
-        
-        if metrics_data and len(metrics_data) > 0:
-            dates = [record.get('date') for record in metrics_data if record.get('date')]
-            if dates:
-                dates_sorted = sorted(dates)
-                actual_period['start_date'] = dates_sorted[0]
-                actual_period['end_date'] = dates_sorted[-1]
-
-        # ===== STEP 4: BUILD PAYLOAD =====
-        backend_payload = build_backend_payload(request_data, metrics_data, actual_period)
-
-        # Determine backend endpoint based on mode
-        mode_type = request_data.mode_type or (request_data.request_meta.mode_type if request_data.request_meta else None)
-        if mode_type == "AI Assistant":
-            backend_endpoint = ASSISTANT_API_ENDPOINT
-        else:
-            backend_endpoint = ANALYSIS_API_ENDPOINT
-        
-        # ===== STEP 5: CALL BACKEND API (or return payload in DEBUG mode) =====
-        # Code debug for: DEBUG_MODE check (disabled - always calling backend API now)
-        if DEBUG_MODE:
-            # Code debug for: Build debug response with payload inspection data (disabled)
-            pass
-        else:
-            # Production mode - call real backend API
-            try:
-                backend_response = await call_backend_api(backend_payload, backend_endpoint)
-                
-                # ===== STEP 6: RETURN RESPONSE =====
-                # Code debug for: Print log when response received (optional - uncomment to debug)
-                # print("\n📤 SENDING RESPONSE TO FRONTEND")
-                # print("-" * 80)
-                # print("   ✓ Response from Backend API received and forwarded")
-                # print("="*80 + "\n")
-                
-                # Normalize backend response to frontend format
-                backend_message = backend_response.get("message") if isinstance(backend_response, dict) else None
-                normalized_response = {
-                    "answer": f"<div style='white-space:pre-wrap;'>{backend_message or ''}</div>",
-                    "data": backend_response,
-                }
-
-                # Return normalized response to frontend
-                return JSONResponse(content=normalized_response)
-                
-            except HTTPException as he:
-                # Backend API error - return detailed error message
-                print(f"\n❌ Backend API Error: {he.detail}")
-                
-                # Code debug for: Build error response when backend API fails (commented debug_info)
-                error_response = {
-                    "answer": f"""
-                    <div style="background:#f8d7da; padding:15px; border-left:4px solid #dc3545; margin-bottom:15px; border-radius:4px;">
-                        <h4 style="margin:0 0 10px 0; color:#721c24;">❌ Backend API Error</h4>
-                        <p style="margin:5px 0; color:#721c24;">
-                            <strong>Cannot connect to Backend API</strong><br>
-                            Endpoint: <code>{backend_endpoint}</code><br>
-                            Error: {he.detail}
-                        </p>
-                        <hr style="border-color:#f5c6cb; margin:10px 0;">
-                        <p style="margin:5px 0; font-size:0.9em; color:#721c24;">
-                            💡 <strong>Solutions:</strong><br>
-                            1. Make sure Backend API is running on port 7071<br>
-                            2. Check that JWT token and API key are correct
-                        </p>
-                    </div>
-                    """,
-                    "error": str(he.detail),
-                    # Code debug for: Omit payload_sent and backend_endpoint from error response (commented out for cleaner output)
-                    # "payload_sent": backend_payload,
-                    # "backend_endpoint": backend_endpoint
-                }
-                
-                # Code debug for: Return error response with status 200 so frontend can display user-friendly message
-                return JSONResponse(content=error_response, status_code=200)
+        # ===== STEP 1-6, shared by identical concurrent requests =====
+        flight_key = build_ask_ai_flight_key(request_data)
+        content, outcome = await ask_ai_flight.run(flight_key, run_ask_ai_pipeline, request_data, request_id)
+        return AskAIResponse(content=content, status_code=200)
 
     except HTTPException as he:
         # Re-raise HTTP exceptions from backend API call
         raise he
+    except AdmissionRejected as e:
+        # Backend API saturated or its circuit is open: shed fast and tell the client when to retry
+        outcome = "shed"
+        return AskAIResponse(
+            status_code=e.status_code,
+            headers={"Retry-After": str(e.retry_after)},
+            content=busy_content(e.retry_after),
+        )
     except Exception as e:
-        # Code debug for: Catch-all exception handler (optional - print traceback uncomment to debug)
-        # import traceback
-        # error_msg = traceback.format_exc()
-        # print(f"\n❌ ERROR OCCURRED:")
-        # print(error_msg)
-        # print("="*80 + "\n")
+        logger.exception("Unhandled error in /ask-ai")
         
         # Code debug for: Return system error response with error message (without full traceback in production)
-        return JSONResponse(
-            status_code=500,
-            content={
-                "answer": f"<div style='color:#c62828; background:#ffebee; padding:12px; border-left:4px solid #c62828; border-radius:4px;'><h5 style='margin:0;'>❌ Error</h5><p style='margin:8px 0;'>{str(e)}</p></div>",
-                "error": str(e)
-            }
-        )
+        return AskAIResponse(status_code=500, content=system_error_content(e))
+    finally:
+        REQUEST_SECONDS.observe(time.perf_counter() - started, outcome=outcome)
+
+
+@app.get('/stats')
+async def stats():
+    """Runtime stats of server-owned resources"""
+    return {
+        "db_pool": db_pool.stats(),
+        "blocking_executor": blocking_executor.stats(),
+        "result_cache": result_cache.stats(),
+        "ask_ai_flight": ask_ai_flight.stats(),
+        "backend_capabilities": backend_capabilities.stats(),
+        "static_assets": static_assets.stats(),
+        "backend_admission": {name: limiter.stats() for name, limiter in backend_admission.items()},
+        "backend_circuit": {name: breaker.stats() for name, breaker in backend_breakers.items()},
+    }
+
+
+@app.get('/metrics')
+async def prometheus_metrics():
+    """Prometheus scrape endpoint (must stay above the catch-all static route)"""
+    return Response(content=metrics.render(), headers={"Content-Type": METRICS_CONTENT_TYPE})
+
+
+@app.post('/cache/invalidate')
+async def invalidate_cache(request: Request):
+    """
+    Drop all cached metrics_data results (e.g. after the view is refreshed).
+    Needs header X-Admin-Token = CACHE_ADMIN_TOKEN; not served while that is unset.
+    """
+    if not settings.CACHE_ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    token = request.headers.get("x-admin-token", "")
+    if not hmac.compare_digest(token.encode(), settings.CACHE_ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+    removed = result_cache.invalidate()
+    return {"invalidated": removed}
 
 
 # ==============================================================================
-# 8. SERVE STATIC FILES
+# 9. SERVE STATIC FILES
 # ==============================================================================
 
+# Allow-listed assets, loaded into memory at startup (see core/static_files.py)
+static_assets = StaticAssetStore(
+    os.path.dirname(os.path.abspath(__file__)),
+    encodings=available_encodings() if settings.COMPRESSION_ENABLED else [],
+    gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+    brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+)
+
 @app.get('/')
-async def index():
+async def index(request: Request):
     """Serve index.html"""
-    static_folder = os.path.dirname(os.path.abspath(__file__))
-    return FileResponse(os.path.join(static_folder, 'index.html'))
+    return await serve_static('index.html', request)
 
 @app.get('/{path:path}')
-async def serve_static(path: str):
-    """Serve static files (CSS, JS, etc.)"""
-    static_folder = os.path.dirname(os.path.abspath(__file__))
-    file_path = os.path.join(static_folder, path)
-    
-    if os.path.exists(file_path) and os.path.isfile(file_path):
-        return FileResponse(file_path)
-    else:
+async def serve_static(path: str, request: Request):
+    """Serve static files (CSS, JS, etc.) from memory"""
+    response = static_assets.response(path, request.headers)
+    if response is None:
         raise HTTPException(status_code=404, detail="File not found")
+    return response
 
 
 # ==============================================================================
-# 9. RUN SERVER
+# 10. RUN SERVER
 # ==============================================================================
 
 if __name__ == '__main__':
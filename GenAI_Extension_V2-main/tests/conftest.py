@@ -0,0 +1,12 @@
+import os
+import sys
+
+EXTENSION_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if EXTENSION_ROOT not in sys.path:
+    sys.path.insert(0, EXTENSION_ROOT)
+
+# config.settings builds its settings at import, which needs the SQL connection variables
+for _name in ("AZURE_SQL_DRIVER", "AZURE_SQL_SERVER", "AZURE_SQL_DATABASE", "AZURE_SQL_USER", "AZURE_SQL_PASSWORD"):
+    os.environ.setdefault(_name, "test")
+# No connections at import: the tests never reach the database
+os.environ.setdefault("DB_POOL_MIN_SIZE", "0")
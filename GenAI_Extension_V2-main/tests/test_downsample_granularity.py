@@ -0,0 +1,62 @@
+"""
+Downsampled metrics_data leaves the extension labelled with its
+granularity, and downsampling stays off unless configured.
+"""
+import datetime
+
+import numpy as np
+import pytest
+
+from core.downsample import DAILY, FLOW_METRICS, downsample
+
+N_DAYS = 1100
+MAX_RECORDS = 730
+
+
+@pytest.fixture(scope="module")
+def daily_records():
+    rng = np.random.default_rng(7)
+    start = datetime.date(2022, 1, 1)
+    actual = rng.integers(0, 10, N_DAYS)
+    actual_total = np.cumsum(actual)
+    return [
+        {
+            "date": str(start + datetime.timedelta(days=d)),
+            "BReportActual": int(actual[d]),
+            "BReportActualTotal": int(actual_total[d]),
+        }
+        for d in range(N_DAYS)
+    ]
+
+
+def test_downsampling_is_off_by_default():
+    from config.settings import Settings
+
+    assert Settings.model_fields["METRICS_DOWNSAMPLE"].default == "off"
+
+
+def test_off_keeps_daily_records(daily_records):
+    records, granularity = downsample(daily_records, MAX_RECORDS, "off", FLOW_METRICS)
+    assert granularity == DAILY
+    assert records == daily_records
+
+
+def test_auto_buckets_weekly_and_keeps_totals(daily_records):
+    records, granularity = downsample(daily_records, MAX_RECORDS, "auto", FLOW_METRICS)
+    assert granularity == "weekly"
+    assert len(records) <= MAX_RECORDS
+    # Flow metrics are summed per bucket, levels keep the bucket's last day
+    assert sum(r["BReportActual"] for r in records) == sum(r["BReportActual"] for r in daily_records)
+    assert records[-1]["BReportActualTotal"] == daily_records[-1]["BReportActualTotal"]
+
+
+def test_payload_carries_granularity(daily_records):
+    import server
+
+    records, granularity = downsample(daily_records, MAX_RECORDS, "auto", FLOW_METRICS)
+    request = server.RequestPayload(filters={"Project Identifier": ["A"]}, mode_type="Analyze Report")
+    period = {"start_date": daily_records[0]["date"], "end_date": daily_records[-1]["date"]}
+
+    payload = server.build_backend_payload(request, records, period, "t", granularity)
+    assert payload["request_meta"]["metrics_granularity"] == "weekly"
+    assert server.build_backend_payload(request, daily_records, period, "t")["request_meta"]["metrics_granularity"] == DAILY